@@ -4,9 +4,13 @@ Forum Graph - 论坛讨论图协调层
 1. 定义共享的 ForumState
 2. 构建 LangGraph 协调三个Agent
 3. 管理多轮讨论流程
+4. 缓存语义相近问答的讨论结果
+5. 通过后台线程异步输出日志
 """
 from .graph.state import ForumState
 from .graph.graph import buildGraph
+from .cache import ForumSemanticCache
+from .logging_utils import setup_logging
 from .agent import ForumAgent
 
-__all__ = ['ForumState', 'buildGraph', 'ForumAgent']
+__all__ = ['ForumState', 'buildGraph', 'ForumSemanticCache', 'ForumAgent', 'setup_logging']
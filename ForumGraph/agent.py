@@ -5,17 +5,31 @@ Forum Agent 主类
 
 import uuid
 import time
-from typing import Dict, Any, Optional, List
+import json
+import copy
+import asyncio
+import logging
+from typing import Dict, Any, Optional, List, AsyncIterator
 from .graph.graph import buildGraph
 from .graph.state import ForumState
+from .cache import ForumSemanticCache
+from .logging_utils import LOGGER_NAME, BAR, setup_logging
 from RAGCriticAgent import RAGCriticAgent
-from WebCriticAgent import WebCriticAgent
+from WebCriticAgent import WebCriticAgent, SearchResultCache
 from ModeratorAgent import ModeratorAgent
 from storage.manager import StorageManager
 from storage.database.postgresql import PostgreSQLDatabase
 from rag.embedding import YEmbedding
 from config import get_config
-from langchain_core.messages import HumanMessage, AIMessage
+
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# 语义缓存命中时从相近 QA 的讨论结果中复用的字段（与具体问答、会话无关的部分）
+_CACHED_DISCUSSION_FIELDS = (
+    "rag_critic_comment", "web_critic_comment", "final_evaluation",
+    "discussion_history", "current_round"
+)
 
 
 class ForumAgent:
@@ -30,7 +44,10 @@ class ForumAgent:
         user_id: Optional[str] = None,
         max_rounds: int = 3,
         rag_top_k: int = 3,
-        web_top_k: int = 5
+        web_top_k: int = 5,
+        max_concurrency: int = 4,
+        semantic_cache_threshold: Optional[float] = 0.05,
+        web_cache_ttl: Optional[float] = 3600
     ):
         """
         初始化 Forum Agent
@@ -44,6 +61,9 @@ class ForumAgent:
             max_rounds: 最大讨论轮次（默认 3）
             rag_top_k: RAG Critic 检索数量（默认 3）
             web_top_k: Web Critic 搜索结果数量（默认 5）
+            max_concurrency: 会话评价时并发讨论的 QA 数量上限（默认 4）
+            semantic_cache_threshold: 语义缓存命中的最大余弦距离（默认 0.05，None 表示关闭缓存）
+            web_cache_ttl: Web 搜索结果缓存的有效期，单位秒（默认 3600，None 表示关闭缓存）
         """
         self.llm = llm
         self.storage_manager = storage_manager
@@ -51,6 +71,19 @@ class ForumAgent:
         self.embedding = embedding
         self.user_id = user_id or self._generate_user_id()
         self.max_rounds = max_rounds
+        self.max_concurrency = max(1, max_concurrency)
+
+        # 语义缓存：近似重复的 (问题, 回答) 直接复用已有讨论结果
+        self.semantic_cache = (
+            ForumSemanticCache(threshold=semantic_cache_threshold)
+            if semantic_cache_threshold is not None else None
+        )
+
+        # Web 搜索结果缓存：相同问题在有效期内不重复调用 Tavily
+        self.web_cache = (
+            SearchResultCache(maxsize=1024, ttl=web_cache_ttl)
+            if web_cache_ttl is not None else None
+        )
 
         # 从配置读取 Tavily API Key
         config = get_config()
@@ -60,12 +93,13 @@ class ForumAgent:
             raise ValueError("未找到 TAVILY_API_KEY，请在 env 文件中配置")
 
         # 初始化 Milvus（RAG Critic 需要使用）
-        milvus = self.storage_manager.initialize_milvus(
+        self.milvus = self.storage_manager.initialize_milvus(
             collection_name="episodic_memory_vectors",
             embedding_dim=1024
         )
-        # 创建或加载集合
-        milvus.create_collection(drop_if_exists=False)
+        # 创建或加载集合（同一个 MilvusStore 只执行一次，避免每次构造都发起远程调用）
+        if self.milvus.collection is None:
+            self.milvus.create_collection(drop_if_exists=False)
 
         # 初始化三个 Agent
         self.rag_critic = RAGCriticAgent(
@@ -79,18 +113,45 @@ class ForumAgent:
         self.web_critic = WebCriticAgent(
             llm=llm,
             tavily_api_key=tavily_api_key,
-            max_search_results=web_top_k
+            max_search_results=web_top_k,
+            search_cache=self.web_cache
         )
 
         self.moderator = ModeratorAgent(llm=llm)
 
-        # 构建图
-        self.graph = buildGraph(
-            rag_critic_agent=self.rag_critic,
-            web_critic_agent=self.web_critic,
-            moderator_agent=self.moderator
+        # 获取图（进程内只编译一次），Agent 实例通过 config 传入节点
+        self.graph = buildGraph()
+        self.graph_config = {
+            "configurable": {
+                "rag_critic": self.rag_critic,
+                "web_critic": self.web_critic,
+                "moderator": self.moderator,
+                "db": self.db
+            }
+        }
+
+    async def warmup(self) -> None:
+        """
+        预热嵌入模型和 Milvus 集合（建议在服务启动时调用一次）
+
+        并发执行一次查询编码和一次 top_k=1 的向量检索，
+        把模型推理初始化和集合加载的耗时从首个请求挪到启动阶段
+        """
+        probe_vector = [1.0] + [0.0] * (self.milvus.embedding_dim - 1)
+        start_time = time.perf_counter()
+
+        results = await asyncio.gather(
+            self.embedding.aembed_query("warmup"),
+            asyncio.to_thread(self.milvus.search, probe_vector, 1),
+            return_exceptions=True
         )
 
+        for name, result in zip(("嵌入模型", "Milvus"), results):
+            if isinstance(result, Exception):
+                logger.warning("%s 预热失败：%s", name, result)
+
+        logger.info("[OK] Forum Agent 预热完成 | 耗时: %.2fs", time.perf_counter() - start_time)
+
     @staticmethod
     def _generate_user_id() -> str:
         """生成随机用户 ID"""
@@ -105,7 +166,8 @@ class ForumAgent:
         self,
         question: str,
         user_answer: str,
-        interview_context: Optional[Dict[str, Any]] = None
+        interview_context: Optional[Dict[str, Any]] = None,
+        skip_save: bool = False
     ) -> Dict[str, Any]:
         """
         运行完整的 Forum 讨论流程
@@ -114,6 +176,7 @@ class ForumAgent:
             question: 面试问题
             user_answer: 用户回答
             interview_context: 面试上下文（公司、难度等）
+            skip_save: 是否跳过保存（结果中的 discussion_record 由调用方自行写入）
 
         Returns:
             包含最终评价的结果
@@ -139,18 +202,59 @@ class ForumAgent:
             "final_evaluation": None,
             "next_step": "rag_critic",
             "should_continue": True,
+            "skip_save": skip_save,
+            "discussion_record": None,
+            "discussion_id": None,
             "metadata": None
         }
 
+        # 查询语义缓存（作用域包含面试上下文，不同公司/难度的评价互不复用）
+        cache_scope = json.dumps(interview_context or {}, sort_keys=True, ensure_ascii=False)
+        query_vector = None
+        if self.semantic_cache is not None:
+            query_vector = await self.embedding.aembed_query(message)
+            cached_state = self.semantic_cache.lookup(query_vector, scope=cache_scope, text=message)
+            if cached_state is not None:
+                logger.info("[OK] 命中 Forum 语义缓存，跳过讨论")
+                # 命中的是语义相近的另一条 QA：只复用评论、评价和讨论历史，
+                # 问题、回答、会话和保存选项都以本次调用为准
+                final_state = dict(initial_state)
+                for field in _CACHED_DISCUSSION_FIELDS:
+                    final_state[field] = copy.deepcopy(cached_state.get(field))
+                final_state["next_step"] = "end"
+                final_state["should_continue"] = False
+
+                # 缓存命中同样需要为本次会话留下讨论记录
+                record = copy.deepcopy(cached_state.get("discussion_record"))
+                if record:
+                    record.update({
+                        "session_id": session_id,
+                        "user_id": self.user_id,
+                        "question": question,
+                        "user_answer": user_answer
+                    })
+                    final_state["discussion_record"] = record
+                    if not skip_save:
+                        final_state["discussion_id"] = await self.db.insert_forum_discussion(record)
+
+                return final_state
+
         # 运行图
         try:
-            final_state = await self.graph.ainvoke(initial_state)
+            final_state = await self.graph.ainvoke(initial_state, config=self.graph_config)
+
+            if self.semantic_cache is not None and final_state.get("final_evaluation"):
+                self.semantic_cache.insert(
+                    query_vector,
+                    copy.deepcopy(final_state),
+                    scope=cache_scope,
+                    text=message
+                )
+
             return final_state
 
         except Exception as e:
-            print(f"Forum 讨论过程中发生错误：{e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Forum 讨论过程中发生错误：%s", e)
             raise
 
     async def evaluate_answer(
@@ -192,6 +296,9 @@ class ForumAgent:
         """
         评价完整的面试会话（处理 InterviewAgent 的 messages 列表）
 
+        等待 aiter_interview_session 全部产出后汇总为一个结果，
+        需要逐条获取评价结果时请直接使用 aiter_interview_session
+
         Args:
             messages: InterviewAgent 的消息列表 [AIMessage, HumanMessage, AIMessage, HumanMessage, ...]
             interview_context: 面试上下文（公司、岗位、难度等）
@@ -228,66 +335,121 @@ class ForumAgent:
                 }
             }
         """
-        print("\n" + "="*80)
-        print("Forum Agent - 面试会话评价")
-        print("="*80)
+        result: Dict[str, Any] = {"qa_evaluations": []}
+
+        async for event in self.aiter_interview_session(messages, interview_context):
+            result["session_id"] = event["session_id"]
+            if event["type"] == "qa_result":
+                result["qa_evaluations"].append(event["data"])
+            elif event["type"] == "overall":
+                result["overall_evaluation"] = event["data"]
+            elif event["type"] == "statistics":
+                result["statistics"] = event["data"]
+
+        # 产出顺序为完成顺序，汇总结果按 QA 原始顺序排列
+        result["qa_evaluations"].sort(key=lambda qa: qa["qa_index"])
+        return result
+
+    async def aiter_interview_session(
+        self,
+        messages: List,
+        interview_context: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        流式评价完整的面试会话，每个 QA 评价完成后立即产出
 
-        session_start_time = time.time()
+        Args:
+            messages: InterviewAgent 的消息列表 [AIMessage, HumanMessage, AIMessage, HumanMessage, ...]
+            interview_context: 面试上下文（公司、岗位、难度等）
+
+        Yields:
+            按以下顺序产出事件（data 的结构同 evaluate_interview_session 返回值中对应字段）：
+            - {"type": "qa_result", "session_id": ..., "data": {...}}   每个 QA 一条，按完成顺序
+            - {"type": "overall", "session_id": ..., "data": {...}}     总体评价
+            - {"type": "statistics", "session_id": ..., "data": {...}}  统计信息
+        """
+        verbose = logger.isEnabledFor(logging.INFO)
+        if verbose:
+            logger.info("\n%s\nForum Agent - 面试会话评价\n%s", BAR, BAR)
+
+        session_start_time = time.perf_counter()
         session_id = self._generate_session_id()
 
         # 1. 提取 QA 对
-        print("\n[步骤1] 从 messages 中提取 QA 对...")
+        logger.info("\n[步骤1] 从 messages 中提取 QA 对...")
         qa_pairs = self._extract_qa_pairs(messages)
-        print(f"[OK] 提取到 {len(qa_pairs)} 个 QA 对")
+        logger.info("[OK] 提取到 %d 个 QA 对", len(qa_pairs))
 
-        # 2. 逐个评价每个 QA 对
-        print("\n[步骤2] 逐个评价每个 QA 对...")
-        qa_evaluations = []
+        # 2. 并发评价每个 QA 对（各 QA 相互独立，Critic Agent 无跨调用状态，可共享）
+        logger.info("\n[步骤2] 并发评价 QA 对（并发上限: %d）...", self.max_concurrency)
         total_tokens = 0
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        discussion_records: List[Optional[Dict[str, Any]]] = [None] * len(qa_pairs)
+
+        async def _evaluate_one(index: int, qa: Dict[str, str]) -> Dict[str, Any]:
+            async with semaphore:
+                if verbose:
+                    logger.info(
+                        "\n%s\n评价第 %d/%d 个 QA 对\n%s\n问题: %s...\n回答: %s...",
+                        BAR, index + 1, len(qa_pairs), BAR,
+                        qa['question'][:60], qa['answer'][:60]
+                    )
+
+                qa_start_time = time.perf_counter()
+
+                # 调用单条评价
+                result = await self.run_discussion(
+                    question=qa['question'],
+                    user_answer=qa['answer'],
+                    interview_context=interview_context,
+                    skip_save=True
+                )
+
+                qa_duration = time.perf_counter() - qa_start_time
+                logger.debug("\n[OK] 第 %d 个 QA 评价完成 | 耗时: %.2fs", index + 1, qa_duration)
+
+                discussion_records[index] = result.get('discussion_record')
+
+                return {
+                    "qa_index": index,
+                    "question": qa['question'],
+                    "answer": qa['answer'],
+                    "rag_comment": result.get('rag_critic_comment'),
+                    "web_comment": result.get('web_critic_comment'),
+                    "evaluation": result.get('final_evaluation'),
+                    "duration": qa_duration
+                }
 
-        for i, qa in enumerate(qa_pairs, 1):
-            print(f"\n{'='*80}")
-            print(f"评价第 {i}/{len(qa_pairs)} 个 QA 对")
-            print(f"{'='*80}")
-            print(f"问题: {qa['question'][:60]}...")
-            print(f"回答: {qa['answer'][:60]}...")
-
-            qa_start_time = time.time()
-
-            # 调用单条评价
-            result = await self.run_discussion(
-                question=qa['question'],
-                user_answer=qa['answer'],
-                interview_context=interview_context
-            )
-
-            qa_duration = time.time() - qa_start_time
-
-            # 收集评价结果
-            qa_evaluations.append({
-                "qa_index": i - 1,
-                "question": qa['question'],
-                "answer": qa['answer'],
-                "rag_comment": result.get('rag_critic_comment'),
-                "web_comment": result.get('web_critic_comment'),
-                "evaluation": result.get('final_evaluation'),
-                "duration": qa_duration
-            })
+        tasks = [asyncio.ensure_future(_evaluate_one(i, qa)) for i, qa in enumerate(qa_pairs)]
+        qa_evaluations: List[Optional[Dict[str, Any]]] = [None] * len(qa_pairs)
 
-            print(f"\n[OK] 第 {i} 个 QA 评价完成 | 耗时: {qa_duration:.2f}s")
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                qa_evaluation = await next_done
+                qa_evaluations[qa_evaluation["qa_index"]] = qa_evaluation
+                yield {"type": "qa_result", "session_id": session_id, "data": qa_evaluation}
+        finally:
+            # 调用方提前停止迭代或出错时，取消尚未完成的评价
+            for task in tasks:
+                task.cancel()
+
+        # 批量保存所有 QA 的讨论记录（一次数据库往返）
+        await self.db.insert_forum_discussions_bulk(
+            [record for record in discussion_records if record]
+        )
 
-        # 3. 生成总体评价
-        print(f"\n{'='*80}")
-        print("[步骤3] 生成总体评价...")
-        print(f"{'='*80}")
+        # 3. 生成总体评价（按 QA 原始顺序）
+        if verbose:
+            logger.info("\n%s\n[步骤3] 生成总体评价...\n%s", BAR, BAR)
 
         overall_evaluation = await self.moderator.generate_overall_evaluation(
             qa_evaluations=qa_evaluations,
             interview_context=interview_context or {}
         )
+        yield {"type": "overall", "session_id": session_id, "data": overall_evaluation}
 
         # 4. 计算统计信息
-        session_duration = time.time() - session_start_time
+        session_duration = time.perf_counter() - session_start_time
         scores = [
             qa['evaluation'].get('overall_score', 0)
             for qa in qa_evaluations
@@ -302,23 +464,20 @@ class ForumAgent:
             "total_tokens": total_tokens  # TODO: 累计 token 统计
         }
 
-        print(f"\n{'='*80}")
-        print("[完成] 面试会话评价完成")
-        print(f"{'='*80}")
-        print(f"总问题数: {statistics['total_questions']}")
-        print(f"平均得分: {statistics['average_score']}/10")
-        print(f"总耗时: {statistics['total_time']:.2f}s")
-        print(f"{'='*80}\n")
+        if verbose:
+            logger.info(
+                "\n%s\n[完成] 面试会话评价完成\n%s\n总问题数: %d\n平均得分: %s/10\n总耗时: %.2fs\n%s\n",
+                BAR, BAR,
+                statistics['total_questions'],
+                statistics['average_score'],
+                statistics['total_time'],
+                BAR
+            )
 
         # 5. 保存到数据库（可选）
         # TODO: 保存 overall_evaluation 到数据库
 
-        return {
-            "session_id": session_id,
-            "qa_evaluations": qa_evaluations,
-            "overall_evaluation": overall_evaluation,
-            "statistics": statistics
-        }
+        yield {"type": "statistics", "session_id": session_id, "data": statistics}
 
     def _extract_qa_pairs(self, messages: List) -> List[Dict[str, str]]:
         """
@@ -338,10 +497,11 @@ class ForumAgent:
         current_question = None
 
         for msg in messages:
-            if isinstance(msg, AIMessage):
+            msg_type = getattr(msg, "type", None)
+            if msg_type == "ai":
                 # 面试官的问题
                 current_question = msg.content
-            elif isinstance(msg, HumanMessage):
+            elif msg_type == "human":
                 # 候选人的回答
                 if current_question:
                     qa_pairs.append({
@@ -360,6 +520,8 @@ def main():
     import os
     import asyncio
 
+    setup_logging()
+
     # 从环境变量获取 API Key
     api_key = os.getenv("OPENAI_API_KEY")
     model_name = os.getenv("OPENAI_MODEL")
@@ -0,0 +1,185 @@
+"""
+Forum 语义缓存
+对语义相近的 (问题, 回答) 复用已有的讨论结果，避免重复运行三个 Agent
+"""
+
+from typing import Dict, Any, Optional, List, Tuple
+from collections import OrderedDict
+import itertools
+import numpy as np
+
+
+class ForumSemanticCache:
+    """
+    Forum 讨论结果的近似缓存
+
+    以 (问题, 回答) 的向量为键，余弦距离在阈值内即视为命中；
+    不同的 scope（如不同的面试上下文）互不共享缓存。
+    可选使用问题文本的 Jaccard 相似度做二次校验，防止向量误命中。
+
+    使用随机投影 LSH 建立多张哈希表，查询时只对同桶候选计算精确余弦，
+    避免随缓存规模线性增长的全量扫描。
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.05,
+        max_entries: int = 4096,
+        jaccard_threshold: Optional[float] = 0.5,
+        dim: int = 1024,
+        num_bits: int = 16,
+        num_tables: int = 8,
+        seed: int = 42
+    ):
+        """
+        初始化语义缓存
+
+        Args:
+            threshold: 命中的最大余弦距离（默认 0.05）
+            max_entries: 最大缓存条目数，超出后淘汰最早的条目
+            jaccard_threshold: 文本 Jaccard 相似度下限（None 表示不做文本校验）
+            dim: 向量维度（默认 1024）
+            num_bits: 每张哈希表的投影位数，越大候选越少、召回越低（默认 16）
+            num_tables: 哈希表数量，越多召回越高（默认 8）
+            seed: 随机投影矩阵的随机种子
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.jaccard_threshold = jaccard_threshold
+
+        rng = np.random.default_rng(seed)
+        self._planes = [
+            rng.standard_normal((num_bits, dim)).astype(np.float32)
+            for _ in range(num_tables)
+        ]
+        # 每张表：(scope, 桶键) -> 条目 ID 列表
+        self._tables: List[Dict[Tuple[str, bytes], List[int]]] = [{} for _ in range(num_tables)]
+        # 条目 ID -> (scope, 桶键列表, 单位向量, 文本, 结果)，按插入顺序排列便于淘汰
+        self._entries: "OrderedDict[int, Tuple[str, List[bytes], np.ndarray, str, Any]]" = OrderedDict()
+        self._ids = itertools.count()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(
+        self,
+        q_vec: List[float],
+        scope: str = "",
+        text: Optional[str] = None
+    ) -> Optional[Any]:
+        """
+        查询缓存
+
+        Args:
+            q_vec: 查询向量
+            scope: 缓存作用域
+            text: 查询文本（用于 Jaccard 校验）
+
+        Returns:
+            命中时返回缓存的结果，否则返回 None
+        """
+        vec = self._normalize(q_vec)
+
+        # 合并所有哈希表中同桶的候选
+        candidates = set()
+        for table, bucket in zip(self._tables, self._hash(vec)):
+            candidates.update(table.get((scope, bucket), ()))
+
+        if not candidates:
+            self.misses += 1
+            return None
+
+        candidate_ids = list(candidates)
+        matrix = np.stack([self._entries[i][2] for i in candidate_ids])
+        similarities = matrix @ vec
+        best = int(np.argmax(similarities))
+
+        if 1.0 - float(similarities[best]) > self.threshold:
+            self.misses += 1
+            return None
+
+        _, _, _, cached_text, payload = self._entries[candidate_ids[best]]
+        if (
+            self.jaccard_threshold is not None
+            and text is not None
+            and self._jaccard(text, cached_text) < self.jaccard_threshold
+        ):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return payload
+
+    def insert(
+        self,
+        q_vec: List[float],
+        result: Any,
+        scope: str = "",
+        text: str = ""
+    ) -> None:
+        """
+        写入缓存
+
+        Args:
+            q_vec: 查询向量
+            result: 需要缓存的结果
+            scope: 缓存作用域
+            text: 查询文本（用于 Jaccard 校验）
+        """
+        vec = self._normalize(q_vec)
+        buckets = self._hash(vec)
+        entry_id = next(self._ids)
+
+        for table, bucket in zip(self._tables, buckets):
+            table.setdefault((scope, bucket), []).append(entry_id)
+        self._entries[entry_id] = (scope, buckets, vec, text, result)
+
+        while len(self._entries) > self.max_entries:
+            self._evict_oldest()
+
+    def clear(self) -> None:
+        """清空缓存"""
+        for table in self._tables:
+            table.clear()
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存统计信息"""
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+    def _evict_oldest(self) -> None:
+        """淘汰最早插入的条目"""
+        entry_id, (scope, buckets, _, _, _) = self._entries.popitem(last=False)
+        for table, bucket in zip(self._tables, buckets):
+            ids = table.get((scope, bucket))
+            if ids is None:
+                continue
+            ids.remove(entry_id)
+            if not ids:
+                del table[(scope, bucket)]
+        self.evictions += 1
+
+    def _hash(self, vec: np.ndarray) -> List[bytes]:
+        """计算向量在每张哈希表中的桶键（投影符号位打包）"""
+        return [np.packbits(planes @ vec > 0).tobytes() for planes in self._planes]
+
+    @staticmethod
+    def _normalize(vec: List[float]) -> np.ndarray:
+        """归一化为单位向量（float32）"""
+        arr = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(arr)
+        return arr / norm if norm > 0 else arr
+
+    @staticmethod
+    def _jaccard(a: str, b: str) -> float:
+        """基于字符二元组的 Jaccard 相似度"""
+        grams_a = {a[i:i + 2] for i in range(len(a) - 1)} or {a}
+        grams_b = {b[i:i + 2] for i in range(len(b) - 1)} or {b}
+        return len(grams_a & grams_b) / len(grams_a | grams_b)
@@ -3,58 +3,57 @@ Forum Graph 图构建
 协调 RAGCriticAgent、WebCriticAgent、ModeratorAgent
 """
 
+from functools import lru_cache
 from langgraph.graph import StateGraph, END
 from .state import ForumState
 from .nodes import ForumNodes
-from RAGCriticAgent import RAGCriticAgent
-from WebCriticAgent import WebCriticAgent
-from ModeratorAgent import ModeratorAgent
 
 
-def buildGraph(
-    rag_critic_agent: RAGCriticAgent,
-    web_critic_agent: WebCriticAgent,
-    moderator_agent: ModeratorAgent
-):
+@lru_cache(maxsize=1)
+def buildGraph():
     """
     构建 Forum Agent 图
 
-    Args:
-        rag_critic_agent: RAG Critic Agent 实例
-        web_critic_agent: Web Critic Agent 实例
-        moderator_agent: Moderator Agent 实例
+    图结构与具体 Agent 无关，整个进程只编译一次（图上不做节点级缓存：编译后的图被所有 ForumAgent 共享，
+    结果复用由各自的 ModeratorAgent 按 LLM 温度决定是否开启）；
+    运行时通过 config 传入 Agent 实例：
+        graph.ainvoke(state, config={"configurable": {
+            "rag_critic": ..., "web_critic": ..., "moderator": ..., "db": ...
+        }})
 
     Returns:
         编译后的图
     """
-    nodes = ForumNodes(
-        rag_critic_agent=rag_critic_agent,
-        web_critic_agent=web_critic_agent,
-        moderator_agent=moderator_agent
-    )
+    nodes = ForumNodes()
 
     builder = StateGraph(ForumState)
 
     # 添加节点
+    builder.add_node("start_round", nodes.start_round_node)
     builder.add_node("rag_critic", nodes.rag_critic_node)
     builder.add_node("web_critic", nodes.web_critic_node)
+    builder.add_node("await_critics", nodes.await_critics_node)
     builder.add_node("moderator_decide", nodes.moderator_decide_node)
     builder.add_node("moderator_summarize", nodes.moderator_summarize_node)
     builder.add_node("save", nodes.save_discussion_node)
 
     # 添加边
-    # RAG Critic → Web Critic
-    builder.add_edge("rag_critic", "web_critic")
+    # Start Round → RAG Critic / Web Critic（并行执行，两者写入互不冲突的字段）
+    builder.add_edge("start_round", "rag_critic")
+    builder.add_edge("start_round", "web_critic")
+
+    # RAG Critic + Web Critic → Await Critics（等待两位 Critic 都完成）
+    builder.add_edge(["rag_critic", "web_critic"], "await_critics")
 
-    # Web Critic → Moderator Decide
-    builder.add_edge("web_critic", "moderator_decide")
+    # Await Critics → Moderator Decide
+    builder.add_edge("await_critics", "moderator_decide")
 
     # Moderator Decide → 条件边（根据 should_continue 决定）
     builder.add_conditional_edges(
         "moderator_decide",
         nodes.decide_next_step,
         {
-            "rag_critic": "rag_critic",  # 继续下一轮
+            "rag_critic": "start_round",  # 继续下一轮（两位 Critic 再次并行发言）
             "moderator_summarize": "moderator_summarize",  # 结束讨论，生成最终评价
             "end": END
         }
@@ -67,6 +66,6 @@ def buildGraph(
     builder.add_edge("save", END)
 
     # 设置入口点
-    builder.set_entry_point("rag_critic")
+    builder.set_entry_point("start_round")
 
     return builder.compile()
@@ -5,95 +5,140 @@ Forum Graph 节点定义
 
 from .state import ForumState
 from typing import Dict, Any
+import logging
+from langchain_core.runnables import RunnableConfig
 from RAGCriticAgent import RAGCriticAgent
 from WebCriticAgent import WebCriticAgent
 from ModeratorAgent import ModeratorAgent
+from storage.database.postgresql import PostgreSQLDatabase
+from common import parse_message
+from ..logging_utils import LOGGER_NAME
+
+
+logger = logging.getLogger(LOGGER_NAME)
+
+# Moderator 决策会写入的字段（节点只返回自己写入的字段，不回写会话 ID、message 等输入字段）
+_DECISION_FIELDS = (
+    "should_continue", "next_step", "current_speaker", "current_round",
+    "discussion_history", "rag_critic_comment", "web_critic_comment"
+)
 
 
 class ForumNodes:
-    """Forum 节点类，封装所有节点逻辑"""
+    """
+    Forum 节点类，封装所有节点逻辑
 
-    def __init__(
-        self,
-        rag_critic_agent: RAGCriticAgent,
-        web_critic_agent: WebCriticAgent,
-        moderator_agent: ModeratorAgent,
-        agent_name: str = "ForumAgent"
-    ):
+    节点本身不持有 Agent 实例，运行时从 config["configurable"] 中读取：
+    - rag_critic: RAGCriticAgent
+    - web_critic: WebCriticAgent
+    - moderator: ModeratorAgent
+    - db: PostgreSQLDatabase
+    这样编译后的图与具体的 Agent 解耦，可在进程内复用。
+    """
+
+    def __init__(self, agent_name: str = "ForumAgent"):
         """
         初始化 Forum 节点
 
         Args:
-            rag_critic_agent: RAG Critic Agent 实例
-            web_critic_agent: Web Critic Agent 实例
-            moderator_agent: Moderator Agent 实例
             agent_name: Agent 名称，用于日志记录
         """
-        self.rag_critic = rag_critic_agent
-        self.web_critic = web_critic_agent
-        self.moderator = moderator_agent
         self.agent_name = agent_name
 
-    async def rag_critic_node(self, state: ForumState) -> Dict[str, Any]:
+    @staticmethod
+    def _rag_critic(config: RunnableConfig) -> RAGCriticAgent:
+        """从 config 中获取 RAG Critic Agent"""
+        return config["configurable"]["rag_critic"]
+
+    @staticmethod
+    def _web_critic(config: RunnableConfig) -> WebCriticAgent:
+        """从 config 中获取 Web Critic Agent"""
+        return config["configurable"]["web_critic"]
+
+    @staticmethod
+    def _moderator(config: RunnableConfig) -> ModeratorAgent:
+        """从 config 中获取 Moderator Agent"""
+        return config["configurable"]["moderator"]
+
+    @staticmethod
+    def _db(config: RunnableConfig) -> PostgreSQLDatabase:
+        """从 config 中获取 PostgreSQL 数据库实例"""
+        return config["configurable"]["db"]
+
+    async def start_round_node(self, state: ForumState) -> Dict[str, Any]:
+        """
+        轮次起始节点
+
+        作为并行分支的扇出点，RAG Critic 和 Web Critic 从这里同时开始
+        """
+        return {"current_speaker": "moderator"}
+
+    async def rag_critic_node(self, state: ForumState, config: RunnableConfig) -> Dict[str, Any]:
         """
         RAG Critic 节点
 
         调用 RAGCriticAgent 生成基于历史面经的评论
         """
         # 直接传递 state 给 RAG Critic Agent
-        updated_state = await self.rag_critic.run(state)
+        updated_state = await self._rag_critic(config).run(state)
 
-        # 返回更新后的字段
+        # 返回更新后的字段（与 Web Critic 并行，只写自己的字段）
         return {
-            "rag_critic_comment": updated_state.get("rag_critic_comment"),
-            "current_speaker": "rag_critic"
+            "rag_critic_comment": updated_state.get("rag_critic_comment")
         }
 
-    async def web_critic_node(self, state: ForumState) -> Dict[str, Any]:
+    async def web_critic_node(self, state: ForumState, config: RunnableConfig) -> Dict[str, Any]:
         """
         Web Critic 节点
 
         调用 WebCriticAgent 生成基于网络搜索的评论
         """
         # 直接传递 state 给 Web Critic Agent
-        updated_state = await self.web_critic.run(state)
+        updated_state = await self._web_critic(config).run(state)
 
-        # 返回更新后的字段
+        # 返回更新后的字段（与 RAG Critic 并行，只写自己的字段）
         return {
-            "web_critic_comment": updated_state.get("web_critic_comment"),
-            "current_speaker": "web_critic"
+            "web_critic_comment": updated_state.get("web_critic_comment")
         }
 
-    async def moderator_decide_node(self, state: ForumState) -> Dict[str, Any]:
+    async def await_critics_node(self, state: ForumState) -> Dict[str, Any]:
+        """
+        Critic 汇合节点
+
+        等待 RAG Critic 和 Web Critic 都完成后再交给 Moderator 决策
+        """
+        return {"current_speaker": "web_critic"}
+
+    async def moderator_decide_node(self, state: ForumState, config: RunnableConfig) -> Dict[str, Any]:
         """
         Moderator 决策节点
 
         决定是否继续下一轮讨论
         """
-        result = await self.moderator.decide_next_step(state)
-        return result
+        result = await self._moderator(config).decide_next_step(state)
+        return {field: result.get(field) for field in _DECISION_FIELDS}
 
-    async def moderator_summarize_node(self, state: ForumState) -> Dict[str, Any]:
+    async def moderator_summarize_node(self, state: ForumState, config: RunnableConfig) -> Dict[str, Any]:
         """
         Moderator 总结节点
 
         生成最终评价
         """
-        result = await self.moderator.generate_final_evaluation(state)
-        return result
+        result = await self._moderator(config).generate_final_evaluation(state)
+        return {
+            "final_evaluation": result.get("final_evaluation"),
+            "next_step": result.get("next_step")
+        }
 
-    async def save_discussion_node(self, state: ForumState) -> Dict[str, Any]:
+    async def save_discussion_node(self, state: ForumState, config: RunnableConfig) -> Dict[str, Any]:
         """
         保存讨论节点
 
-        将讨论结果保存到数据库
+        将讨论结果保存到数据库（skip_save 为 True 时只生成记录，不写库）
         """
-        from storage.database.postgresql import PostgreSQLDatabase
-        from config import get_config
-
         # 从state中提取信息
         message = state.get("message", "")
-        question, user_answer = self._parse_message(message)
+        question, user_answer = parse_message(message)
 
         # 构造讨论记录
         discussion = {
@@ -112,25 +157,22 @@ class ForumNodes:
             }
         }
 
-        # 保存到数据库
-        config = get_config()
-        db_url = (
-            f"postgresql://{config.get('POSTGRES_USER')}:{config.get('POSTGRES_PASSWORD')}@"
-            f"{config.get('POSTGRES_HOST')}:{config.get('POSTGRES_PORT')}/{config.get('POSTGRES_DB')}"
-        )
-        db = PostgreSQLDatabase(db_url)
-        await db.connect()
-
-        try:
-            discussion_id = await db.insert_forum_discussion(discussion)
-            print(f"[OK] Forum讨论已保存，ID: {discussion_id}")
-
+        # 会话批量评价时跳过单条保存，由调用方统一批量写入
+        if state.get("skip_save"):
             return {
-                "discussion_id": discussion_id,
+                "discussion_record": discussion,
                 "next_step": "end"
             }
-        finally:
-            await db.close()
+
+        # 保存到数据库（复用共享连接池，不再每次新建连接）
+        discussion_id = await self._db(config).insert_forum_discussion(discussion)
+        logger.info("[OK] Forum讨论已保存，ID: %s", discussion_id)
+
+        return {
+            "discussion_id": discussion_id,
+            "discussion_record": discussion,
+            "next_step": "end"
+        }
 
     def decide_next_step(self, state: ForumState) -> str:
         """
@@ -141,11 +183,9 @@ class ForumNodes:
         """
         next_step = state.get("next_step", "end")
 
-        # 根据 next_step 决定路由
-        if next_step == "rag_critic":
+        # 根据 next_step 决定路由（新一轮两位 Critic 由 start_round 并行启动，不单独路由到某一位）
+        if next_step in ("rag_critic", "web_critic"):
             return "rag_critic"
-        elif next_step == "web_critic":
-            return "web_critic"
         elif next_step == "moderator_decide":
             return "moderator_decide"
         elif next_step == "moderator_summarize":
@@ -154,27 +194,3 @@ class ForumNodes:
             return "save"
         else:
             return "end"
-
-    def _parse_message(self, message: str) -> tuple:
-        """
-        从 message 中提取问题和用户回答
-
-        Args:
-            message: 历史消息字符串
-
-        Returns:
-            (question, user_answer) 元组
-        """
-        lines = message.strip().split('\n')
-
-        question = None
-        user_answer = None
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("面试官：") or line.startswith("AI："):
-                question = line.split("：", 1)[1].strip()
-            elif line.startswith("用户：") or line.startswith("候选人："):
-                user_answer = line.split("：", 1)[1].strip()
-
-        return question, user_answer
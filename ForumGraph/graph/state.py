@@ -60,8 +60,7 @@ class ForumState(TypedDict):
     # ==================== 控制信号 ====================
     next_step: str  # 下一步动作
     # 可能值：
-    # - "rag_critic": RAG Critic发言
-    # - "web_critic": Web Critic发言
+    # - "rag_critic": 开始新一轮（RAG Critic 和 Web Critic 并行发言）
     # - "moderator_decide": Moderator决定是否继续
     # - "moderator_summarize": Moderator汇总评价
     # - "save": 保存到数据库
@@ -69,5 +68,10 @@ class ForumState(TypedDict):
 
     should_continue: bool  # Moderator的决策：是否继续下一轮
 
+    # ==================== 持久化 ====================
+    skip_save: bool  # 是否跳过单条保存（会话评价时由调用方批量写入）
+    discussion_record: Optional[Dict[str, Any]]  # 待保存/已保存的讨论记录
+    discussion_id: Optional[str]  # 已保存的讨论记录ID
+
     # ==================== 元数据 ====================
     metadata: Optional[Dict[str, Any]]  # 其他元数据（token使用、耗时等）
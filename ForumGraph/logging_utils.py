@@ -0,0 +1,49 @@
+"""
+Forum 日志工具
+日志经 QueueHandler 投递到后台线程写出，避免在事件循环中同步写 stdout
+"""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+# Forum 模块统一使用的 logger 名称
+LOGGER_NAME = "ForumAgent"
+
+# 日志分隔线
+BAR = "=" * 80
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: int = logging.INFO) -> logging.Logger:
+    """
+    为 Forum logger 配置异步输出（重复调用只会调整日志级别）
+
+    Args:
+        level: 日志级别（默认 INFO）
+
+    Returns:
+        配置好的 logger
+    """
+    global _listener
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level)
+
+    if _listener is None:
+        log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+        _listener = QueueListener(log_queue, stream_handler)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+        logger.addHandler(QueueHandler(log_queue))
+        logger.propagate = False
+
+    return logger
@@ -6,6 +6,7 @@
 import uuid
 import sys
 import os
+import asyncio
 from typing import Dict, Any, Optional
 from .llms.base import BaseLLM
 from .graph.graph import buildGraph
@@ -19,7 +20,7 @@ from config import get_config
 class InterviewAgent:
     """面试 Agent 主类"""
 
-    def __init__(self, llm: BaseLLM, user_id: Optional[str] = None, think_max_num: Optional[int] = None, deep_question_max_num: Optional[int] = None):
+    def __init__(self, llm: BaseLLM, user_id: Optional[str] = None, think_max_num: Optional[int] = None, deep_question_max_num: Optional[int] = None, think_candidates: Optional[int] = None, plan_candidates: Optional[int] = None, compress_context_chars: Optional[int] = None):
         """
         初始化面试 Agent
 
@@ -28,6 +29,9 @@ class InterviewAgent:
             user_id: 用户 ID（可选，默认生成随机 ID）
             think_max_num: 思考最大轮次（可选，默认从配置读取）
             deep_question_max_num: 追问最大次数（可选，默认从配置读取）
+            think_candidates: 每轮思考 + 反思的候选数量（可选，默认从配置读取）
+            plan_candidates: 问题列表的候选方案数量（可选，默认从配置读取）
+            compress_context_chars: 简历 + JD 超过该字数时先压缩（可选，默认从配置读取，配置为 0 表示不压缩）
         """
         self.llm = llm
         self.user_id = user_id or self._generate_user_id()
@@ -38,10 +42,26 @@ class InterviewAgent:
             think_max_num = config.get('THINK_MAX_NUM', 3)
         if deep_question_max_num is None:
             deep_question_max_num = config.get('DEEP_QUESTION_MAX_NUM', 3)
+        if think_candidates is None:
+            think_candidates = config.get('THINK_CANDIDATES', 1)
+        if plan_candidates is None:
+            plan_candidates = config.get('PLAN_CANDIDATES', 1)
+        if compress_context_chars is None:
+            compress_context_chars = config.get('COMPRESS_CONTEXT_CHARS', 2000) or None
 
         self.think_max_num = think_max_num
         self.deep_question_max_num = deep_question_max_num
-        self.graph = buildGraph(llm, think_max_num=think_max_num, deep_question_max_num=deep_question_max_num)
+        self.think_candidates = think_candidates
+        self.plan_candidates = plan_candidates
+        self.compress_context_chars = compress_context_chars
+        self.graph = buildGraph(
+            llm,
+            think_max_num=think_max_num,
+            deep_question_max_num=deep_question_max_num,
+            think_candidates=think_candidates,
+            plan_candidates=plan_candidates,
+            compress_context_chars=compress_context_chars
+        )
         self.current_state: Optional[InterviewState] = None
 
     @staticmethod
@@ -120,14 +140,18 @@ class InterviewAgent:
             "user_id": self.user_id,
             "jd_info": interview_info["jd_info"],
             "resume_info": interview_info["resume_info"],
+            "resume_summary": "",
+            "jd_summary": "",
             "mode": interview_info["mode"],
             "difficulty": interview_info["difficulty"],
             "main_question_index":0,
             "question_plan": [],
             "current_question": {},
             "messages": [],
+            "last_user_answer": None,
             "next_step": "",
             "deep_index": 0,
+            "question_streamed": False,
             "deep_questions": [],
             "thinking_result": {},
             "thinking_process": [],
@@ -145,6 +169,17 @@ class InterviewAgent:
         if interview_info is None:
             interview_info = self.collect_interview_info()
 
+        return asyncio.run(self.arun_interview(interview_info))
+
+    async def arun_interview(self, interview_info: Dict[str, Any]):
+        """
+        异步运行完整的面试流程（流式交互）
+
+        图中的节点均为异步节点，judge 在一次 LLM 调用中同时完成思考和反思
+
+        Args:
+            interview_info: 面试信息（JD、简历、模式、难度）
+        """
         # 创建初始状态
         initial_state = self.create_initial_state(interview_info)
 
@@ -160,7 +195,7 @@ class InterviewAgent:
 
             # 使用 stream 的 mode="values" 来获取完整的 state
             final_state = None
-            for state_snapshot in self.graph.stream(initial_state, config=config, stream_mode="values"):
+            async for state_snapshot in self.graph.astream(initial_state, config=config, stream_mode="values"):
                 # state_snapshot 是完整的 state
                 final_state = state_snapshot
 
@@ -188,6 +223,16 @@ def main():
     """命令行交互式面试入口"""
     from .llms.openai_llm import OpenAILLM
     import os
+    import sys
+    import asyncio
+
+    # 非 Windows 平台使用 uvloop 作为事件循环（未安装时回退到标准库实现）
+    if sys.platform != "win32":
+        try:
+            import uvloop
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        except ImportError:
+            pass
 
     # 从环境变量获取 API Key
     api_key = os.getenv("OPENAI_API_KEY")
@@ -203,7 +248,9 @@ def main():
         api_key=api_key,
         model_name=model_name,
         temperature=0.7,
-        base_url=base_url
+        base_url=base_url,
+        # 服务端支持 Structured Outputs 时开启约束解码
+        structured_output=os.getenv("OPENAI_STRUCTURED_OUTPUT") == "1"
     )
 
     # 创建 Agent
@@ -6,7 +6,7 @@ class YEmbedding(Embeddings):
 
     def __init__(self) -> None:
         super().__init__()
-        self.model = BGEM3FlagModel('BAAI/bge-large-zh-v1.5', 
+        self.model = BGEM3FlagModel('BAAI/bge-m3', 
                   query_instruction_for_retrieval="为这个句子生成表示以用于检索相关文章：",
                   use_fp16=True,
                   cache_dir="./models")
@@ -1,10 +1,13 @@
+from functools import lru_cache
+from typing import Optional
 from langgraph.graph import StateGraph
 from .state import InterviewState
 from .nodes import InterviewNodes
 from ..llms.base import BaseLLM
 
 
-def buildGraph(llm: BaseLLM, think_max_num: int = 3, deep_question_max_num: int = 3):
+@lru_cache(maxsize=32)
+def buildGraph(llm: BaseLLM, think_max_num: int = 3, deep_question_max_num: int = 3, think_candidates: int = 1, plan_candidates: int = 1, compress_context_chars: Optional[int] = 2000):
     """
     构建面试 Agent 图
 
@@ -12,47 +15,56 @@ def buildGraph(llm: BaseLLM, think_max_num: int = 3, deep_question_max_num: int
         llm: LLM 实例
         think_max_num: 思考最大轮次，默认 3
         deep_question_max_num: 追问最大次数，默认 3
+        think_candidates: 每轮思考 + 反思的候选数量，默认 1
+        plan_candidates: 问题列表的候选方案数量，默认 1
+        compress_context_chars: 简历 + JD 超过该字数时先压缩，None 表示不压缩，默认 2000
 
     Returns:
         编译后的图
+
+    编译结果按 (llm 实例, 各参数) 缓存，相同配置的会话复用同一个编译后的图；
+    节点实例随图共享，节点内的缓存在这些会话之间共用，投机任务按 session_id 分开保存
     """
-    nodes = InterviewNodes(llm, think_max_num=think_max_num, deep_question_max_num=deep_question_max_num)
+    nodes = InterviewNodes(
+        llm,
+        think_max_num=think_max_num,
+        deep_question_max_num=deep_question_max_num,
+        think_candidates=think_candidates,
+        plan_candidates=plan_candidates,
+        compress_context_chars=compress_context_chars
+    )
     builder = StateGraph(InterviewState)
 
     # 添加节点
     builder.add_node("messageInput", nodes.message_input)
+    builder.add_node("contextCompress", nodes.context_compress)
     builder.add_node("questionBuild", nodes.question_build)
-    builder.add_node("questionBuildThink", nodes.think)
     builder.add_node("questionJudge", nodes.judge)
     builder.add_node("questionOutput", nodes.question_output)
     builder.add_node("nextStep", nodes.next_step)
     builder.add_node("adjustQuestion", nodes.adjust_question)
-    builder.add_node("adjustQuestionThink", nodes.think)
     builder.add_node("adjustQuestionJudge", nodes.judge)
     builder.add_node("deepQuestion", nodes.deep_question)
-    builder.add_node("deepQuestionThink", nodes.think)
     builder.add_node("deepQuestionJudge", nodes.judge)
     builder.add_node("deepQuestionOutput", nodes.deep_question_output)
     builder.add_node("userInput", nodes.user_input)
     builder.add_node("end", nodes.end)
 
     # ========== 主流程边 ==========
-    builder.add_edge("messageInput", "questionBuild")
-    builder.add_edge("questionBuild", "questionBuildThink")
-    builder.add_edge("questionBuildThink", "questionJudge")
+    builder.add_edge("messageInput", "contextCompress")
+    builder.add_edge("contextCompress", "questionBuild")
+    builder.add_edge("questionBuild", "questionJudge")
     builder.add_conditional_edges("questionJudge", nodes.judge_res)
     builder.add_edge("questionOutput", "userInput")
     builder.add_edge("userInput", "nextStep")
     builder.add_conditional_edges("nextStep", nodes.next_step_decision)
 
     # ========== 调整问题分支 ==========
-    builder.add_edge("adjustQuestion", "adjustQuestionThink")
-    builder.add_edge("adjustQuestionThink", "adjustQuestionJudge")
+    builder.add_edge("adjustQuestion", "adjustQuestionJudge")
     builder.add_conditional_edges("adjustQuestionJudge", nodes.judge_res)
 
     # ========== 追问分支 ==========
-    builder.add_edge("deepQuestion", "deepQuestionThink")
-    builder.add_edge("deepQuestionThink", "deepQuestionJudge")
+    builder.add_edge("deepQuestion", "deepQuestionJudge")
     builder.add_conditional_edges("deepQuestionJudge", nodes.judge_res)
     builder.add_edge("deepQuestionOutput", "userInput")
 
@@ -2,15 +2,61 @@ from .state import InterviewState
 from ..prompt.prompt import *
 from ..llms.base import BaseLLM
 from ..utils.logger import log_node_content, log_token_usage, logger
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from langchain_core.messages import HumanMessage,AIMessage
+from collections import OrderedDict
+from functools import lru_cache
+from hashlib import blake2b
+from string import Formatter
+import asyncio
+import json
 import time
 
 
+@lru_cache(maxsize=None)
+def _compile_template(template: str) -> Optional[Tuple[Tuple[str, Optional[str]], ...]]:
+    """
+    预先解析提示词模板，拆成 (字面文本, 字段名) 序列，每个模板只解析一次
+
+    模板中含有格式说明、转换符或属性 / 下标访问时返回 None，由调用方退回 str.format
+    """
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if field is not None and (spec or conversion or not field.isidentifier()):
+            return None
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def _format_prompt(template: str, **fields: Any) -> str:
+    """
+    渲染提示词模板，结果与 template.format(**fields) 一致
+
+    模板只在第一次使用时解析，之后直接按字段名拼接，省去 str.format 每次重新解析多 KB 模板的开销
+
+    Args:
+        template: 提示词模板
+        **fields: 模板字段
+
+    Returns:
+        渲染后的提示词
+    """
+    parts = _compile_template(template)
+    if parts is None:
+        return template.format(**fields)
+    return "".join(
+        literal if field is None else literal + format(fields[field])
+        for literal, field in parts
+    )
+
+
 class InterviewNodes:
     """面试节点类，封装所有节点逻辑"""
 
-    def __init__(self, llm: BaseLLM, think_max_num: int = 3, deep_question_max_num: int = 3, agent_name: str = "InterviewAgent"):
+    # 追问决策精确缓存的最大条目数
+    DECISION_CACHE_SIZE = 4096
+
+    def __init__(self, llm: BaseLLM, think_max_num: int = 3, deep_question_max_num: int = 3, agent_name: str = "InterviewAgent", think_candidates: int = 1, plan_candidates: int = 1, plan_temperature: float = 0.9, compress_context_chars: Optional[int] = 2000):
         """
         初始化面试节点
 
@@ -19,158 +65,319 @@ class InterviewNodes:
             think_max_num: 思考最大轮次，默认 3
             deep_question_max_num: 追问最大次数，默认 3
             agent_name: Agent 名称，用于日志记录
+            think_candidates: 每轮思考 + 反思的候选数量，默认 1
+            plan_candidates: 问题列表的候选方案数量，大于 1 时并发生成后择优，默认 1
+            plan_temperature: 生成多个候选方案时使用的采样温度，默认 0.9
+            compress_context_chars: 简历 + JD 超过该字数时先压缩再用于反思等节点，None 表示不压缩，默认 2000
         """
         self.llm = llm
         self.think_max_num = think_max_num
         self.deep_question_max_num = deep_question_max_num
         self.agent_name = agent_name
+        self.think_candidates = max(1, think_candidates)
+        self.plan_candidates = max(1, plan_candidates)
+        self.plan_temperature = plan_temperature
+        self.compress_context_chars = compress_context_chars
+
+        # 各节点绑定好上下文的 logger，避免每次调用节点都重新 bind
+        self._loggers = {
+            name: logger.bind(agent=agent_name, node=name)
+            for name in ("questionOutput", "deepQuestionOutput", "userInput", "end")
+        }
+
+        # 静态前缀渲染缓存：(模板, 字段) -> 渲染结果，同一场面试内字节一致
+        self._prefix_cache: Dict[Tuple[str, Tuple[Tuple[str, Any], ...]], str] = {}
+
+        # 用户作答后立即投机生成的追问：session_id -> (提示词, 任务)，nextStep 决定不追问时取消；
+        # 节点实例随编译后的图在会话之间共享，按会话分开保存，避免并发的面试互相取消
+        self._speculative_deep_questions: Dict[str, Tuple[List[Dict[str, Any]], asyncio.Task]] = {}
+
+        # 追问决策精确缓存：hash(问题, 回答, 追问次数) -> 决策结果，LRU 淘汰
+        self._decision_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    @staticmethod
+    def _build_prompt(*static_parts: str, tail: str = "") -> List[Dict[str, Any]]:
+        """
+        组装提示词块：静态部分在前并标记为可缓存，动态内容只放在末尾
+
+        Args:
+            *static_parts: 按稳定程度排列的静态部分（所有面试共用的指令和输出格式在前，本场面试的上下文在后）
+            tail: 动态尾部（轮次、反馈、用户回答等）
+
+        Returns:
+            提示词块列表
+        """
+        blocks = [
+            {"type": "text", "text": part, "cache_control": {"type": "ephemeral"}}
+            for part in static_parts
+        ]
+        if tail:
+            blocks.append({"type": "text", "text": tail})
+        return blocks
+
+    def _render_static(self, template: str, **fields: Any) -> str:
+        """
+        渲染静态提示词并按 (模板, 字段) 缓存
+
+        同一场面试内简历、JD 等字段不变，重复调用直接返回已渲染的字符串，
+        既省去多 KB 文本的重复拼接，也保证静态前缀逐字节一致以命中服务端的提示词缓存
+
+        Args:
+            template: 提示词模板
+            **fields: 模板字段
+
+        Returns:
+            渲染后的提示词
+        """
+        key = (template, tuple(sorted(fields.items())))
+        rendered = self._prefix_cache.get(key)
+        if rendered is None:
+            if len(self._prefix_cache) >= 256:
+                self._prefix_cache.clear()
+            rendered = self._prefix_cache[key] = _format_prompt(template, **fields)
+        return rendered
+
+    @staticmethod
+    def _canonical_json(value: Any) -> str:
+        """
+        将列表 / 字典序列化为规范 JSON（键排序、紧凑分隔符）
+
+        前几轮内容的文本逐字节稳定，逐轮增长的 thinking_process 等字段只在末尾追加新内容
+        """
+        return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+
+    def _interview_context(self, state: InterviewState, full: bool = False) -> str:
+        """
+        渲染面试上下文（同一场面试内不变）
+
+        Args:
+            state: 面试状态
+            full: 是否使用简历和 JD 原文（默认使用 contextCompress 压缩后的版本）
+        """
+        resume, jd = state["resume_info"], state["jd_info"]
+        return self._render_static(
+            INTERVIEW_CONTEXT_PROMPT,
+            resume=resume if full else state.get("resume_summary") or resume,
+            jd=jd if full else state.get("jd_summary") or jd,
+            mode=state["mode"],
+            difficulty=state["difficulty"]
+        )
 
     def message_input(self, state: InterviewState) -> Dict[str, Any]:
         """输入处理节点"""
         return {
             "interview_stage": "questionBuild",
-            "thinking_process": [],
+            "thinking_process": None,
             "deep_index": 0
         }
 
-    def question_build(self, state: InterviewState) -> Dict[str, Any]:
-        """问题生成节点"""
+    async def context_compress(self, state: InterviewState) -> Dict[str, Any]:
+        """
+        简历 / JD 压缩节点（每场面试只运行一次）
+
+        原文较长时用一次 LLM 调用压缩为要点，后续反思、择优等节点引用压缩版本以减少输入 token
+        """
+        resume, jd = state["resume_info"], state["jd_info"]
+        if self.compress_context_chars is None or len(resume) + len(jd) <= self.compress_context_chars:
+            return {"resume_summary": resume, "jd_summary": jd}
+
+        result = await self.llm.ainvoke_with_schema(
+            _format_prompt(CONTEXT_COMPRESSION_PROMPT, resume=resume, jd=jd),
+            output_schema_context_compression,
+            node_name="contextCompress"
+        )
+        print(f"[OK] 简历和 JD 已压缩: {len(resume) + len(jd)} -> "
+              f"{len(result['resume_summary']) + len(result['jd_summary'])} 字")
+        return {"resume_summary": result["resume_summary"], "jd_summary": result["jd_summary"]}
+
+    async def question_build(self, state: InterviewState) -> Dict[str, Any]:
+        """
+        问题生成节点
+
+        plan_candidates > 1 时以较高温度一次采样多份候选问题列表，再用一次择优调用选出最佳方案
+        """
         # 获取上一轮的反馈（如果有）
         reflection_feedback = state.get("reflection_result", {})
         improvement_suggestions = reflection_feedback.get("improvement_suggestions", [])
 
-        # 如果有反馈，使用带反馈的提示词；否则使用普通提示词
+        # 如果有反馈，在静态前缀之后追加上一次的结果和反馈
+        tail = ""
         if improvement_suggestions:
             feedback_text = "\n".join([f"- {s}" for s in improvement_suggestions])
-            prompt = QUESTION_PLAN_GENERATION_WITH_FEEDBACK_PROMPT.format(
-                resume=state["resume_info"],
-                jd=state["jd_info"],
-                mode=state["mode"],
-                difficulty=state["difficulty"],
+            tail = _format_prompt(
+                QUESTION_PLAN_FEEDBACK_TAIL,
                 previous_attempt=state.get("question_plan", []),
                 feedback=feedback_text
             )
-        else:
-            prompt = QUESTION_PLAN_GENERATION_PROMPT.format(
-                resume=state["resume_info"],
-                jd=state["jd_info"],
-                mode=state["mode"],
-                difficulty=state["difficulty"]
+
+        prompt = self._build_prompt(
+            self._render_static(QUESTION_PLAN_GENERATION_PROMPT),
+            self._interview_context(state, full=True),
+            tail=tail
+        )
+
+        if self.plan_candidates == 1:
+            final_draft = len(state["thinking_process"]) // self.think_candidates + 1 >= self.think_max_num
+            if not final_draft:
+                result = await self.llm.ainvoke_with_schema(prompt, output_schema_question_plan_generation, node_name="questionBuild")
+                return {"question_plan": result["question_plan"], "question_streamed": False}
+
+            # 本次草稿会被强制通过：边生成边输出第一个问题，其余问题在后台继续生成
+            streamed: List[str] = []
+            result = await self.llm.astream_with_schema(
+                prompt,
+                output_schema_question_plan_generation,
+                stream_field="question",
+                on_delta=self._question_printer(streamed),
+                node_name="questionBuild"
             )
+            plan = result["question_plan"]
+            return {
+                "question_plan": plan,
+                "question_streamed": bool(plan) and "".join(streamed) == plan[0].get("question", "")
+            }
 
-        result = self.llm.invoke_with_schema(prompt, output_schema_question_plan_generation, node_name="questionBuild")
-        return {"question_plan": result["question_plan"]}
+        results = await self.llm.abatch_invoke_with_schema(
+            prompt,
+            output_schema_question_plan_generation,
+            n=self.plan_candidates,
+            temperature=self.plan_temperature,
+            node_name="questionBuild"
+        )
+        plans = [result["question_plan"] for result in results]
 
-    def think(self, state: InterviewState) -> Dict[str, Any]:
-        """深度思考节点，根据 interview_stage 选择对应的深度思考提示词"""
-        round_num = len(state["thinking_process"]) + 1
-        stage = state["interview_stage"]
+        candidates = "\n\n".join(
+            f"### 候选方案 {index}\n{self._canonical_json(plan)}" for index, plan in enumerate(plans)
+        )
+        selection_prompt = self._build_prompt(
+            self._render_static(QUESTION_PLAN_SELECTION_PROMPT),
+            self._interview_context(state),
+            tail=_format_prompt(QUESTION_PLAN_SELECTION_PROMPT_TAIL, candidates=candidates)
+        )
+        selection = await self.llm.ainvoke_with_schema(
+            selection_prompt, output_schema_question_plan_selection, node_name="questionPlanSelect"
+        )
 
-        if stage == "questionBuild":
-            prompt = DEEP_THINKING_PROMPT_QUESTION_BUILD.format(
-                resume=state["resume_info"],
-                jd=state["jd_info"],
-                mode=state["mode"],
-                difficulty=state["difficulty"],
-                round=round_num
-            )
-        elif stage == "adjustQuestion":
-            prompt = DEEP_THINKING_PROMPT_ADJUST_QUESTION.format(
-                questions_plan=state["question_plan"],
-                completed_questions=state.get("completed_questions", []),
-                performance_analysis=state.get("performance_analysis", ""),
-                weak_points=state.get("weak_points", []),
-                strong_points=state.get("strong_points", []),
-                round=round_num
-            )
-        elif stage == "deepQuestion":
-            # 获取用户回答内容
-            user_answer = ""
-            if state["messages"]:
-                last_msg = state["messages"][-1]
-                if isinstance(last_msg, HumanMessage):
-                    user_answer = last_msg.content
-
-            prompt = DEEP_THINKING_PROMPT_DEEP_QUESTION.format(
-                current_question=state["current_question"],
-                user_answer=user_answer,
-                answer_analysis=state.get("answer_analysis", ""),
-                follow_up_count=state["deep_index"],
-                difficulty=state["difficulty"],
-                round=round_num
-            )
-        else:
-            raise ValueError(f"未知的 interview_stage: {stage}")
+        best_index = selection.get("best_index", 0)
+        if not 0 <= best_index < len(plans):
+            print(f"[警告] 择优结果编号越界 ({best_index}/{len(plans)})，使用第一个候选方案")
+            best_index = 0
+        return {"question_plan": plans[best_index]}
 
-        result = self.llm.invoke_with_schema(prompt, output_schema_deep_thinking, node_name=f"{stage}Think")
-        return {
-            "thinking_result": result,
-            "thinking_process": state["thinking_process"] + [result]
-        }
+    def _thinking_context(self, thinking_process: List[Dict[str, Any]]) -> str:
+        """
+        渲染反思提示词中的历史思考：最近一轮保留全文，更早的轮次只保留轮次和潜在问题
+
+        观察、推理等长文本只对下一轮有参考价值，早期轮次压缩后提示词长度随轮次线性增长，而不是平方增长
+
+        Args:
+            thinking_process: 之前轮次的全部思考
+
+        Returns:
+            规范 JSON 形式的历史思考
+        """
+        latest = len(thinking_process) - self.think_candidates
+        if latest <= 0:
+            return self._canonical_json(thinking_process)
+        earlier = [
+            {"round": thinking.get("round"), "concerns": thinking.get("concerns", [])}
+            for thinking in thinking_process[:latest]
+        ]
+        return self._canonical_json(earlier + thinking_process[latest:])
+
+    async def judge(self, state: InterviewState) -> Dict[str, Any]:
+        """
+        深度思考 + 反思判断节点，根据 interview_stage 选择对应的合并提示词
 
-    def judge(self, state: InterviewState) -> Dict[str, Any]:
-        """反思判断节点，根据 interview_stage 选择对应的反思提示词"""
+        一次调用同时产出本轮思考和反思结果；think_candidates > 1 时在一次批量请求中采样多个候选，
+        所有候选的思考都记入 thinking_process，采用置信度最高的反思结果
+        """
         thinking_process = state["thinking_process"]
-        round_num = len(thinking_process)
+        round_num = len(thinking_process) // self.think_candidates + 1
         stage = state["interview_stage"]
 
+        # 已到最大轮次时结果注定是强制通过，不再调用 LLM
+        if round_num >= self.think_max_num:
+            print(f"[警告] 思考轮次已达上限 ({round_num}/{self.think_max_num}),强制通过")
+            return {
+                "reflection_result": {
+                    "round": round_num,
+                    "node_type": stage,
+                    "should_regenerate": False,
+                    "improvement_suggestions": [f"已达到最大思考轮次 ({self.think_max_num}),强制通过当前结果"]
+                },
+                # 强制通过后清空思考过程
+                "thinking_process": None
+            }
+
         if stage == "questionBuild":
-            prompt = REFLECTION_PROMPT_QUESTION_BUILD.format(
-                draft_question_plan=state["question_plan"],
-                thinking_process=state["thinking_process"],
-                resume=state["resume_info"],
-                jd=state["jd_info"],
-                difficulty=state["difficulty"],
-                round=round_num
+            prompt = self._build_prompt(
+                self._render_static(DEEP_THINKING_AND_REFLECTION_PROMPT_QUESTION_BUILD),
+                self._interview_context(state),
+                tail=_format_prompt(
+                    DEEP_THINKING_AND_REFLECTION_PROMPT_QUESTION_BUILD_TAIL,
+                    draft_question_plan=self._canonical_json(state["question_plan"]),
+                    thinking_process=self._thinking_context(thinking_process),
+                    round=round_num
+                )
             )
         elif stage == "adjustQuestion":
-            prompt = REFLECTION_PROMPT_ADJUST_QUESTION.format(
-                adjusted_question_plan=state["question_plan"],
-                original_question_plan=state.get("original_question_plan", []),
-                thinking_process=state["thinking_process"],
-                performance_analysis=state.get("performance_analysis", ""),
-                round=round_num
+            prompt = self._build_prompt(
+                self._render_static(DEEP_THINKING_AND_REFLECTION_PROMPT_ADJUST_QUESTION),
+                tail=_format_prompt(
+                    DEEP_THINKING_AND_REFLECTION_PROMPT_ADJUST_QUESTION_TAIL,
+                    adjusted_question_plan=self._canonical_json(state["question_plan"]),
+                    original_question_plan=self._canonical_json(state.get("original_question_plan", [])),
+                    completed_questions=self._canonical_json(state.get("completed_questions", [])),
+                    performance_analysis=state.get("performance_analysis", ""),
+                    weak_points=state.get("weak_points", []),
+                    strong_points=state.get("strong_points", []),
+                    thinking_process=self._thinking_context(thinking_process),
+                    round=round_num
+                )
             )
         elif stage == "deepQuestion":
-            # 获取用户回答内容
-            user_answer = ""
-            if state["messages"]:
-                last_msg = state["messages"][-1]
-                if isinstance(last_msg, HumanMessage):
-                    user_answer = last_msg.content
-
-            prompt = REFLECTION_PROMPT_DEEP_QUESTION.format(
-                draft_deep_question=state.get("current_question", {}),
-                thinking_process=state["thinking_process"],
-                current_question=state["current_question"],
-                user_answer=user_answer,
-                follow_up_count=state["deep_index"],
-                round=round_num
+            prompt = self._build_prompt(
+                self._render_static(DEEP_THINKING_AND_REFLECTION_PROMPT_DEEP_QUESTION, difficulty=state["difficulty"]),
+                tail=_format_prompt(
+                    DEEP_THINKING_AND_REFLECTION_PROMPT_DEEP_QUESTION_TAIL,
+                    current_question=state["current_question"],
+                    user_answer=state.get("last_user_answer") or "",
+                    answer_analysis=state.get("answer_analysis", ""),
+                    follow_up_count=state["deep_index"],
+                    thinking_process=self._thinking_context(thinking_process),
+                    round=round_num
+                )
             )
         else:
             raise ValueError(f"未知的 interview_stage: {stage}")
 
-        result = self.llm.invoke_with_schema(prompt, output_schema_reflection, node_name=f"{stage}Judge")
-
-        # 检查是否超过最大轮次限制
-        if round_num >= self.think_max_num:
-            # 超过限制,强制通过(即使质量不够好)
-            print(f"[警告] 思考轮次已达上限 ({round_num}/{self.think_max_num}),强制通过")
-            result["should_regenerate"] = False
-            # 添加说明到改进建议中
-            if "improvement_suggestions" not in result:
-                result["improvement_suggestions"] = []
-            result["improvement_suggestions"].append(
-                f"已达到最大思考轮次 ({self.think_max_num}),强制通过当前结果"
+        if self.think_candidates == 1:
+            # 通过检查时排在 should_regenerate 之后的改进建议用不到，输出 false 后立即结束生成
+            candidates = [await self.llm.astream_until_with_schema(
+                prompt, output_schema_think_and_reflect,
+                stop_field="should_regenerate", stop_value=False, node_name=f"{stage}Judge"
+            )]
+        else:
+            candidates = await self.llm.abatch_invoke_with_schema(
+                prompt, output_schema_think_and_reflect, n=self.think_candidates, node_name=f"{stage}Judge"
             )
-            thinking_process = []
 
+        result = max(
+            (candidate["reflection"] for candidate in candidates),
+            key=lambda reflection: reflection.get("confidence_score", 0)
+        )
 
-        return {"reflection_result": result, "thinking_process":thinking_process}
+        return {
+            "thinking_result": candidates[-1]["thinking"],
+            "reflection_result": result,
+            # 只返回本轮新增的思考，由 reducer 追加到 thinking_process
+            "thinking_process": [candidate["thinking"] for candidate in candidates]
+        }
 
     def question_output(self, state: InterviewState) -> Dict[str, Any]:
         """提问输出节点 - 从问题列表中取出当前问题并输出"""
-        node_logger = logger.bind(agent=self.agent_name, node="questionOutput")
+        node_logger = self._loggers["questionOutput"]
 
         question_plan = state.get("question_plan", [])
         main_question_index = state.get("main_question_index",0)
@@ -194,7 +401,9 @@ class InterviewNodes:
             main_question_index+=1
 
             question_text = current_question.get('question', '')
-            print(f"面试官：{question_text}")
+            # 问题列表生成时已经流式输出过的不再重复打印
+            if not state.get("question_streamed", False):
+                print(f"面试官：{question_text}")
 
             # 记录问题输出
             node_logger.info(f"输出第 {main_question_index} 个问题: {question_text}")
@@ -202,7 +411,8 @@ class InterviewNodes:
             return {
                 "current_question": current_question,
                 "main_question_index": main_question_index,
-                "messages": [AIMessage(content=current_question["question"])]
+                "messages": [AIMessage(content=current_question["question"])],
+                "question_streamed": False
             }
         else:
             # 所有问题已问完
@@ -211,60 +421,99 @@ class InterviewNodes:
 
     def deep_question_output(self, state: InterviewState) -> Dict[str, Any]:
         """追问输出节点 - 输出追问问题给用户"""
-        node_logger = logger.bind(agent=self.agent_name, node="deepQuestionOutput")
+        node_logger = self._loggers["deepQuestionOutput"]
 
         current_question = state.get("current_question", {})
         follow_up_question = current_question.get("question", "")
 
-        print(f"面试官：{follow_up_question}")
+        # 追问生成时已经流式输出过的不再重复打印
+        if not state.get("question_streamed", False):
+            print(f"面试官：{follow_up_question}")
 
         # 记录追问输出
         deep_index = state.get("deep_index", 0)
         node_logger.info(f"输出追问 (第 {deep_index} 次): {follow_up_question}")
 
         return {
-            "messages": [AIMessage(content=follow_up_question)]
+            "messages": [AIMessage(content=follow_up_question)],
+            "question_streamed": False
         }
 
-    def user_input(self, state: InterviewState) -> Dict[str, Any]:
-        """等待用户输入节点"""
-        node_logger = logger.bind(agent=self.agent_name, node="userInput")
+    async def user_input(self, state: InterviewState) -> Dict[str, Any]:
+        """
+        等待用户输入节点
+
+        在线程中读取输入，不阻塞事件循环；拿到回答后立即投机生成追问，
+        与 nextStep 的追问判断并发执行
+        """
+        node_logger = self._loggers["userInput"]
 
-        user_answer = input("你的回答：").strip()
+        user_answer = (await asyncio.to_thread(input, "你的回答：")).strip()
 
         # 记录用户输入
         node_logger.info(f"用户回答: {user_answer}")
 
+        if state.get("deep_index", 0) < self.deep_question_max_num:
+            self._start_speculative_deep_question({**state, "last_user_answer": user_answer})
+
         return {
-            "messages": [HumanMessage(content=user_answer)]
+            "messages": [HumanMessage(content=user_answer)],
+            "last_user_answer": user_answer
         }
 
-    def next_step(self, state: InterviewState) -> Dict[str, Any]:
-        """决策下一步节点 - 分析用户回答并决定下一步动作"""
-        # 获取最新的用户回答
-        messages = state.get("messages", [])
-        if not messages:
-            return {"next_step": "end"}
+    def _start_speculative_deep_question(self, state: InterviewState) -> None:
+        """以作答后的状态投机生成追问，结果留给同一会话的 deep_question 复用"""
+        session_id = state.get("session_id", "")
+        self._cancel_speculative_deep_question(session_id)
+        prompt = self._deep_question_prompt(state)
+        task = asyncio.create_task(
+            self.llm.ainvoke_with_schema(prompt, output_schema_deep_question_generation, node_name="deepQuestion")
+        )
+        self._speculative_deep_questions[session_id] = (prompt, task)
 
-        last_message = messages[-1]
+    def _cancel_speculative_deep_question(self, session_id: str) -> None:
+        """丢弃该会话尚未使用的投机追问"""
+        speculative = self._speculative_deep_questions.pop(session_id, None)
+        if speculative is not None:
+            speculative[1].cancel()
 
-        # 检查是否是用户消息
-        if not isinstance(last_message, HumanMessage):
+    async def next_step(self, state: InterviewState) -> Dict[str, Any]:
+        """决策下一步节点 - 分析用户回答并决定下一步动作"""
+        # 获取最新的用户回答（由 userInput 节点写入）
+        user_answer = state.get("last_user_answer")
+        if user_answer is None:
+            self._cancel_speculative_deep_question(state.get("session_id", ""))
             return {"next_step": "end"}
 
-        user_answer = last_message.content
         current_question = state.get("current_question", {})
         deep_index = state.get("deep_index", 0)
 
-        # 调用 LLM 判断是否需要追问
-        prompt = FOLLOW_UP_DECISION_PROMPT.format(
-            current_question=current_question.get("question", ""),
-            user_answer=user_answer,
-            answer_analysis="",  # 可以添加回答分析逻辑
-            follow_up_count=deep_index
-        )
+        # 相同的 (问题, 回答, 追问次数) 直接复用之前的决策
+        question_text = current_question.get("question", "")
+        cache_key = blake2b(
+            f"{question_text}\x00{user_answer}\x00{deep_index}".encode("utf-8"), digest_size=16
+        ).hexdigest()
+        decision = self._decision_cache.get(cache_key)
+        if decision is not None:
+            self._decision_cache.move_to_end(cache_key)
+            print("[缓存] 节点: nextStep | 命中追问决策缓存")
+        else:
+            # 调用 LLM 判断是否需要追问
+            prompt = self._build_prompt(
+                self._render_static(FOLLOW_UP_DECISION_PROMPT),
+                tail=_format_prompt(
+                    FOLLOW_UP_DECISION_PROMPT_TAIL,
+                    current_question=question_text,
+                    user_answer=user_answer,
+                    answer_analysis="",  # 可以添加回答分析逻辑
+                    follow_up_count=deep_index
+                )
+            )
 
-        decision = self.llm.invoke_with_schema(prompt, output_schema_follow_up_decision, node_name="nextStep")
+            decision = await self.llm.ainvoke_with_schema(prompt, output_schema_follow_up_decision, node_name="nextStep")
+            self._decision_cache[cache_key] = decision
+            while len(self._decision_cache) > self.DECISION_CACHE_SIZE:
+                self._decision_cache.popitem(last=False)
 
         # 根据决策结果设置下一步
         if decision.get("should_follow_up", False)==True and deep_index < self.deep_question_max_num:
@@ -274,7 +523,10 @@ class InterviewNodes:
                 "interview_stage": "deepQuestion",
             }
         else:
-            # 不需要追问，检查是否还有剩余的主问题
+            # 不需要追问，丢弃投机生成的追问
+            self._cancel_speculative_deep_question(state.get("session_id", ""))
+
+            # 检查是否还有剩余的主问题
             question_plan = state.get("question_plan", [])
             main_question_index = state.get("main_question_index", 0)
 
@@ -293,79 +545,131 @@ class InterviewNodes:
                     "deep_index": 0
                 }
 
-    def adjust_question(self, state: InterviewState) -> Dict[str, Any]:
+    async def adjust_question(self, state: InterviewState) -> Dict[str, Any]:
         """调整问题节点"""
         # 获取上一轮的反馈（如果有）
         reflection_feedback = state.get("reflection_result", {})
         improvement_suggestions = reflection_feedback.get("improvement_suggestions", [])
+        question_plan = state["question_plan"]
+
+        tail = _format_prompt(
+            QUESTION_ADJUSTMENT_PROMPT_TAIL,
+            questions_plan=self._canonical_json(question_plan),
+            completed_questions=self._canonical_json(state.get("completed_questions", [])),
+            performance_analysis=state.get("performance_analysis", ""),
+            weak_points=state.get("weak_points", []),
+            strong_points=state.get("strong_points", [])
+        )
 
-        # 如果有反馈，使用带反馈的提示词；否则使用普通提示词
+        # 如果有反馈，在动态尾部追加上一次的结果和反馈
         if improvement_suggestions:
             feedback_text = "\n".join([f"- {s}" for s in improvement_suggestions])
-            prompt = QUESTION_ADJUSTMENT_WITH_FEEDBACK_PROMPT.format(
-                questions_plan=state["question_plan"],
-                completed_questions=state.get("completed_questions", []),
-                performance_analysis=state.get("performance_analysis", ""),
-                weak_points=state.get("weak_points", []),
-                strong_points=state.get("strong_points", []),
-                difficulty=state["difficulty"],
-                previous_attempt=state.get("question_plan", []),
+            tail += "\n" + _format_prompt(
+                QUESTION_ADJUSTMENT_FEEDBACK_TAIL,
+                previous_attempt=question_plan,
                 feedback=feedback_text
             )
-        else:
-            prompt = QUESTION_ADJUSTMENT_PROMPT.format(
-                questions_plan=state["question_plan"],
-                completed_questions=state.get("completed_questions", []),
-                performance_analysis=state.get("performance_analysis", ""),
-                weak_points=state.get("weak_points", []),
-                strong_points=state.get("strong_points", []),
-                difficulty=state["difficulty"]
-            )
 
-        result = self.llm.invoke_with_schema(prompt, output_schema_question_adjustment, node_name="adjustQuestion")
+        prompt = self._build_prompt(
+            self._render_static(QUESTION_ADJUSTMENT_PROMPT, difficulty=state["difficulty"]),
+            tail=tail
+        )
+
+        result = await self.llm.ainvoke_with_schema(prompt, output_schema_question_adjustment, node_name="adjustQuestion")
         return {
             "question_plan": result["adjusted_question_plan"],
-            "original_question_plan": state["question_plan"]
+            "original_question_plan": question_plan
         }
 
-    def deep_question(self, state: InterviewState) -> Dict[str, Any]:
-        """追问生成节点"""
-        # 获取用户回答内容
-        user_answer = ""
-        if state["messages"]:
-            last_msg = state["messages"][-1]
-            if isinstance(last_msg, HumanMessage):
-                user_answer = last_msg.content
+    @staticmethod
+    def _question_printer(streamed: List[str]) -> Callable[[str, bool], None]:
+        """
+        生成流式输出问题的回调，已输出的片段依次追加到 streamed
+
+        Args:
+            streamed: 记录已输出片段的列表，用于事后判断流式内容是否与最终结果一致
+
+        Returns:
+            传给 astream_with_schema 的 on_delta 回调
+        """
+        def on_delta(text: str, done: bool) -> None:
+            if not streamed:
+                print("面试官：", end="", flush=True)
+            streamed.append(text)
+            print(text, end="\n" if done else "", flush=True)
+
+        return on_delta
 
+    def _deep_question_prompt(self, state: InterviewState) -> List[Dict[str, Any]]:
+        """组装追问生成提示词"""
         # 获取上一轮的反馈（如果有）
         reflection_feedback = state.get("reflection_result", {})
         improvement_suggestions = reflection_feedback.get("improvement_suggestions", [])
+        current_question = state["current_question"]
+
+        tail = _format_prompt(
+            DEEP_QUESTION_GENERATION_PROMPT_TAIL,
+            current_question=current_question,
+            user_answer=state.get("last_user_answer") or "",
+            answer_analysis=state.get("answer_analysis", ""),
+            follow_up_count=state["deep_index"]
+        )
 
-        # 如果有反馈，使用带反馈的提示词；否则使用普通提示词
+        # 如果有反馈，在动态尾部追加上一次的结果和反馈
         if improvement_suggestions:
             feedback_text = "\n".join([f"- {s}" for s in improvement_suggestions])
-            prompt = DEEP_QUESTION_GENERATION_WITH_FEEDBACK_PROMPT.format(
-                current_question=state["current_question"],
-                user_answer=user_answer,
-                answer_analysis=state.get("answer_analysis", ""),
-                follow_up_count=state["deep_index"],
-                difficulty=state["difficulty"],
-                previous_attempt=state.get("current_question", {}),
+            tail += "\n" + _format_prompt(
+                DEEP_QUESTION_FEEDBACK_TAIL,
+                previous_attempt=current_question,
                 feedback=feedback_text
             )
-        else:
-            prompt = DEEP_QUESTION_GENERATION_PROMPT.format(
-                current_question=state["current_question"],
-                user_answer=user_answer,
-                answer_analysis=state.get("answer_analysis", ""),
-                follow_up_count=state["deep_index"],
-                difficulty=state["difficulty"]
-            )
 
-        result = self.llm.invoke_with_schema(prompt, output_schema_deep_question_generation, node_name="deepQuestion")
+        return self._build_prompt(
+            self._render_static(DEEP_QUESTION_GENERATION_PROMPT, difficulty=state["difficulty"]),
+            tail=tail
+        )
+
+    async def deep_question(self, state: InterviewState) -> Dict[str, Any]:
+        """
+        追问生成节点（提示词与投机任务一致时直接复用投机结果）
+
+        思考轮次已到上限时 judge 会强制通过本次草稿，此时边生成边把追问输出给用户
+        """
+        prompt = self._deep_question_prompt(state)
+        deep_index = state["deep_index"] + 1
+
+        speculative = self._speculative_deep_questions.pop(state.get("session_id", ""), None)
+        if speculative is not None and speculative[0] == prompt:
+            return {
+                "current_question": await speculative[1],
+                "deep_index": deep_index,
+                "question_streamed": False
+            }
+        if speculative is not None:
+            speculative[1].cancel()
+
+        final_draft = len(state["thinking_process"]) // self.think_candidates + 1 >= self.think_max_num
+        if not final_draft:
+            result = await self.llm.ainvoke_with_schema(prompt, output_schema_deep_question_generation, node_name="deepQuestion")
+            return {
+                "current_question": result,
+                "deep_index": deep_index,
+                "question_streamed": False
+            }
+
+        streamed: List[str] = []
+        result = await self.llm.astream_with_schema(
+            prompt,
+            output_schema_deep_question_generation,
+            stream_field="question",
+            on_delta=self._question_printer(streamed),
+            node_name="deepQuestion"
+        )
         return {
             "current_question": result,
-            "deep_index": state["deep_index"] + 1
+            "deep_index": deep_index,
+            # 重试后的追问与已输出的内容不一致时，交给 deepQuestionOutput 重新输出
+            "question_streamed": "".join(streamed) == result.get("question", "")
         }
     
 
@@ -404,7 +708,7 @@ class InterviewNodes:
 
     def end(self, state: InterviewState) -> Dict[str, Any]:
         """结束节点 - 收集最终状态并返回"""
-        node_logger = logger.bind(agent=self.agent_name, node="end")
+        node_logger = self._loggers["end"]
 
         print("\n" + "=" * 50)
         print("面试结束，感谢参与！")
@@ -1,12 +1,29 @@
 from typing_extensions import TypedDict
-from typing import List,Dict,Annotated
+from typing import List,Dict,Annotated,Optional
 from langgraph.graph.message import add_messages
 
+
+def extend_thinking_process(current: List[Dict], update: Optional[List[Dict]]) -> List[Dict]:
+    """
+    thinking_process 的 reducer：把本轮新增的思考原地追加到已有列表，传入 None 表示清空
+
+    原地追加避免每轮复制整个列表（N 轮总复制量从 O(N²) 降为 O(N)），
+    因此节点不应持有并修改 state["thinking_process"] 的引用
+    """
+    if update is None:
+        return []
+    current.extend(update)
+    return current
+
+
 class InterviewState(TypedDict):
     session_id:str
     user_id:str
     jd_info:str
     resume_info:str
+    # 压缩后的简历和 JD（contextCompress 节点生成，原文较短时与原文相同）
+    resume_summary:str
+    jd_summary:str
     # 模式 real,training 训练的话是每次回答 直接获得面试官的点评
     mode:str 
     # 难度 "大厂"  "中厂"  "小厂"
@@ -17,6 +34,8 @@ class InterviewState(TypedDict):
     current_question:Dict
     # 历史对话
     messages:Annotated[list,add_messages]
+    # 最近一次用户回答（userInput 节点写入，尚未作答时为 None）
+    last_user_answer:Optional[str]
     # 控制信号 追问"deep" or 结束 "end" or 下一个问题 "question" or 继续深度思考 "think"
     next_step:str
 
@@ -26,13 +45,16 @@ class InterviewState(TypedDict):
     # 主问题索引，用于追踪当前是第几个主问题
     main_question_index:int
 
+    # 当前问题（追问或问题列表中的第一个问题）是否已在生成时流式输出给用户
+    question_streamed:bool
+
     # 追问问题列表 追问的问题会重写这个列表
     deep_questions:List[Dict]
 
     # 思考的结果
     thinking_result:Dict
     # 思考的上下文 用于判断是不是可以结束反思
-    thinking_process:List[Dict]
+    thinking_process:Annotated[List[Dict],extend_thinking_process]
 
     # 反思结果
     reflection_result:List[Dict]
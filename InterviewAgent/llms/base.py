@@ -4,11 +4,28 @@ LLM 基类
 """
 
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Union, Callable
+import asyncio
+import os
 import time
+from functools import lru_cache
 from ..utils.logger import logger
 
 
+# 提示词：纯文本，或按顺序排列的文本块列表
+# 文本块格式 {"type": "text", "text": "...", "cache_control": {"type": "ephemeral"}}（cache_control 可选）
+PromptInput = Union[str, List[Dict[str, Any]]]
+
+# 是否在控制台打印每次 LLM 调用的埋点（INTERVIEW_DEBUG=1 时打印，默认只写日志）
+_PRINT_USAGE = os.getenv("INTERVIEW_DEBUG") == "1"
+
+
+@lru_cache(maxsize=256)
+def _bound_logger(agent_name: str, node_name: str):
+    """获取绑定了 agent / node 上下文的 logger（按名称缓存，避免每次调用重新 bind）"""
+    return logger.bind(agent=agent_name, node=node_name)
+
+
 class BaseLLM(ABC):
     """
     LLM 基类，定义统一接口
@@ -40,13 +57,31 @@ class BaseLLM(ABC):
         """
         pass
 
+    @staticmethod
+    def prompt_to_text(prompt: PromptInput) -> str:
+        """
+        将提示词块拼接为纯文本
+
+        块之间用一个换行符拼接，与 OpenAILLM._build_messages 拼接 system / user 消息的方式一致；
+        提示词模板都以换行结尾，因此拼接后相邻两块之间正好空一行
+
+        Args:
+            prompt: 纯文本或文本块列表
+
+        Returns:
+            str: 拼接后的提示词
+        """
+        if isinstance(prompt, str):
+            return prompt
+        return "\n".join(block["text"] for block in prompt)
+
     @abstractmethod
-    def _invoke_with_schema(self, prompt: str, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
+    def _invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
         """
         调用 LLM 并返回结构化输出（同步）
 
         Args:
-            prompt: 提示词
+            prompt: 提示词（纯文本或文本块列表，静态前缀在前）
             output_schema: JSON Schema 定义
             **kwargs: 其他参数
 
@@ -55,7 +90,110 @@ class BaseLLM(ABC):
         """
         pass
 
-    def invoke_with_schema(self, prompt:str,
+    async def _ainvoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """
+        调用 LLM 并返回结构化输出（异步）
+
+        默认在线程池中执行同步实现，子类可以覆盖为原生异步调用
+
+        Args:
+            prompt: 提示词
+            output_schema: JSON Schema 定义
+            **kwargs: 其他参数
+
+        Returns:
+            Dict[str, Any]: 解析后的 JSON 对象
+        """
+        return await asyncio.to_thread(self._invoke_with_schema, prompt, output_schema, **kwargs)
+
+    def _batch_invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], n: int = 1, **kwargs) -> tuple[List[Dict[str, Any]], Dict]:
+        """
+        对同一提示词采样 n 个结构化输出（同步）
+
+        默认逐个调用 _invoke_with_schema，支持单请求多采样的子类应覆盖此方法
+
+        Args:
+            prompt: 提示词
+            output_schema: JSON Schema 定义
+            n: 采样数量
+            **kwargs: 其他参数
+
+        Returns:
+            tuple: (解析后的 JSON 对象列表, 合计 token 使用量)
+        """
+        results = []
+        total_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        for _ in range(n):
+            result, usage = self._invoke_with_schema(prompt, output_schema, **kwargs)
+            results.append(result)
+            self._merge_usage(total_usage, usage)
+        return results, total_usage
+
+    async def _abatch_invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], n: int = 1, **kwargs) -> tuple[List[Dict[str, Any]], Dict]:
+        """
+        对同一提示词采样 n 个结构化输出（异步）
+
+        默认并发调用 n 次 _ainvoke_with_schema，支持单请求多采样的子类应覆盖此方法
+
+        Args:
+            prompt: 提示词
+            output_schema: JSON Schema 定义
+            n: 采样数量
+            **kwargs: 其他参数
+
+        Returns:
+            tuple: (解析后的 JSON 对象列表, 合计 token 使用量)
+        """
+        outputs = await asyncio.gather(*[
+            self._ainvoke_with_schema(prompt, output_schema, **kwargs)
+            for _ in range(n)
+        ])
+        total_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        for _, usage in outputs:
+            self._merge_usage(total_usage, usage)
+        return [result for result, _ in outputs], total_usage
+
+    async def _astream_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stream_field: str, on_delta: Callable[[str, bool], None], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """
+        流式调用 LLM，生成过程中把 stream_field 字段的内容增量交给 on_delta（异步）
+
+        默认不支持流式：完整生成后一次性回调整个字段，子类可以覆盖为真正的流式实现
+
+        Args:
+            prompt: 提示词
+            output_schema: JSON Schema 定义
+            stream_field: 需要流式输出的字符串字段
+            on_delta: 收到字段增量内容时的回调，参数为 (新增文本, 字段是否结束)
+            **kwargs: 其他参数
+
+        Returns:
+            tuple: (解析后的 JSON 对象, token 使用量)
+        """
+        result, usage = await self._ainvoke_with_schema(prompt, output_schema, **kwargs)
+        on_delta(result.get(stream_field, ""), True)
+        return result, usage
+
+    async def _astream_until_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stop_field: str, stop_value: Any, **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """
+        流式调用 LLM，stop_field 输出为 stop_value 时提前结束生成（异步）
+
+        默认不支持提前结束：完整生成后返回，子类可以覆盖为真正的流式实现
+
+        Args:
+            prompt: 提示词
+            output_schema: JSON Schema 定义
+            stop_field: 触发提前结束的字段
+            stop_value: 触发提前结束的取值
+            **kwargs: 其他参数
+
+        Returns:
+            tuple: (解析后的 JSON 对象, token 使用量)
+        """
+        return await self._ainvoke_with_schema(prompt, output_schema, **kwargs)
+
+    def invoke_with_schema(self, prompt:PromptInput,
     output_schema:Dict[str,Any],**kwargs) ->Dict[str, Any]:
         node_name = kwargs.pop("node_name", "unknown")
         agent_name = kwargs.pop("agent_name", "InterviewAgent")
@@ -64,29 +202,163 @@ class BaseLLM(ABC):
         result, usage = self._invoke_with_schema(prompt, output_schema, **kwargs)
         duration = time.time() - start_time
 
+        self._log_usage(agent_name, node_name, usage, duration)
+        return result
+
+    async def ainvoke_with_schema(self, prompt: PromptInput,
+    output_schema: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """
+        invoke_with_schema 的异步版本，多个调用可以并发执行
+
+        Args:
+            prompt: 提示词（纯文本或文本块列表）
+            output_schema: JSON Schema 定义
+            **kwargs: 其他参数（node_name、agent_name 用于日志记录）
+
+        Returns:
+            Dict[str, Any]: 解析后的 JSON 对象
+        """
+        node_name = kwargs.pop("node_name", "unknown")
+        agent_name = kwargs.pop("agent_name", "InterviewAgent")
+
+        start_time = time.time()
+        result, usage = await self._ainvoke_with_schema(prompt, output_schema, **kwargs)
+        duration = time.time() - start_time
+
+        self._log_usage(agent_name, node_name, usage, duration)
+        return result
+
+    async def astream_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stream_field: str, on_delta: Callable[[str, bool], None], **kwargs) -> Dict[str, Any]:
+        """
+        流式调用 LLM 并返回结构化输出，生成过程中增量输出 stream_field 字段
+
+        Args:
+            prompt: 提示词（纯文本或文本块列表）
+            output_schema: JSON Schema 定义
+            stream_field: 需要流式输出的字符串字段
+            on_delta: 收到字段增量内容时的回调，参数为 (新增文本, 字段是否结束)
+            **kwargs: 其他参数（node_name、agent_name 用于日志记录）
+
+        Returns:
+            Dict[str, Any]: 解析后的 JSON 对象
+        """
+        node_name = kwargs.pop("node_name", "unknown")
+        agent_name = kwargs.pop("agent_name", "InterviewAgent")
+
+        start_time = time.time()
+        result, usage = await self._astream_with_schema(prompt, output_schema, stream_field, on_delta, **kwargs)
+        duration = time.time() - start_time
+
+        self._log_usage(agent_name, node_name, usage, duration)
+        return result
+
+    async def astream_until_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stop_field: str, stop_value: Any, **kwargs) -> Dict[str, Any]:
+        """
+        流式调用 LLM 并返回结构化输出，stop_field 输出为 stop_value 时提前结束生成
+
+        适用于排在 stop_field 之后的字段只在另一种取值下才有用的场景，
+        提前结束时这些字段缺失，调用方需按可选字段处理
+
+        Args:
+            prompt: 提示词（纯文本或文本块列表）
+            output_schema: JSON Schema 定义
+            stop_field: 触发提前结束的字段
+            stop_value: 触发提前结束的取值
+            **kwargs: 其他参数（node_name、agent_name 用于日志记录）
+
+        Returns:
+            Dict[str, Any]: 解析后的 JSON 对象
+        """
+        node_name = kwargs.pop("node_name", "unknown")
+        agent_name = kwargs.pop("agent_name", "InterviewAgent")
+
+        start_time = time.time()
+        result, usage = await self._astream_until_with_schema(prompt, output_schema, stop_field, stop_value, **kwargs)
+        duration = time.time() - start_time
+
+        self._log_usage(agent_name, node_name, usage, duration)
+        return result
+
+    def batch_invoke_with_schema(self, prompt: PromptInput,
+    output_schema: Dict[str, Any], n: int = 1, **kwargs) -> List[Dict[str, Any]]:
+        """
+        对同一提示词采样 n 个结构化输出（同步）
+
+        Args:
+            prompt: 提示词（纯文本或文本块列表）
+            output_schema: JSON Schema 定义
+            n: 采样数量
+            **kwargs: 其他参数（node_name、agent_name 用于日志记录）
+
+        Returns:
+            List[Dict[str, Any]]: 解析后的 JSON 对象列表
+        """
+        node_name = kwargs.pop("node_name", "unknown")
+        agent_name = kwargs.pop("agent_name", "InterviewAgent")
+
+        start_time = time.time()
+        results, usage = self._batch_invoke_with_schema(prompt, output_schema, n=n, **kwargs)
+        duration = time.time() - start_time
+
+        self._log_usage(agent_name, node_name, usage, duration)
+        return results
+
+    async def abatch_invoke_with_schema(self, prompt: PromptInput,
+    output_schema: Dict[str, Any], n: int = 1, **kwargs) -> List[Dict[str, Any]]:
+        """
+        batch_invoke_with_schema 的异步版本
+
+        Args:
+            prompt: 提示词（纯文本或文本块列表）
+            output_schema: JSON Schema 定义
+            n: 采样数量
+            **kwargs: 其他参数（node_name、agent_name 用于日志记录）
+
+        Returns:
+            List[Dict[str, Any]]: 解析后的 JSON 对象列表
+        """
+        node_name = kwargs.pop("node_name", "unknown")
+        agent_name = kwargs.pop("agent_name", "InterviewAgent")
+
+        start_time = time.time()
+        results, usage = await self._abatch_invoke_with_schema(prompt, output_schema, n=n, **kwargs)
+        duration = time.time() - start_time
+
+        self._log_usage(agent_name, node_name, usage, duration)
+        return results
+
+    @staticmethod
+    def _merge_usage(total_usage: Dict, usage: Dict) -> None:
+        """将一次调用的 token 使用量累加到 total_usage"""
+        total_usage["prompt_tokens"] += usage.get("prompt_tokens", 0)
+        total_usage["completion_tokens"] += usage.get("completion_tokens", 0)
+
+    @staticmethod
+    def _log_usage(agent_name: str, node_name: str, usage: Dict, duration: float) -> None:
+        """记录一次 LLM 调用的 token 使用量和耗时"""
         # 使用 Loguru 记录日志
-        node_logger = logger.bind(agent=agent_name, node=node_name)
+        node_logger = _bound_logger(agent_name, node_name)
 
         input_tokens = usage.get('prompt_tokens', 0)
         output_tokens = usage.get('completion_tokens', 0)
         total_tokens = input_tokens + output_tokens
 
-        # 同时保留控制台输出（用户友好）
-        print(f"[埋点] 节点: {node_name} | "
-              f"输入token: {input_tokens} | "
-              f"输出token: {output_tokens} | "
-              f"Total Tokens: {total_tokens} | "
-              f"耗时: {duration:.2f}s")
+        # 调试时保留控制台输出（print 会在调用路径上同步刷新 stdout）
+        if _PRINT_USAGE:
+            print(f"[埋点] 节点: {node_name} | "
+                  f"输入token: {input_tokens} | "
+                  f"输出token: {output_tokens} | "
+                  f"Total Tokens: {total_tokens} | "
+                  f"耗时: {duration:.2f}s")
 
-        # 记录到日志文件
+        # 记录到日志文件（参数交给 loguru 格式化，没有 sink 接收该级别时不做字符串拼接）
         node_logger.info(
-            f"LLM调用完成 | 输入token: {input_tokens} | "
-            f"输出token: {output_tokens} | 总计: {total_tokens} | "
-            f"耗时: {duration:.2f}s"
+            "LLM调用完成 | 输入token: {} | 输出token: {} | 总计: {} | 耗时: {:.2f}s",
+            input_tokens, output_tokens, total_tokens, duration
         )
 
-        return result
-
 
     @classmethod
     @abstractmethod
@@ -0,0 +1,154 @@
+"""
+微批处理 LLM 包装器
+多个面试会话共享同一个 LLM 时，把短时间窗口内并发到达的结构化调用合并后再发给服务端
+"""
+
+import asyncio
+import json
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .base import BaseLLM, PromptInput
+
+
+class BatchingLLM(BaseLLM):
+    """
+    微批处理 LLM 包装器
+
+    异步结构化调用先进入队列，每隔 flush_interval 秒（或队列达到 max_batch_size）统一发出：
+    提示词、Schema 和参数完全相同的请求合并为一次 n=k 的多采样调用，共享同一次输入 token 的预填充；
+    其余请求并发发出，并用 max_concurrency 限制同时在途的请求数，避免触发服务端限流。
+    同步调用、多采样调用和流式调用直接转发，不参与合并。
+    """
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        flush_interval: float = 0.01,
+        max_batch_size: int = 16,
+        max_concurrency: int = 8
+    ):
+        """
+        初始化微批处理包装器
+
+        Args:
+            llm: 被包装的 LLM 实例
+            flush_interval: 攒批窗口，单位秒（默认 0.01）
+            max_batch_size: 队列达到该长度时立即发出（默认 16）
+            max_concurrency: 同时在途的服务端请求数上限（默认 8）
+        """
+        super().__init__(llm.api_key, llm.model_name, llm.temperature)
+        self.llm = llm
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_concurrency = max_concurrency
+
+        # 待发出的请求：(提示词, Schema, 参数, Future)
+        self._pending: List[Tuple[PromptInput, Dict[str, Any], Dict[str, Any], asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # 在途的分组任务（持有引用，避免任务在完成前被回收）
+        self._tasks: set = set()
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        """调用 LLM（同步，不合并）"""
+        return self.llm.invoke(prompt, **kwargs)
+
+    async def ainvoke(self, messages, **kwargs):
+        """调用 LLM（异步，不合并）"""
+        return await self.llm.ainvoke(messages, **kwargs)
+
+    def _invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """同步调用不合并，直接转发给被包装的 LLM"""
+        return self.llm._invoke_with_schema(prompt, output_schema, **kwargs)
+
+    def _batch_invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], n: int = 1, **kwargs) -> tuple[List[Dict[str, Any]], Dict]:
+        """多采样调用不合并，直接转发给被包装的 LLM"""
+        return self.llm._batch_invoke_with_schema(prompt, output_schema, n=n, **kwargs)
+
+    async def _abatch_invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], n: int = 1, **kwargs) -> tuple[List[Dict[str, Any]], Dict]:
+        """多采样调用不合并，直接转发给被包装的 LLM"""
+        return await self.llm._abatch_invoke_with_schema(prompt, output_schema, n=n, **kwargs)
+
+    async def _astream_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stream_field: str, on_delta: Callable[[str, bool], None], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """流式调用不合并，直接转发给被包装的 LLM"""
+        return await self.llm._astream_with_schema(prompt, output_schema, stream_field, on_delta, **kwargs)
+
+    async def _astream_until_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stop_field: str, stop_value: Any, **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """提前结束的流式调用不合并，直接转发给被包装的 LLM"""
+        return await self.llm._astream_until_with_schema(prompt, output_schema, stop_field, stop_value, **kwargs)
+
+    async def _ainvoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """
+        调用 LLM 并返回结构化输出（异步，进入攒批队列）
+
+        Returns:
+            tuple: (解析后的 JSON 对象, 分摊后的 token 使用量)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((prompt, output_schema, kwargs, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.flush_interval, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        """发出队列中的全部请求：相同请求合并为一组，各组并发执行"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        pending, self._pending = self._pending, []
+        groups: Dict[Tuple[str, int, str], list] = {}
+        for request in pending:
+            prompt, output_schema, kwargs, future = request
+            if future.done():
+                # 调用方已取消（如被丢弃的投机任务）
+                continue
+            key = (
+                json.dumps(prompt, ensure_ascii=False, sort_keys=True),
+                id(output_schema),
+                repr(sorted(kwargs.items()))
+            )
+            groups.setdefault(key, []).append(request)
+
+        for group in groups.values():
+            task = asyncio.ensure_future(self._run_group(group))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_group(self, group: list) -> None:
+        """以一次调用完成一组相同的请求，结果和 token 使用量按请求分摊"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        prompt, output_schema, kwargs, _ = group[0]
+        try:
+            async with self._semaphore:
+                if len(group) == 1:
+                    result, usage = await self.llm._ainvoke_with_schema(prompt, output_schema, **kwargs)
+                    results = [result]
+                else:
+                    results, usage = await self.llm._abatch_invoke_with_schema(
+                        prompt, output_schema, n=len(group), **kwargs
+                    )
+        except Exception as e:
+            for *_, future in group:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        share = {key: value // len(group) for key, value in usage.items()}
+        for (*_, future), result in zip(group, results):
+            if not future.done():
+                future.set_result((result, share))
+
+    @classmethod
+    def get_default_model(cls) -> str:
+        """包装器没有自己的默认模型，实际使用被包装 LLM 的模型"""
+        return ""
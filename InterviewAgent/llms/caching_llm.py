@@ -0,0 +1,244 @@
+"""
+带语义缓存的 LLM 包装器
+对低方差的决策类调用（judge / nextStep 等）复用语义相近输入的结构化结果
+"""
+
+import copy
+import json
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from .base import BaseLLM, PromptInput
+
+
+# 决策类节点：输出取值少，误命中代价高，使用更严格的阈值
+DEFAULT_STRICT_NODES = frozenset({"nextStep"})
+
+# 不做缓存的节点：生成类节点需要多样性；*Judge 节点同时输出本轮思考（含轮次信息），
+# 复用其他轮次的结果会把别的轮次的思考写入 thinking_process
+DEFAULT_SKIP_NODES = frozenset({
+    "questionBuild", "deepQuestion", "contextCompress",
+    "questionBuildJudge", "adjustQuestionJudge", "deepQuestionJudge"
+})
+
+
+class CachingLLM(BaseLLM):
+    """
+    语义缓存 LLM 包装器
+
+    缓存作用域由 节点名 + 静态前缀 + 输出 Schema 决定，只有三者完全一致的调用才会互相复用；
+    作用域内对动态尾部（或整个纯文本提示词）做向量化，余弦相似度超过阈值即视为命中。
+    """
+
+    def __init__(
+        self,
+        llm: BaseLLM,
+        embedding,
+        threshold: float = 0.92,
+        strict_threshold: float = 0.97,
+        strict_nodes: FrozenSet[str] = DEFAULT_STRICT_NODES,
+        skip_nodes: FrozenSet[str] = DEFAULT_SKIP_NODES,
+        max_entries: int = 1024
+    ):
+        """
+        初始化缓存包装器
+
+        Args:
+            llm: 被包装的 LLM 实例
+            embedding: 嵌入模型（需提供 embed_query / aembed_query）
+            threshold: 命中所需的最小余弦相似度（默认 0.92）
+            strict_threshold: strict_nodes 使用的最小余弦相似度（默认 0.97）
+            strict_nodes: 使用严格阈值的节点名
+            skip_nodes: 不做缓存的节点名
+            max_entries: 每个作用域的最大缓存条目数，超出后淘汰最早的条目
+        """
+        super().__init__(llm.api_key, llm.model_name, llm.temperature)
+        self.llm = llm
+        self.embedding = embedding
+        self.threshold = threshold
+        self.strict_threshold = strict_threshold
+        self.strict_nodes = strict_nodes
+        self.skip_nodes = skip_nodes
+        self.max_entries = max_entries
+
+        # 作用域 -> 有序的 (单位向量, 结构化结果) 列表
+        self._entries: Dict[str, "OrderedDict[int, Tuple[np.ndarray, Dict[str, Any]]]"] = {}
+        self._next_id = 0
+        # Schema 的 id -> (Schema, 规范 JSON 序列化结果)，Schema 是模块级常量，每个只序列化一次
+        self._schema_bytes: Dict[int, Tuple[Dict[str, Any], bytes]] = {}
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+
+    def invoke(self, prompt: str, **kwargs) -> str:
+        """调用 LLM（同步，不缓存）"""
+        return self.llm.invoke(prompt, **kwargs)
+
+    async def ainvoke(self, messages, **kwargs):
+        """调用 LLM（异步，不缓存）"""
+        return await self.llm.ainvoke(messages, **kwargs)
+
+    def _invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """直接转发给被包装的 LLM"""
+        return self.llm._invoke_with_schema(prompt, output_schema, **kwargs)
+
+    async def _ainvoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """直接转发给被包装的 LLM"""
+        return await self.llm._ainvoke_with_schema(prompt, output_schema, **kwargs)
+
+    def _batch_invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], n: int = 1, **kwargs) -> tuple[List[Dict[str, Any]], Dict]:
+        """多采样调用不缓存，直接转发给被包装的 LLM"""
+        return self.llm._batch_invoke_with_schema(prompt, output_schema, n=n, **kwargs)
+
+    async def _abatch_invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], n: int = 1, **kwargs) -> tuple[List[Dict[str, Any]], Dict]:
+        """多采样调用不缓存，直接转发给被包装的 LLM"""
+        return await self.llm._abatch_invoke_with_schema(prompt, output_schema, n=n, **kwargs)
+
+    async def _astream_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stream_field: str, on_delta: Callable[[str, bool], None], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """流式调用不缓存，直接转发给被包装的 LLM"""
+        return await self.llm._astream_with_schema(prompt, output_schema, stream_field, on_delta, **kwargs)
+
+    async def _astream_until_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stop_field: str, stop_value: Any, **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """直接转发给被包装的 LLM"""
+        return await self.llm._astream_until_with_schema(prompt, output_schema, stop_field, stop_value, **kwargs)
+
+    def invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """调用 LLM 并返回结构化输出（同步，优先读取语义缓存）"""
+        node_name = kwargs.get("node_name", "unknown")
+        if node_name in self.skip_nodes:
+            return self.llm.invoke_with_schema(prompt, output_schema, **kwargs)
+
+        scope, text = self._split_prompt(node_name, prompt, output_schema)
+        vector = self._normalize(self.embedding.embed_query(text))
+
+        cached = self._lookup(scope, vector, node_name)
+        if cached is not None:
+            return cached
+
+        result = self.llm.invoke_with_schema(prompt, output_schema, **kwargs)
+        self._insert(scope, vector, result)
+        return result
+
+    async def ainvoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> Dict[str, Any]:
+        """调用 LLM 并返回结构化输出（异步，优先读取语义缓存）"""
+        node_name = kwargs.get("node_name", "unknown")
+        if node_name in self.skip_nodes:
+            return await self.llm.ainvoke_with_schema(prompt, output_schema, **kwargs)
+
+        scope, text = self._split_prompt(node_name, prompt, output_schema)
+        vector = self._normalize(await self.embedding.aembed_query(text))
+
+        cached = self._lookup(scope, vector, node_name)
+        if cached is not None:
+            return cached
+
+        result = await self.llm.ainvoke_with_schema(prompt, output_schema, **kwargs)
+        self._insert(scope, vector, result)
+        return result
+
+    async def astream_until_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stop_field: str, stop_value: Any, **kwargs) -> Dict[str, Any]:
+        """流式调用 LLM 并返回结构化输出，stop_field 输出为 stop_value 时提前结束（异步，优先读取语义缓存）"""
+        node_name = kwargs.get("node_name", "unknown")
+        if node_name in self.skip_nodes:
+            return await self.llm.astream_until_with_schema(prompt, output_schema, stop_field, stop_value, **kwargs)
+
+        scope, text = self._split_prompt(node_name, prompt, output_schema)
+        vector = self._normalize(await self.embedding.aembed_query(text))
+
+        cached = self._lookup(scope, vector, node_name)
+        if cached is not None:
+            return cached
+
+        result = await self.llm.astream_until_with_schema(prompt, output_schema, stop_field, stop_value, **kwargs)
+        self._insert(scope, vector, result)
+        return result
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存统计信息"""
+        return {
+            "size": sum(len(entries) for entries in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    def _split_prompt(self, node_name: str, prompt: PromptInput, output_schema: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        拆分出缓存作用域和需要向量化的文本
+
+        静态前缀（带 cache_control 的文本块）逐字节参与作用域哈希，
+        只有动态尾部参与向量相似度比较，避免长指令稀释回答之间的差异
+        """
+        if isinstance(prompt, str):
+            static_parts: List[str] = []
+            text = prompt
+        else:
+            static_parts = [block["text"] for block in prompt if "cache_control" in block]
+            text = "\n".join(block["text"] for block in prompt if "cache_control" not in block)
+
+        digest = blake2b(digest_size=16)
+        digest.update(self._schema_key(output_schema))
+        for part in static_parts:
+            digest.update(b"\x00")
+            digest.update(part.encode("utf-8"))
+
+        return f"{node_name}:{digest.hexdigest()}", text
+
+    def _schema_key(self, output_schema: Dict[str, Any]) -> bytes:
+        """按 id 缓存 Schema 的规范 JSON 序列化结果（同时保存 Schema 本身，避免 id 被复用后误命中）"""
+        cached = self._schema_bytes.get(id(output_schema))
+        if cached is None or cached[0] is not output_schema:
+            encoded = json.dumps(output_schema, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            cached = self._schema_bytes[id(output_schema)] = (output_schema, encoded)
+        return cached[1]
+
+    def _lookup(self, scope: str, vector: np.ndarray, node_name: str) -> Optional[Dict[str, Any]]:
+        """在作用域内查找最相似的条目"""
+        entries = self._entries.get(scope)
+        if not entries:
+            self.misses += 1
+            return None
+
+        items = list(entries.values())
+        similarities = np.stack([vec for vec, _ in items]) @ vector
+        best = int(np.argmax(similarities))
+
+        threshold = self.strict_threshold if node_name in self.strict_nodes else self.threshold
+        if float(similarities[best]) < threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        print(f"[缓存] 节点: {node_name} | 命中语义缓存 | 相似度: {float(similarities[best]):.3f}")
+        # 节点可能会修改返回结果，返回副本避免污染缓存
+        return copy.deepcopy(items[best][1])
+
+    def _insert(self, scope: str, vector: np.ndarray, result: Dict[str, Any]) -> None:
+        """写入缓存，超出容量时淘汰作用域内最早的条目"""
+        entries = self._entries.setdefault(scope, OrderedDict())
+        entries[self._next_id] = (vector, copy.deepcopy(result))
+        self._next_id += 1
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    @staticmethod
+    def _normalize(vec: List[float]) -> np.ndarray:
+        """归一化为单位向量（float32）"""
+        arr = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(arr)
+        return arr / norm if norm > 0 else arr
+
+    @classmethod
+    def get_default_model(cls) -> str:
+        """包装器没有自己的默认模型，实际使用被包装 LLM 的模型"""
+        return ""
@@ -0,0 +1,115 @@
+"""
+流式 JSON 字段提取
+在 LLM 流式输出 JSON 的过程中，增量解码指定字符串字段的内容
+"""
+
+import json
+import re
+from typing import Callable
+
+
+class JsonStringFieldStreamer:
+    """
+    增量提取 JSON 对象中某个字符串字段的值
+
+    每次 feed 一段模型输出的增量文本，字段值中新解码出的字符会立即交给 on_delta(text, done)，
+    字段结束时 done 为 True；转义序列（包括 \\uXXXX）跨增量边界时会等待凑齐后再解码。
+    """
+
+    def __init__(self, field: str, on_delta: Callable[[str, bool], None]):
+        """
+        初始化提取器
+
+        Args:
+            field: 需要提取的字段名
+            on_delta: 收到新解码字符或字段结束时的回调，参数为 (新增文本, 字段是否结束)
+        """
+        self.on_delta = on_delta
+        self._key_pattern = re.compile(r'"' + re.escape(field) + r'"\s*:\s*"')
+        self._buffer = ""
+        # 字段值起始位置之前为 None；之后为已解码到的位置
+        self._pos = None
+        self.done = False
+        self.value = ""
+
+    def feed(self, chunk: str) -> None:
+        """
+        输入一段增量文本
+
+        Args:
+            chunk: 模型输出的增量文本
+        """
+        if self.done or not chunk:
+            return
+        self._buffer += chunk
+
+        if self._pos is None:
+            match = self._key_pattern.search(self._buffer)
+            if match is None:
+                return
+            self._pos = match.end()
+
+        decoded = []
+        buffer, pos = self._buffer, self._pos
+        while pos < len(buffer):
+            char = buffer[pos]
+            if char == '"':
+                self.done = True
+                break
+            if char != "\\":
+                decoded.append(char)
+                pos += 1
+                continue
+
+            # 转义序列：长度不够时等待下一段增量
+            length = 6 if buffer[pos + 1:pos + 2] == "u" else 2
+            if pos + length > len(buffer):
+                break
+            escape = buffer[pos:pos + length]
+            if length == 6 and escape[2:4].upper() in ("D8", "D9", "DA", "DB"):
+                # UTF-16 代理对需要连同低位一起解码
+                if pos + 12 > len(buffer):
+                    break
+                escape = buffer[pos:pos + 12]
+            decoded.append(json.loads(f'"{escape}"'))
+            pos += len(escape)
+
+        self._pos = pos
+        if decoded or self.done:
+            text = "".join(decoded)
+            self.value += text
+            self.on_delta(text, self.done)
+
+
+def close_json_prefix(text: str) -> str:
+    """
+    补全一段 JSON 前缀末尾缺少的右括号
+
+    只处理停在完整值之后的前缀（如某个字段刚输出完），字符串内的括号和转义字符不计入
+
+    Args:
+        text: 模型已输出的 JSON 前缀
+
+    Returns:
+        补全右括号后的文本
+    """
+    closers = []
+    in_string = False
+    escaped = False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            closers.append("}")
+        elif char == "[":
+            closers.append("]")
+        elif char in "}]" and closers:
+            closers.pop()
+    return text + "".join(reversed(closers))
@@ -4,10 +4,123 @@ OpenAI LLM 实现
 """
 
 import json
-from typing import Dict, Any, Optional
+import asyncio
+import importlib.util
+import re
+import threading
+import weakref
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable
+import httpx
 from openai import OpenAI, AsyncOpenAI
-from .base import BaseLLM
-from jsonschema import validate, ValidationError
+from .base import BaseLLM, PromptInput
+from .json_stream import JsonStringFieldStreamer, close_json_prefix
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+try:
+    # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方的异常处理无需区分
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+
+# HTTP/2 需要 h2 包（pip install "httpx[http2]"），未安装时回退到 HTTP/1.1 长连接
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# 连接池配置：保持长连接，避免重复的 TCP / TLS 握手
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=300)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Schema 校验失败时可能抛出的异常（fastjsonschema 未安装时退回 jsonschema）
+_VALIDATION_ERRORS = (ValidationError,) if fastjsonschema is None else (ValidationError, fastjsonschema.JsonSchemaException)
+
+# 提示词中的 Schema 段落（严格模式下 Schema 已通过 response_format 传给服务端）
+_SCHEMA_SECTION = re.compile(
+    r"请按照以下 JSON 模式定义格式化输出：\s*<OUTPUT JSON SCHEMA>.*?</OUTPUT JSON SCHEMA>\s*"
+    r"(?:确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。\s*)?",
+    re.S
+)
+
+
+# 模型输出中最外层的 JSON 对象（用于去掉代码块标记或前后的说明文字）
+_JSON_OBJECT = re.compile(r"\{.*\}", re.S)
+
+
+@lru_cache(maxsize=256)
+def _strip_schema_section(text: str) -> str:
+    """去掉提示词中的 Schema 段落（静态前缀重复出现，按文本缓存结果）"""
+    return _SCHEMA_SECTION.sub("", text)
+
+
+# (api_key, base_url) -> 同步客户端，多个 OpenAILLM 实例（不同温度、不同节点）共用
+_CLIENT_CACHE: Dict[tuple, OpenAI] = {}
+# 事件循环 -> {(api_key, base_url) -> 异步客户端}：异步连接池绑定在创建它的事件循环上，
+# 每次 asyncio.run 都是新的循环，只在同一个循环内共享；循环被回收后对应的客户端随之释放
+_ASYNC_CLIENT_CACHE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[tuple, AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+_CLIENT_CACHE_LOCK = threading.Lock()
+
+
+def _client_kwargs(api_key: str, base_url: Optional[str]) -> Dict[str, Any]:
+    """OpenAI 客户端的构造参数"""
+    client_kwargs = {"api_key": api_key}
+    if base_url:
+        client_kwargs["base_url"] = base_url
+    return client_kwargs
+
+
+def _get_client(api_key: str, base_url: Optional[str]) -> OpenAI:
+    """
+    获取进程内共享的 OpenAI 同步客户端，不存在时创建
+
+    Args:
+        api_key: API Key
+        base_url: 兼容 OpenAI API 的服务地址（可选）
+
+    Returns:
+        OpenAI: 同步客户端
+    """
+    key = (api_key, base_url or "")
+    with _CLIENT_CACHE_LOCK:
+        client = _CLIENT_CACHE.get(key)
+        if client is None:
+            client = _CLIENT_CACHE[key] = OpenAI(
+                http_client=httpx.Client(http2=_HTTP2_AVAILABLE, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+                **_client_kwargs(api_key, base_url)
+            )
+        return client
+
+
+def _get_async_client(api_key: str, base_url: Optional[str]) -> AsyncOpenAI:
+    """
+    获取当前事件循环上共享的 OpenAI 异步客户端，不存在时创建（必须在事件循环中调用）
+
+    Args:
+        api_key: API Key
+        base_url: 兼容 OpenAI API 的服务地址（可选）
+
+    Returns:
+        AsyncOpenAI: 异步客户端
+    """
+    loop = asyncio.get_running_loop()
+    key = (api_key, base_url or "")
+    with _CLIENT_CACHE_LOCK:
+        clients = _ASYNC_CLIENT_CACHE.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            # HTTP/2 下并发请求复用同一条连接
+            client = clients[key] = AsyncOpenAI(
+                http_client=httpx.AsyncClient(http2=_HTTP2_AVAILABLE, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+                **_client_kwargs(api_key, base_url)
+            )
+        return client
 
 
 class OpenAILLM(BaseLLM):
@@ -22,18 +135,35 @@ class OpenAILLM(BaseLLM):
         model_name: Optional[str] = None,
         base_url: Optional[str] = None,
         temperature: float = 0.7,
+        structured_output: bool = False,
         **kwargs
     ):
+        """
+        初始化 OpenAI LLM
+
+        Args:
+            api_key: API Key
+            model_name: 模型名称（可选）
+            base_url: 兼容 OpenAI API 的服务地址（可选）
+            temperature: 采样温度
+            structured_output: 是否使用 json_schema 严格模式做约束解码（需要服务端支持 Structured Outputs，
+                DeepSeek 等只支持 json_object 的服务保持 False）
+        """
         super().__init__(api_key, model_name, temperature, **kwargs)
+        self.structured_output = structured_output
+        # 原始 Schema 的 id -> (原始 Schema, 严格模式 Schema)
+        self._strict_schemas: Dict[int, tuple] = {}
+        # 原始 Schema 的 id -> (原始 Schema, 编译好的校验函数)
+        self._validators: Dict[int, tuple] = {}
 
-        # 初始化同步客户端
-        client_kwargs = {"api_key": api_key}
-        if base_url:
-            client_kwargs["base_url"] = base_url
-        self.client = OpenAI(**client_kwargs)
+        # 相同 (api_key, base_url) 的实例共享同一个同步客户端及其连接池；异步客户端按事件循环获取
+        self.base_url = base_url
+        self.client = _get_client(api_key, base_url)
 
-        # 初始化异步客户端
-        self.async_client = AsyncOpenAI(**client_kwargs)
+    @property
+    def async_client(self) -> AsyncOpenAI:
+        """当前事件循环上共享的异步客户端（连接池不能跨事件循环复用）"""
+        return _get_async_client(self.api_key, self.base_url)
 
     def invoke(self, prompt: str, **kwargs) -> str:
         """调用 LLM（同步）"""
@@ -94,23 +224,30 @@ class OpenAILLM(BaseLLM):
 
         return Response(response.choices[0].message.content, usage)
 
-    def _invoke_with_schema(self, prompt: str, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
-        """调用 LLM 并返回结构化输出（同步）"""
+    def _invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """
+        调用 LLM 并返回结构化输出（同步）
+
+        静态前缀放入 system 消息，命中 OpenAI 的自动前缀缓存
+        """
+        messages = self._build_messages(prompt)
         max_retries = 3
         last_result = None
         total_usage = {"prompt_tokens": 0, "completion_tokens": 0}
 
+        request_messages = messages
+
         for attempt in range(max_retries):
             response = self.client.chat.completions.create(
                 model=self.model_name,
-                messages=[{"role": "user", "content": prompt}],
+                messages=request_messages,
                 temperature=kwargs.get("temperature", self.temperature),
-                response_format={"type": "json_object"},
+                response_format=self._response_format(output_schema),
                 **{k: v for k, v in kwargs.items() if k not in ["temperature", "output_schema"]}
             )
 
             content = response.choices[0].message.content
-            result = json.loads(content)
+            result = self._load_json(content)
             last_result = result
 
             # 累计 token 使用量
@@ -120,13 +257,15 @@ class OpenAILLM(BaseLLM):
 
             # 验证输出是否符合 schema
             try:
-                validate(instance=result, schema=output_schema)
+                self._validate(result, output_schema)
                 # 验证成功，返回结果
                 return result, total_usage
-            except ValidationError as e:
+            except _VALIDATION_ERRORS as e:
                 print(f"[警告] 第 {attempt + 1}/{max_retries} 次尝试，LLM 输出不符合 schema: {e.message}")
                 if attempt < max_retries - 1:
                     print(f"[重试] 正在进行第 {attempt + 2} 次尝试...")
+                    # 带上错误输出和校验信息让模型修正，而不是从头重新生成
+                    request_messages = self._repair_messages(messages, content, e.message)
                 else:
                     # 最后一次尝试仍然失败
                     print(f"[错误] 已达到最大重试次数 ({max_retries})，返回最后一次结果（可能不符合 schema）")
@@ -135,6 +274,358 @@ class OpenAILLM(BaseLLM):
         # 理论上不会到这里，但为了安全返回最后的结果
         return last_result, total_usage
 
+    async def _ainvoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """调用 LLM 并返回结构化输出（异步）"""
+        messages = self._build_messages(prompt)
+        max_retries = 3
+        last_result = None
+        total_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+
+        request_messages = messages
+
+        for attempt in range(max_retries):
+            response = await self.async_client.chat.completions.create(
+                model=self.model_name,
+                messages=request_messages,
+                temperature=kwargs.get("temperature", self.temperature),
+                response_format=self._response_format(output_schema),
+                **{k: v for k, v in kwargs.items() if k not in ["temperature", "output_schema"]}
+            )
+
+            content = response.choices[0].message.content
+            result = self._load_json(content)
+            last_result = result
+
+            # 累计 token 使用量
+            if hasattr(response, 'usage') and response.usage:
+                total_usage["prompt_tokens"] += response.usage.prompt_tokens
+                total_usage["completion_tokens"] += response.usage.completion_tokens
+
+            # 验证输出是否符合 schema
+            try:
+                self._validate(result, output_schema)
+                return result, total_usage
+            except _VALIDATION_ERRORS as e:
+                print(f"[警告] 第 {attempt + 1}/{max_retries} 次尝试，LLM 输出不符合 schema: {e.message}")
+                if attempt < max_retries - 1:
+                    print(f"[重试] 正在进行第 {attempt + 2} 次尝试...")
+                    # 带上错误输出和校验信息让模型修正，而不是从头重新生成
+                    request_messages = self._repair_messages(messages, content, e.message)
+                else:
+                    print(f"[错误] 已达到最大重试次数 ({max_retries})，返回最后一次结果（可能不符合 schema）")
+                    return last_result, total_usage
+
+        return last_result, total_usage
+
+    async def _astream_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stream_field: str, on_delta: Callable[[str, bool], None], **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """
+        流式调用 LLM，生成过程中增量解码 stream_field 字段（异步）
+
+        流式结果不符合 schema 时退回带重试的 _ainvoke_with_schema；
+        字段尚未输出完整时，只回调新结果中未输出过的部分
+        """
+        messages = self._build_messages(prompt)
+        streamer = JsonStringFieldStreamer(stream_field, on_delta)
+        total_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+
+        stream = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=kwargs.get("temperature", self.temperature),
+            response_format=self._response_format(output_schema),
+            stream=True,
+            stream_options={"include_usage": True},
+            **{k: v for k, v in kwargs.items() if k not in ["temperature", "output_schema"]}
+        )
+
+        parts = []
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                streamer.feed(chunk.choices[0].delta.content)
+            if getattr(chunk, 'usage', None):
+                total_usage["prompt_tokens"] += chunk.usage.prompt_tokens
+                total_usage["completion_tokens"] += chunk.usage.completion_tokens
+
+        try:
+            result = self._load_json("".join(parts))
+            self._validate(result, output_schema)
+            return result, total_usage
+        except (json.JSONDecodeError, *_VALIDATION_ERRORS) as e:
+            print(f"[警告] 流式输出不符合 schema，改用非流式重试: {e}")
+
+        result, usage = await self._ainvoke_with_schema(prompt, output_schema, **kwargs)
+        self._merge_usage(total_usage, usage)
+        if not streamer.done:
+            value = result.get(stream_field, "")
+            if isinstance(value, str) and value.startswith(streamer.value):
+                on_delta(value[len(streamer.value):], True)
+            else:
+                on_delta("", True)
+        return result, total_usage
+
+    async def _astream_until_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any],
+    stop_field: str, stop_value: Any, **kwargs) -> tuple[Dict[str, Any], Dict]:
+        """
+        流式调用 LLM，stop_field 输出为 stop_value 时提前结束生成（异步）
+
+        stop_field 一出现就把已生成的前缀补全右括号后解析校验，通过则关闭流直接返回，
+        排在它后面的可选字段不再生成（提前结束时服务端不返回 token 使用量）；
+        取值不同或校验不通过时照常读完整个流，结果不符合 schema 时退回带重试的 _ainvoke_with_schema
+        """
+        messages = self._build_messages(prompt)
+        # 字符串内的同名文本前面带转义的引号，不会匹配
+        pattern = re.compile(r'(?<!\\)"' + re.escape(stop_field) + r'"\s*:\s*(true|false|null|-?[\d.eE+-]+|"(?:[^"\\]|\\.)*")')
+        total_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+
+        stream = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=kwargs.get("temperature", self.temperature),
+            response_format=self._response_format(output_schema),
+            stream=True,
+            stream_options={"include_usage": True},
+            **{k: v for k, v in kwargs.items() if k not in ["temperature", "output_schema"]}
+        )
+
+        content = ""
+        # 已检查到的位置：每段增量只向前回看一小段，避免反复扫描整个输出
+        scanned = 0
+        checked = False
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                content += chunk.choices[0].delta.content
+                if not checked:
+                    match = pattern.search(content, max(0, scanned - 64))
+                    scanned = len(content)
+                    # 数值可能还没输出完，等后面出现分隔符再判断
+                    if match is not None and match.end() < len(content):
+                        checked = True
+                        if _json_loads(match.group(1)) == stop_value:
+                            try:
+                                result = self._load_json(close_json_prefix(content[:match.end()]))
+                                self._validate(result, output_schema)
+                            except (json.JSONDecodeError, *_VALIDATION_ERRORS):
+                                continue
+                            await stream.close()
+                            return result, total_usage
+            if getattr(chunk, 'usage', None):
+                total_usage["prompt_tokens"] += chunk.usage.prompt_tokens
+                total_usage["completion_tokens"] += chunk.usage.completion_tokens
+
+        try:
+            result = self._load_json(content)
+            self._validate(result, output_schema)
+            return result, total_usage
+        except (json.JSONDecodeError, *_VALIDATION_ERRORS) as e:
+            print(f"[警告] 流式输出不符合 schema，改用非流式重试: {e}")
+
+        result, usage = await self._ainvoke_with_schema(prompt, output_schema, **kwargs)
+        self._merge_usage(total_usage, usage)
+        return result, total_usage
+
+    @staticmethod
+    def _repair_messages(messages: List[Dict[str, str]], content: str, error: str) -> List[Dict[str, str]]:
+        """
+        构造修正请求：原始消息 + 上一次的错误输出 + 校验错误说明
+
+        原始消息保持不变，服务端的前缀缓存依然有效；模型只需修正不符合 schema 的部分
+
+        Args:
+            messages: 原始消息列表
+            content: 上一次不符合 schema 的输出
+            error: 校验错误信息
+
+        Returns:
+            修正请求的消息列表
+        """
+        return messages + [
+            {"role": "assistant", "content": content},
+            {"role": "user", "content": f"上面的 JSON 未通过 schema 校验：{error}\n请修正后重新输出完整的 JSON，不要输出其他内容。"}
+        ]
+
+    def _batch_invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], n: int = 1, **kwargs) -> tuple[List[Dict[str, Any]], Dict]:
+        """
+        对同一提示词采样 n 个结构化输出（同步）
+
+        使用 n 参数在一次请求中返回 n 个 choices，共享同一份输入 token；
+        不符合 schema 的候选再单独走带重试的 _invoke_with_schema 补齐
+        """
+        messages = self._build_messages(prompt)
+        response = self.client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=kwargs.get("temperature", self.temperature),
+            response_format=self._response_format(output_schema),
+            n=n,
+            **{k: v for k, v in kwargs.items() if k not in ["temperature", "output_schema", "n"]}
+        )
+        results, total_usage = self._parse_choices(response, output_schema)
+
+        for _ in range(n - len(results)):
+            result, usage = self._invoke_with_schema(prompt, output_schema, **kwargs)
+            results.append(result)
+            self._merge_usage(total_usage, usage)
+
+        return results, total_usage
+
+    async def _abatch_invoke_with_schema(self, prompt: PromptInput, output_schema: Dict[str, Any], n: int = 1, **kwargs) -> tuple[List[Dict[str, Any]], Dict]:
+        """对同一提示词采样 n 个结构化输出（异步，单请求 n 个 choices）"""
+        messages = self._build_messages(prompt)
+        response = await self.async_client.chat.completions.create(
+            model=self.model_name,
+            messages=messages,
+            temperature=kwargs.get("temperature", self.temperature),
+            response_format=self._response_format(output_schema),
+            n=n,
+            **{k: v for k, v in kwargs.items() if k not in ["temperature", "output_schema", "n"]}
+        )
+        results, total_usage = self._parse_choices(response, output_schema)
+
+        retries = await asyncio.gather(*[
+            self._ainvoke_with_schema(prompt, output_schema, **kwargs)
+            for _ in range(n - len(results))
+        ])
+        for result, usage in retries:
+            results.append(result)
+            self._merge_usage(total_usage, usage)
+
+        return results, total_usage
+
+    def _parse_choices(self, response, output_schema: Dict[str, Any]) -> tuple[List[Dict[str, Any]], Dict]:
+        """解析一次多采样响应，只保留可解析且符合 schema 的候选"""
+        results = []
+        for choice in response.choices:
+            try:
+                result = self._load_json(choice.message.content)
+                self._validate(result, output_schema)
+            except (json.JSONDecodeError, *_VALIDATION_ERRORS) as e:
+                print(f"[警告] 第 {choice.index + 1} 个候选不符合 schema，将单独重试: {e}")
+                continue
+            results.append(result)
+
+        total_usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        if hasattr(response, 'usage') and response.usage:
+            total_usage["prompt_tokens"] += response.usage.prompt_tokens
+            total_usage["completion_tokens"] += response.usage.completion_tokens
+
+        return results, total_usage
+
+    def _validate(self, result: Any, output_schema: Dict[str, Any]) -> None:
+        """
+        按 Schema 校验结构化输出，不符合时抛出 _VALIDATION_ERRORS 中的异常
+
+        每个 Schema 只编译一次：安装了 fastjsonschema 时生成专用校验函数，
+        否则缓存 jsonschema 校验器实例，省去 validate() 每次检查并重建校验器的开销
+        """
+        cached = self._validators.get(id(output_schema))
+        if cached is None or cached[0] is not output_schema:
+            if fastjsonschema is not None:
+                validator = fastjsonschema.compile(output_schema)
+            else:
+                validator = validator_for(output_schema)(output_schema).validate
+            cached = self._validators[id(output_schema)] = (output_schema, validator)
+        cached[1](result)
+
+    def _build_messages(self, prompt: PromptInput) -> List[Dict[str, str]]:
+        """
+        将提示词转换为 OpenAI 消息列表
+
+        文本块形式的提示词中，静态前缀（带 cache_control 的块）放入 system 消息，动态尾部放入 user 消息：
+        同一节点的多次调用 system 消息逐字节一致，满足服务端自动前缀缓存的条件。
+        严格模式下 Schema 由 response_format 约束，去掉提示词中重复的 Schema 段落以减少输入 token
+        """
+        if isinstance(prompt, str):
+            static, dynamic = "", prompt
+        else:
+            static = "\n".join(block["text"] for block in prompt if "cache_control" in block)
+            dynamic = "\n".join(block["text"] for block in prompt if "cache_control" not in block)
+
+        if self.structured_output:
+            static, dynamic = _strip_schema_section(static), _SCHEMA_SECTION.sub("", dynamic)
+
+        if not static or not dynamic:
+            return [{"role": "user", "content": static or dynamic}]
+        return [
+            {"role": "system", "content": static},
+            {"role": "user", "content": dynamic}
+        ]
+
+    def _response_format(self, output_schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        生成 response_format 参数
+
+        structured_output 开启时使用 json_schema 严格模式，服务端按 Schema 约束解码，
+        输出必然是可解析且结构正确的 JSON；否则使用 json_object，只保证输出是 JSON
+        """
+        if not self.structured_output:
+            return {"type": "json_object"}
+
+        cached = self._strict_schemas.get(id(output_schema))
+        if cached is None or cached[0] is not output_schema:
+            cached = (output_schema, self._to_strict_schema(output_schema))
+            self._strict_schemas[id(output_schema)] = cached
+
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": "output", "schema": cached[1], "strict": True}
+        }
+
+    def _load_json(self, content: str) -> Any:
+        """
+        解析模型输出；严格模式下去掉可选字段的 null 占位，保持与 json_object 模式一致的结果
+
+        直接解析失败时，去掉 Markdown 代码块标记并截取最外层的 JSON 对象再解析一次，
+        格式上的小问题不必为此重新调用 LLM；仍然失败时抛出 json.JSONDecodeError
+        """
+        try:
+            result = _json_loads(content)
+        except json.JSONDecodeError:
+            match = _JSON_OBJECT.search(content)
+            if match is None:
+                raise
+            result = _json_loads(match.group(0))
+        return self._drop_nulls(result) if self.structured_output else result
+
+    @classmethod
+    def _to_strict_schema(cls, schema: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        转换为 Structured Outputs 严格模式可接受的 Schema
+
+        严格模式要求对象列出全部字段且禁止额外字段：原本可选的字段改为可为 null 的必填字段，
+        并去掉严格模式不支持的数值范围约束（输出仍会用原始 Schema 校验）
+        """
+        strict = {k: v for k, v in schema.items() if k not in ("minimum", "maximum")}
+
+        if strict.get("type") == "object" and "properties" in strict:
+            required = set(schema.get("required", []))
+            properties = {}
+            for name, prop in strict["properties"].items():
+                prop = cls._to_strict_schema(prop)
+                if name not in required and "type" in prop:
+                    prop = {**prop, "type": [prop["type"], "null"]}
+                    if "enum" in prop:
+                        prop["enum"] = prop["enum"] + [None]
+                properties[name] = prop
+            strict["properties"] = properties
+            strict["required"] = list(properties)
+            strict["additionalProperties"] = False
+
+        if "items" in strict:
+            strict["items"] = cls._to_strict_schema(strict["items"])
+
+        return strict
+
+    @classmethod
+    def _drop_nulls(cls, value: Any) -> Any:
+        """递归去掉对象中值为 null 的字段"""
+        if isinstance(value, dict):
+            return {k: cls._drop_nulls(v) for k, v in value.items() if v is not None}
+        if isinstance(value, list):
+            return [cls._drop_nulls(v) for v in value]
+        return value
+
     @classmethod
     def get_default_model(cls) -> str:
         """获取默认模型名称"""
@@ -31,6 +31,16 @@ output_schema_question_plan_generation = {
     "required": ["question_plan", "total_count"]
 }
 
+# 问题列表择优输出 Schema（用于 questionBuild 节点从多个候选方案中选择）
+output_schema_question_plan_selection = {
+    "type": "object",
+    "properties": {
+        "best_index": {"type": "integer", "minimum": 0, "description": "最佳候选方案的编号"},
+        "reasoning": {"type": "string", "description": "选择理由"}
+    },
+    "required": ["best_index", "reasoning"]
+}
+
 # 单个问题生成输出 Schema（保留用于其他用途）
 output_schema_question_generation = {
     "type": "object",
@@ -115,6 +125,16 @@ output_schema_interview_end = {
     "required": ["should_end", "reason"]
 }
 
+# 简历 / JD 压缩输出 Schema（用于 contextCompress 节点）
+output_schema_context_compression = {
+    "type": "object",
+    "properties": {
+        "resume_summary": {"type": "string", "description": "压缩后的简历"},
+        "jd_summary": {"type": "string", "description": "压缩后的 JD"}
+    },
+    "required": ["resume_summary", "jd_summary"]
+}
+
 # 深度思考输出 Schema（用于 think 节点）
 output_schema_deep_thinking = {
     "type": "object",
@@ -146,6 +166,35 @@ output_schema_reflection = {
     "required": ["round", "node_type", "is_reasonable", "issues_found", "confidence_score", "should_regenerate"]
 }
 
+# 深度思考 + 反思合并输出 Schema（用于 judge 节点，一次调用同时给出本轮思考和反思结果）
+output_schema_think_and_reflect = {
+    "type": "object",
+    "properties": {
+        "thinking": output_schema_deep_thinking,
+        "reflection": output_schema_reflection
+    },
+    "required": ["thinking", "reflection"]
+}
+
+# ===== Schema 文本（导入时各序列化一次，供下方提示词模板复用） =====
+
+def _escape_schema(schema: dict) -> str:
+    """序列化 Schema 并转义花括号，嵌入提示词模板后不会被 str.format 当作字段"""
+    return json.dumps(schema, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')
+
+
+_SCHEMA_STR_QUESTION_PLAN_GENERATION = _escape_schema(output_schema_question_plan_generation)
+_SCHEMA_STR_QUESTION_PLAN_SELECTION = _escape_schema(output_schema_question_plan_selection)
+_SCHEMA_STR_QUESTION_GENERATION = _escape_schema(output_schema_question_generation)
+_SCHEMA_STR_FOLLOW_UP_DECISION = _escape_schema(output_schema_follow_up_decision)
+_SCHEMA_STR_DEEP_QUESTION_GENERATION = _escape_schema(output_schema_deep_question_generation)
+_SCHEMA_STR_QUESTION_ADJUSTMENT = _escape_schema(output_schema_question_adjustment)
+_SCHEMA_STR_INTERVIEW_END = _escape_schema(output_schema_interview_end)
+_SCHEMA_STR_CONTEXT_COMPRESSION = _escape_schema(output_schema_context_compression)
+_SCHEMA_STR_DEEP_THINKING = _escape_schema(output_schema_deep_thinking)
+_SCHEMA_STR_REFLECTION = _escape_schema(output_schema_reflection)
+_SCHEMA_STR_THINK_AND_REFLECT = _escape_schema(output_schema_think_and_reflect)
+
 # ===== 系统提示词定义 =====
 
 # 面试官系统提示词
@@ -186,18 +235,47 @@ INTERVIEWER_SYSTEM_PROMPT = """你是一位专业的技术面试官，负责对
 4. ❌ 过于简单："Redis 是什么？"
 """
 
-# 问题列表生成提示词（用于 questionBuild 节点）
-QUESTION_PLAN_GENERATION_PROMPT = f"""请根据以下信息生成完整的面试问题列表：
+# 面试上下文（同一场面试内不变，放在所有面试共用的指令和 Schema 之后、动态尾部之前，作为可缓存前缀的一部分，用于 questionBuild 相关节点；
+# 除 questionBuild 生成本身外，简历和 JD 使用 contextCompress 压缩后的版本）
+INTERVIEW_CONTEXT_PROMPT = """## 候选人简历
+{resume}
+
+## 目标 JD
+{jd}
+
+## 面试配置
+- 面试模式：{mode}（real=真实面试，training=训练模式）
+- 公司难度：{difficulty}（大厂/中厂/小厂）
+"""
+
+# 简历 / JD 压缩提示词（用于 contextCompress 节点，每场面试只调用一次）
+CONTEXT_COMPRESSION_PROMPT = f"""请将下面的候选人简历和目标 JD 压缩为精炼的要点，供后续面试环节反复引用：
+
+## 压缩要求
+1. **保留事实**：技术栈、框架和中间件名称、项目名称、职责、量化指标（QPS、数据量、性能提升等）必须原样保留
+2. **保留考察点**：JD 中的核心技能要求、加分项、岗位职责必须保留
+3. **删除冗余**：删除自我评价、联系方式、格式修饰和重复描述
+4. **不要编造**：只能删减和改写，不能添加原文没有的信息
+5. **控制长度**：简历压缩到 400 字以内，JD 压缩到 200 字以内
+
+请按照以下 JSON 模式定义格式化输出：
+
+<OUTPUT JSON SCHEMA>
+{_SCHEMA_STR_CONTEXT_COMPRESSION}
+</OUTPUT JSON SCHEMA>
+
+确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
+只返回 JSON 对象，不要有解释或额外文本。
 
 ## 候选人简历
 {{resume}}
 
 ## 目标 JD
 {{jd}}
+"""
 
-## 面试配置
-- 面试模式：{{mode}}（real=真实面试，training=训练模式）
-- 公司难度：{{difficulty}}（大厂/中厂/小厂）
+# 问题列表生成提示词（用于 questionBuild 节点，紧跟在 INTERVIEW_CONTEXT_PROMPT 之后）
+QUESTION_PLAN_GENERATION_PROMPT = f"""请根据候选人信息（见下文）生成完整的面试问题列表：
 
 ## 要求
 
@@ -242,31 +320,19 @@ QUESTION_PLAN_GENERATION_PROMPT = f"""请根据以下信息生成完整的面试
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_question_plan_generation, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_QUESTION_PLAN_GENERATION}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 问题列表生成提示词（带反馈版本，用于重新生成）
-QUESTION_PLAN_GENERATION_WITH_FEEDBACK_PROMPT = f"""请根据以下信息和反馈，重新生成改进后的面试问题列表：
-
-## 候选人简历
-{{resume}}
-
-## 目标 JD
-{{jd}}
-
-## 面试配置
-- 面试模式：{{mode}}（real=真实面试，training=训练模式）
-- 公司难度：{{difficulty}}（大厂/中厂/小厂）
-
-## 上一次生成的问题列表
-{{previous_attempt}}
+# 问题列表重新生成的动态尾部（带反馈，拼接在 QUESTION_PLAN_GENERATION_PROMPT 之后）
+QUESTION_PLAN_FEEDBACK_TAIL = """## 上一次生成的问题列表
+{previous_attempt}
 
 ## 反思反馈（需要改进的地方）
-{{feedback}}
+{feedback}
 
 ## 改进要求
 请根据上述反馈，针对性地改进问题列表：
@@ -274,50 +340,34 @@ QUESTION_PLAN_GENERATION_WITH_FEEDBACK_PROMPT = f"""请根据以下信息和反
 2. **保持优点**：如果上一次生成有做得好的地方，请保留
 3. **避免过度调整**：只改进有问题的部分，不要全盘推翻
 
-## 基本要求（与初次生成相同）
-
-### 1. 问题数量和难度分布
-根据公司难度自动调整：
-- **大厂**：生成 15-20 个问题
-  - 困难问题：50%（考察底层原理、源码、架构设计）
-  - 中等问题：30%（考察项目经验、问题解决）
-  - 简单问题：20%（考察基础知识）
-
-- **中厂**：生成 10-15 个问题
-  - 困难问题：30%
-  - 中等问题：50%
-  - 简单问题：20%
-
-- **小厂**：生成 8-12 个问题
-  - 困难问题：20%
-  - 中等问题：40%
-  - 简单问题：40%
-
-### 2. 问题分布策略
-- **前 1/3**：基础问题（考察理论知识和基本概念）
-- **中间 1/3**：场景问题（考察实战经验和问题解决能力）
-- **后 1/3**：深度问题（考察技术深度和架构思维）
+请在满足上述要求的基础上，按照相同的 JSON 模式输出改进后的问题列表。
+"""
 
-### 3. 内容来源
-- **70%** 的问题来自简历中提到的技术栈和项目经验
-- **30%** 的问题来自 JD 要求但简历未提及的技能
+# 问题列表择优提示词（用于 questionBuild 节点，紧跟在 INTERVIEW_CONTEXT_PROMPT 之后）
+QUESTION_PLAN_SELECTION_PROMPT = f"""已根据候选人信息（见下文）生成了多份候选面试问题列表（见文末），请从中选出最适合本场面试的一份：
 
-### 4. 问题质量要求
-- ✅ 问题具体明确，避免宽泛
-- ✅ 结合实际场景，避免纯理论
-- ✅ 有明确的考察目标
-- ✅ 难度递进，循序渐进
+## 评估标准
+1. **JD 覆盖度**：问题是否覆盖了 JD 的核心技能要求
+2. **简历结合度**：问题是否结合了简历中的技术栈和项目经验
+3. **难度分布**：问题数量和难度分布是否符合公司难度要求
+4. **循序渐进**：问题顺序是否由浅入深、逻辑连贯
+5. **无重复**：问题之间是否有重复或高度相似的内容
 
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_question_plan_generation, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_QUESTION_PLAN_SELECTION}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
+# 问题列表择优提示词的动态尾部
+QUESTION_PLAN_SELECTION_PROMPT_TAIL = """## 候选问题列表
+{candidates}
+"""
+
 # 问题生成提示词（保留用于其他用途）
 QUESTION_GENERATION_PROMPT = f"""请根据以下信息生成下一个面试问题：
 
@@ -370,27 +420,15 @@ QUESTION_GENERATION_PROMPT = f"""请根据以下信息生成下一个面试问
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_question_generation, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_QUESTION_GENERATION}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 追问决策提示词（用于 nextStep 节点判断是否追问）
-FOLLOW_UP_DECISION_PROMPT = f"""请根据用户的回答，决定是否追问：
-
-## 当前问题
-{{current_question}}
-
-## 用户回答
-{{user_answer}}
-
-## 回答分析
-{{answer_analysis}}
-
-## 已追问次数
-{{follow_up_count}}/3
+# 追问决策提示词（用于 nextStep 节点判断是否追问，静态部分）
+FOLLOW_UP_DECISION_PROMPT = f"""请根据用户的回答，决定是否追问（当前问题和用户回答见文末）：
 
 ## 决策标准
 
@@ -428,27 +466,29 @@ FOLLOW_UP_DECISION_PROMPT = f"""请根据用户的回答，决定是否追问：
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_follow_up_decision, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_FOLLOW_UP_DECISION}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 追问问题生成提示词（用于 deepQuestion 节点）
-DEEP_QUESTION_GENERATION_PROMPT = f"""请根据用户的回答生成追问问题：
-
-## 当前问题
-{{current_question}}
+# 追问决策提示词的动态尾部
+FOLLOW_UP_DECISION_PROMPT_TAIL = """## 当前问题
+{current_question}
 
 ## 用户回答
-{{user_answer}}
+{user_answer}
 
 ## 回答分析
-{{answer_analysis}}
+{answer_analysis}
 
 ## 已追问次数
-{{follow_up_count}}/3
+{follow_up_count}/3
+"""
+
+# 追问问题生成提示词（用于 deepQuestion 节点，静态部分）
+DEEP_QUESTION_GENERATION_PROMPT = f"""请根据用户的回答生成追问问题（当前问题和用户回答见文末）：
 
 ## 公司难度
 {{difficulty}}（大厂/中厂/小厂）
@@ -474,36 +514,33 @@ DEEP_QUESTION_GENERATION_PROMPT = f"""请根据用户的回答生成追问问题
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_deep_question_generation, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_DEEP_QUESTION_GENERATION}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 追问问题生成提示词（带反馈版本，用于重新生成）
-DEEP_QUESTION_GENERATION_WITH_FEEDBACK_PROMPT = f"""请根据用户的回答和反馈，重新生成改进后的追问问题：
-
-## 当前问题
-{{current_question}}
+# 追问问题生成提示词的动态尾部
+DEEP_QUESTION_GENERATION_PROMPT_TAIL = """## 当前问题
+{current_question}
 
 ## 用户回答
-{{user_answer}}
+{user_answer}
 
 ## 回答分析
-{{answer_analysis}}
+{answer_analysis}
 
 ## 已追问次数
-{{follow_up_count}}/3
-
-## 公司难度
-{{difficulty}}（大厂/中厂/小厂）
+{follow_up_count}/3
+"""
 
-## 上一次生成的追问
-{{previous_attempt}}
+# 追问重新生成的动态尾部（带反馈，拼接在 DEEP_QUESTION_GENERATION_PROMPT_TAIL 之后）
+DEEP_QUESTION_FEEDBACK_TAIL = """## 上一次生成的追问
+{previous_attempt}
 
 ## 反思反馈（需要改进的地方）
-{{feedback}}
+{feedback}
 
 ## 改进要求
 请根据上述反馈，针对性地改进追问问题：
@@ -511,53 +548,11 @@ DEEP_QUESTION_GENERATION_WITH_FEEDBACK_PROMPT = f"""请根据用户的回答和
 2. **保持追问的针对性**：确保追问基于用户的具体回答内容
 3. **避免过度刁钻**：保持专业友好的面试氛围
 
-## 基本要求（与初次生成相同）
-
-### 追问类型说明
-- **clarify**（澄清）：用户回答不清楚，需要澄清
-  - "你刚才提到 XX，能具体说说吗？"
-
-- **deepen**（深入）：用户回答正确但浅显，需要深入
-  - "那你了解它的底层实现原理吗？"
-
-- **challenge**（挑战）：用户回答有疑点，需要验证
-  - "你确定是这样吗？我记得 XX 应该是 YY"
-
-### 追问要求
-1. **追问要有针对性**：基于用户的具体回答内容
-2. **追问要有深度**：逐步深入，不要重复问相同层次的问题
-3. **追问要适度**：根据公司难度调整追问深度
-   - 大厂：可以追问到底层原理、源码实现
-   - 中厂：追问到实践经验、问题解决
-   - 小厂：追问到基本理解、实际应用
-
-请按照以下 JSON 模式定义格式化输出：
-
-<OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_deep_question_generation, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
-</OUTPUT JSON SCHEMA>
-
-确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
-只返回 JSON 对象，不要有解释或额外文本。
+请在满足上述要求的基础上，按照相同的 JSON 模式输出改进后的追问问题。
 """
 
-# 问题列表调整提示词（用于 adjustQuestion 节点）
-QUESTION_ADJUSTMENT_PROMPT = f"""请根据用户的表现，决定是否调整问题列表：
-
-## 当前问题列表
-{{questions_plan}}
-
-## 已完成的问题
-{{completed_questions}}
-
-## 用户表现分析
-{{performance_analysis}}
-
-## 识别的薄弱点
-{{weak_points}}
-
-## 识别的优势点
-{{strong_points}}
+# 问题列表调整提示词（用于 adjustQuestion 节点，静态部分）
+QUESTION_ADJUSTMENT_PROMPT = f"""请根据用户的表现，决定是否调整问题列表（问题列表和用户表现见文末）：
 
 ## 公司难度
 {{difficulty}}（大厂/中厂/小厂）
@@ -589,39 +584,36 @@ QUESTION_ADJUSTMENT_PROMPT = f"""请根据用户的表现，决定是否调整
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_question_adjustment, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_QUESTION_ADJUSTMENT}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 问题列表调整提示词（带反馈版本，用于重新调整）
-QUESTION_ADJUSTMENT_WITH_FEEDBACK_PROMPT = f"""请根据用户的表现和反馈，重新调整问题列表：
-
-## 当前问题列表
-{{questions_plan}}
+# 问题列表调整提示词的动态尾部
+QUESTION_ADJUSTMENT_PROMPT_TAIL = """## 当前问题列表
+{questions_plan}
 
 ## 已完成的问题
-{{completed_questions}}
+{completed_questions}
 
 ## 用户表现分析
-{{performance_analysis}}
+{performance_analysis}
 
 ## 识别的薄弱点
-{{weak_points}}
+{weak_points}
 
 ## 识别的优势点
-{{strong_points}}
-
-## 公司难度
-{{difficulty}}（大厂/中厂/小厂）
+{strong_points}
+"""
 
-## 上一次调整的问题列表
-{{previous_attempt}}
+# 问题列表重新调整的动态尾部（带反馈，拼接在 QUESTION_ADJUSTMENT_PROMPT_TAIL 之后）
+QUESTION_ADJUSTMENT_FEEDBACK_TAIL = """## 上一次调整的问题列表
+{previous_attempt}
 
 ## 反思反馈（需要改进的地方）
-{{feedback}}
+{feedback}
 
 ## 改进要求
 请根据上述反馈，针对性地改进问题列表调整：
@@ -629,38 +621,7 @@ QUESTION_ADJUSTMENT_WITH_FEEDBACK_PROMPT = f"""请根据用户的表现和反馈
 2. **保持调整的合理性**：确保调整不会打乱面试节奏
 3. **避免过度调整**：只调整必要的部分，保持问题列表的稳定性
 
-## 基本要求（与初次调整相同）
-
-### 何时调整
-1. **发现新的薄弱点**：
-   - 用户在某个技术点上回答很差
-   - 需要增加相关问题深入考察
-
-2. **发现新的优势点**：
-   - 用户在某个技术点上表现出色
-   - 可以跳过后续简单问题，直接问难题
-
-3. **偏离 JD 要求**：
-   - 当前问题没有覆盖 JD 的核心技能
-   - 需要调整问题以对齐 JD
-
-### 调整方式
-- 如果需要调整（should_adjust = true），返回调整后的完整问题列表
-- 如果不需要调整（should_adjust = false），返回原问题列表
-
-### 调整原则
-- 保持问题总数基本不变（±2个）
-- 保持难度分布合理
-- 新增问题要有明确的考察目标
-
-请按照以下 JSON 模式定义格式化输出：
-
-<OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_question_adjustment, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
-</OUTPUT JSON SCHEMA>
-
-确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
-只返回 JSON 对象，不要有解释或额外文本。
+请在满足上述要求的基础上，按照相同的 JSON 模式输出改进后的问题列表调整结果。
 """
 
 # 面试结束判断提示词
@@ -693,7 +654,7 @@ INTERVIEW_END_DECISION_PROMPT = f"""请判断是否应该结束面试：
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_interview_end, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_INTERVIEW_END}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
@@ -702,25 +663,8 @@ INTERVIEW_END_DECISION_PROMPT = f"""请判断是否应该结束面试：
 
 # ===== 深度思考与反思提示词 =====
 
-# 深度思考提示词 - 问题生成场景（questionBuild）
-DEEP_THINKING_PROMPT_QUESTION_BUILD = f"""在生成面试问题列表之前，请先进行深度思考分析：
-
-## 候选人简历
-{{resume}}
-
-## 目标 JD
-{{jd}}
-
-## 面试配置
-- 面试模式：{{mode}}
-- 公司难度：{{difficulty}}
-
-## 反思轮次
-当前是第 {{round}} 轮反思
-
-## 深度思考框架
-
-### 1. 观察（Observation）
+# 深度思考框架 - 问题生成场景（与合并提示词共用）
+_DEEP_THINKING_FRAMEWORK_QUESTION_BUILD = """### 1. 观察（Observation）
 请分析简历和 JD：
 - 候选人的核心技术栈是什么？
 - JD 要求的核心技能有哪些？
@@ -746,41 +690,31 @@ DEEP_THINKING_PROMPT_QUESTION_BUILD = f"""在生成面试问题列表之前，
 - 是否有其他更好的提问角度？
 - 是否应该调整问题的优先级？
 - 是否需要增加或减少某类问题？
+"""
+
+# 深度思考提示词 - 问题生成场景（questionBuild，紧跟在 INTERVIEW_CONTEXT_PROMPT 之后）
+DEEP_THINKING_PROMPT_QUESTION_BUILD = f"""在生成面试问题列表之前，请先根据上述信息进行深度思考分析：
 
+## 深度思考框架
+
+{_DEEP_THINKING_FRAMEWORK_QUESTION_BUILD}
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_deep_thinking, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_DEEP_THINKING}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 深度思考提示词 - 问题调整场景（adjustQuestion）
-DEEP_THINKING_PROMPT_ADJUST_QUESTION = f"""在调整问题列表之前，请先进行深度思考分析：
-
-## 当前问题列表
-{{questions_plan}}
-
-## 已完成的问题
-{{completed_questions}}
-
-## 用户表现分析
-{{performance_analysis}}
-
-## 识别的薄弱点
-{{weak_points}}
-
-## 识别的优势点
-{{strong_points}}
-
-## 反思轮次
-当前是第 {{round}} 轮反思
-
-## 深度思考框架
+# 深度思考提示词的动态尾部（三个场景共用）
+DEEP_THINKING_ROUND_TAIL = """## 反思轮次
+当前是第 {round} 轮反思
+"""
 
-### 1. 观察（Observation）
+# 深度思考框架 - 问题调整场景（与合并提示词共用）
+_DEEP_THINKING_FRAMEWORK_ADJUST_QUESTION = """### 1. 观察（Observation）
 请分析用户表现：
 - 用户在哪些技术点上表现较好？
 - 用户在哪些技术点上表现较差？
@@ -806,41 +740,43 @@ DEEP_THINKING_PROMPT_ADJUST_QUESTION = f"""在调整问题列表之前，请先
 - 是否可以不调整，继续原计划？
 - 是否有其他调整方式更合适？
 - 是否应该调整提问方式而非问题本身？
+"""
 
+# 深度思考提示词 - 问题调整场景（adjustQuestion，静态部分）
+DEEP_THINKING_PROMPT_ADJUST_QUESTION = f"""在调整问题列表之前，请先进行深度思考分析（问题列表和用户表现见文末）：
+
+## 深度思考框架
+
+{_DEEP_THINKING_FRAMEWORK_ADJUST_QUESTION}
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_deep_thinking, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_DEEP_THINKING}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 深度思考提示词 - 追问生成场景（deepQuestion）
-DEEP_THINKING_PROMPT_DEEP_QUESTION = f"""在生成追问问题之前，请先进行深度思考分析：
+# 深度思考提示词 - 问题调整场景的动态尾部（之后拼接 DEEP_THINKING_ROUND_TAIL）
+DEEP_THINKING_PROMPT_ADJUST_QUESTION_TAIL = """## 当前问题列表
+{questions_plan}
 
-## 当前问题
-{{current_question}}
-
-## 用户回答
-{{user_answer}}
-
-## 回答分析
-{{answer_analysis}}
-
-## 已追问次数
-{{follow_up_count}}/3
+## 已完成的问题
+{completed_questions}
 
-## 公司难度
-{{difficulty}}
+## 用户表现分析
+{performance_analysis}
 
-## 反思轮次
-当前是第 {{round}} 轮反思
+## 识别的薄弱点
+{weak_points}
 
-## 深度思考框架
+## 识别的优势点
+{strong_points}
+"""
 
-### 1. 观察（Observation）
+# 深度思考框架 - 追问生成场景（与合并提示词共用）
+_DEEP_THINKING_FRAMEWORK_DEEP_QUESTION = """### 1. 观察（Observation）
 请分析用户回答：
 - 用户回答是否完整？
 - 用户是否真正理解了问题？
@@ -866,41 +802,43 @@ DEEP_THINKING_PROMPT_DEEP_QUESTION = f"""在生成追问问题之前，请先进
 - 是否可以换一个角度追问？
 - 是否应该停止追问，进入下一个问题？
 - 是否可以通过更温和的方式追问？
+"""
+
+# 深度思考提示词 - 追问生成场景（deepQuestion，静态部分）
+DEEP_THINKING_PROMPT_DEEP_QUESTION = f"""在生成追问问题之前，请先进行深度思考分析（当前问题和用户回答见文末）：
 
+## 公司难度
+{{difficulty}}
+
+## 深度思考框架
+
+{_DEEP_THINKING_FRAMEWORK_DEEP_QUESTION}
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_deep_thinking, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_DEEP_THINKING}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 反思提示词 - 问题生成场景（questionBuild）
-REFLECTION_PROMPT_QUESTION_BUILD = f"""请对刚才生成的面试问题列表进行反思检查：
-
-## 初步生成的问题列表
-{{draft_question_plan}}
-
-## 生成时的思考过程
-{{thinking_process}}
-
-## 候选人简历
-{{resume}}
-
-## 目标 JD
-{{jd}}
+# 深度思考提示词 - 追问生成场景的动态尾部（之后拼接 DEEP_THINKING_ROUND_TAIL）
+DEEP_THINKING_PROMPT_DEEP_QUESTION_TAIL = """## 当前问题
+{current_question}
 
-## 公司难度
-{{difficulty}}
+## 用户回答
+{user_answer}
 
-## 反思轮次
-当前是第 {{round}} 轮反思
+## 回答分析
+{answer_analysis}
 
-## 反思检查清单
+## 已追问次数
+{follow_up_count}/3
+"""
 
-### 1. 合理性检查
+# 反思检查清单 - 问题生成场景（与合并提示词共用）
+_REFLECTION_CHECKLIST_QUESTION_BUILD = """### 1. 合理性检查
 请检查问题列表是否合理：
 - ✅ 问题数量是否符合公司难度要求？
 - ✅ 难度分布是否合理（简单/中等/困难）？
@@ -934,38 +872,37 @@ REFLECTION_PROMPT_QUESTION_BUILD = f"""请对刚才生成的面试问题列表
 ## 决策规则
 - 如果 confidence_score >= 0.8 且 issues_found 为空 → should_regenerate = false
 - 如果 confidence_score < 0.8 或 issues_found 不为空 → should_regenerate = true
+"""
+
+# 反思提示词 - 问题生成场景（questionBuild，紧跟在 INTERVIEW_CONTEXT_PROMPT 之后）
+REFLECTION_PROMPT_QUESTION_BUILD = f"""请对刚才生成的面试问题列表进行反思检查（候选人信息见上文，问题列表和思考过程见文末）：
+
+## 反思检查清单
 
+{_REFLECTION_CHECKLIST_QUESTION_BUILD}
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_reflection, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_REFLECTION}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 反思提示词 - 问题调整场景（adjustQuestion）
-REFLECTION_PROMPT_ADJUST_QUESTION = f"""请对刚才调整的问题列表进行反思检查：
-
-## 调整后的问题列表
-{{adjusted_question_plan}}
-
-## 原问题列表
-{{original_question_plan}}
+# 反思提示词 - 问题生成场景的动态尾部
+REFLECTION_PROMPT_QUESTION_BUILD_TAIL = """## 初步生成的问题列表
+{draft_question_plan}
 
 ## 生成时的思考过程
-{{thinking_process}}
-
-## 用户表现分析
-{{performance_analysis}}
+{thinking_process}
 
 ## 反思轮次
-当前是第 {{round}} 轮反思
-
-## 反思检查清单
+当前是第 {round} 轮反思
+"""
 
-### 1. 合理性检查
+# 反思检查清单 - 问题调整场景（与合并提示词共用）
+_REFLECTION_CHECKLIST_ADJUST_QUESTION = """### 1. 合理性检查
 请检查调整是否合理：
 - ✅ 调整是否针对了用户的薄弱点？
 - ✅ 调整是否保持了难度分布的合理性？
@@ -998,41 +935,43 @@ REFLECTION_PROMPT_ADJUST_QUESTION = f"""请对刚才调整的问题列表进行
 ## 决策规则
 - 如果 confidence_score >= 0.8 且 issues_found 为空 → should_regenerate = false
 - 如果 confidence_score < 0.8 或 issues_found 不为空 → should_regenerate = true
+"""
+
+# 反思提示词 - 问题调整场景（adjustQuestion，静态部分）
+REFLECTION_PROMPT_ADJUST_QUESTION = f"""请对刚才调整的问题列表进行反思检查（调整结果和思考过程见文末）：
 
+## 反思检查清单
+
+{_REFLECTION_CHECKLIST_ADJUST_QUESTION}
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_reflection, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_REFLECTION}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-# 反思提示词 - 追问生成场景（deepQuestion）
-REFLECTION_PROMPT_DEEP_QUESTION = f"""请对刚才生成的追问问题进行反思检查：
+# 反思提示词 - 问题调整场景的动态尾部
+REFLECTION_PROMPT_ADJUST_QUESTION_TAIL = """## 调整后的问题列表
+{adjusted_question_plan}
 
-## 初步生成的追问问题
-{{draft_deep_question}}
+## 原问题列表
+{original_question_plan}
 
 ## 生成时的思考过程
-{{thinking_process}}
+{thinking_process}
 
-## 当前问题
-{{current_question}}
-
-## 用户回答
-{{user_answer}}
-
-## 已追问次数
-{{follow_up_count}}/3
+## 用户表现分析
+{performance_analysis}
 
 ## 反思轮次
-当前是第 {{round}} 轮反思
-
-## 反思检查清单
+当前是第 {round} 轮反思
+"""
 
-### 1. 合理性检查
+# 反思检查清单 - 追问生成场景（与合并提示词共用）
+_REFLECTION_CHECKLIST_DEEP_QUESTION = """### 1. 合理性检查
 请检查追问是否合理：
 - ✅ 追问是否针对用户回答的具体内容？
 - ✅ 追问的目的是否明确（澄清/深入/挑战）？
@@ -1065,17 +1004,160 @@ REFLECTION_PROMPT_DEEP_QUESTION = f"""请对刚才生成的追问问题进行反
 ## 决策规则
 - 如果 confidence_score >= 0.8 且 issues_found 为空 → should_regenerate = false
 - 如果 confidence_score < 0.8 或 issues_found 不为空 → should_regenerate = true
+"""
+
+# 反思提示词 - 追问生成场景（deepQuestion，静态部分）
+REFLECTION_PROMPT_DEEP_QUESTION = f"""请对刚才生成的追问问题进行反思检查（追问问题和思考过程见文末）：
 
+## 反思检查清单
+
+{_REFLECTION_CHECKLIST_DEEP_QUESTION}
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_reflection, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{_SCHEMA_STR_REFLECTION}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
+# 反思提示词 - 追问生成场景的动态尾部
+REFLECTION_PROMPT_DEEP_QUESTION_TAIL = """## 初步生成的追问问题
+{current_question}
+
+## 生成时的思考过程
+{thinking_process}
+
+## 用户回答
+{user_answer}
+
+## 已追问次数
+{follow_up_count}/3
+
+## 反思轮次
+当前是第 {round} 轮反思
+"""
+
+# ===== 深度思考与反思合并提示词 =====
+
+# 深度思考 + 反思合并提示词 - 问题生成场景（questionBuild，紧跟在 INTERVIEW_CONTEXT_PROMPT 之后）
+DEEP_THINKING_AND_REFLECTION_PROMPT_QUESTION_BUILD = f"""请对刚才生成的面试问题列表先进行深度思考分析，再基于思考结果进行反思检查（候选人信息见下文，问题列表和之前轮次的思考过程见文末）：
+
+## 第一部分：深度思考（输出到 thinking 字段）
+
+{_DEEP_THINKING_FRAMEWORK_QUESTION_BUILD}
+## 第二部分：反思检查（输出到 reflection 字段）
+
+{_REFLECTION_CHECKLIST_QUESTION_BUILD}
+请按照以下 JSON 模式定义格式化输出：
+
+<OUTPUT JSON SCHEMA>
+{_SCHEMA_STR_THINK_AND_REFLECT}
+</OUTPUT JSON SCHEMA>
+
+确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
+只返回 JSON 对象，不要有解释或额外文本。
+"""
+
+# 深度思考 + 反思合并提示词 - 问题生成场景的动态尾部
+DEEP_THINKING_AND_REFLECTION_PROMPT_QUESTION_BUILD_TAIL = """## 初步生成的问题列表
+{draft_question_plan}
+
+## 之前轮次的思考过程
+{thinking_process}
+
+## 反思轮次
+当前是第 {round} 轮反思
+"""
+
+# 深度思考 + 反思合并提示词 - 问题调整场景（adjustQuestion，静态部分）
+DEEP_THINKING_AND_REFLECTION_PROMPT_ADJUST_QUESTION = f"""请对刚才调整的问题列表先进行深度思考分析，再基于思考结果进行反思检查（调整结果、用户表现和之前轮次的思考过程见文末）：
+
+## 第一部分：深度思考（输出到 thinking 字段）
+
+{_DEEP_THINKING_FRAMEWORK_ADJUST_QUESTION}
+## 第二部分：反思检查（输出到 reflection 字段）
+
+{_REFLECTION_CHECKLIST_ADJUST_QUESTION}
+请按照以下 JSON 模式定义格式化输出：
+
+<OUTPUT JSON SCHEMA>
+{_SCHEMA_STR_THINK_AND_REFLECT}
+</OUTPUT JSON SCHEMA>
+
+确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
+只返回 JSON 对象，不要有解释或额外文本。
+"""
+
+# 深度思考 + 反思合并提示词 - 问题调整场景的动态尾部
+DEEP_THINKING_AND_REFLECTION_PROMPT_ADJUST_QUESTION_TAIL = """## 调整后的问题列表
+{adjusted_question_plan}
+
+## 原问题列表
+{original_question_plan}
+
+## 已完成的问题
+{completed_questions}
+
+## 用户表现分析
+{performance_analysis}
+
+## 识别的薄弱点
+{weak_points}
+
+## 识别的优势点
+{strong_points}
+
+## 之前轮次的思考过程
+{thinking_process}
+
+## 反思轮次
+当前是第 {round} 轮反思
+"""
+
+# 深度思考 + 反思合并提示词 - 追问生成场景（deepQuestion，静态部分）
+DEEP_THINKING_AND_REFLECTION_PROMPT_DEEP_QUESTION = f"""请对刚才生成的追问问题先进行深度思考分析，再基于思考结果进行反思检查（追问问题、用户回答和之前轮次的思考过程见文末）：
+
+## 公司难度
+{{difficulty}}
+
+## 第一部分：深度思考（输出到 thinking 字段）
+
+{_DEEP_THINKING_FRAMEWORK_DEEP_QUESTION}
+## 第二部分：反思检查（输出到 reflection 字段）
+
+{_REFLECTION_CHECKLIST_DEEP_QUESTION}
+请按照以下 JSON 模式定义格式化输出：
+
+<OUTPUT JSON SCHEMA>
+{_SCHEMA_STR_THINK_AND_REFLECT}
+</OUTPUT JSON SCHEMA>
+
+确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
+只返回 JSON 对象，不要有解释或额外文本。
+"""
+
+# 深度思考 + 反思合并提示词 - 追问生成场景的动态尾部
+DEEP_THINKING_AND_REFLECTION_PROMPT_DEEP_QUESTION_TAIL = """## 初步生成的追问问题
+{current_question}
+
+## 用户回答
+{user_answer}
+
+## 回答分析
+{answer_analysis}
+
+## 已追问次数
+{follow_up_count}/3
+
+## 之前轮次的思考过程
+{thinking_process}
+
+## 反思轮次
+当前是第 {round} 轮反思
+"""
+
 # ===== 工具调用相关提示词 =====
 
 # 工具调用决策提示词
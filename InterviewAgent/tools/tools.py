@@ -1,64 +1,162 @@
 """
 面试官 Agent 工具集
 使用 langchain_core.tools 注册
+
+两个检索工具的 embedding 和 Milvus 检索都不阻塞事件循环，需要同时查询时并发调用：
+    semantic, episodic = await asyncio.gather(
+        search_semantic_memory.ainvoke({...}),
+        search_episodic_memory.ainvoke({...})
+    )
 """
 
-from typing import Optional, List, Dict, Any
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from langchain_core.tools import tool
 from storage.manager import StorageManager
 from storage.database.postgresql import PostgreSQLDatabase
-from embedding import YEmbedding
+from rag.embedding import YEmbedding
 
 
 # 全局存储管理器实例（需要在使用前初始化）
 _storage_manager: Optional[StorageManager] = None
 _db: Optional[PostgreSQLDatabase] = None
 _embeding: Optional[YEmbedding] = None
+_init_lock = threading.Lock()
+
+# 查询向量缓存：查询文本 -> 向量，薄弱点等主题会在多轮中反复检索
+_QUERY_CACHE_SIZE = 1024
+_query_embeddings: "OrderedDict[str, List[float]]" = OrderedDict()
+
+# 检索结果缓存：(工具名, 检索参数...) -> (过期时间, 结果)
+_EPISODIC_TTL = 60
+_SEMANTIC_TTL = 10
+_RESULT_CACHE_SIZE = 512
+_result_cache: "OrderedDict[tuple, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+# 正在进行的检索：相同键的并发请求共用同一个任务
+_inflight: Dict[tuple, asyncio.Task] = {}
+
+# 情节记忆只返回高质量案例
+_EPISODIC_QUALITY_FILTER = 'quality_score >= 7'
 
 
 def initialize_tools(storage_manager: StorageManager, db: PostgreSQLDatabase, embeding: YEmbedding):
-    """初始化工具（在使用前必须调用）"""
+    """
+    初始化工具（在使用前必须调用）
+
+    加锁绑定全局实例，多个工作线程并发初始化时不会交错写入；
+    重复传入相同的实例时直接返回，保留已有的查询向量缓存
+    """
     global _storage_manager, _db, _embeding
-    _storage_manager = storage_manager
-    _db = db
-    _embeding = embeding
+    with _init_lock:
+        if _storage_manager is storage_manager and _db is db and _embeding is embeding:
+            return
+        _storage_manager = storage_manager
+        _db = db
+        _embeding = embeding
+        # 更换嵌入模型或数据源后旧向量和旧结果不再有效
+        _query_embeddings.clear()
+        _result_cache.clear()
 
 
-@tool
-async def search_semantic_memory(
-    user_id: str,
-    query: str,
-    top_k: int = 5
-) -> List[Dict[str, Any]]:
+def _quote(value: str) -> str:
+    """转义为 Milvus 过滤表达式中的字符串字面量"""
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+@lru_cache(maxsize=256)
+def _build_semantic_filter(user_id: str) -> str:
+    """构建语义记忆的过滤表达式（只查询该用户的记忆）"""
+    return f'user_id == {_quote(user_id)}'
+
+
+@lru_cache(maxsize=256)
+def _build_episodic_filter(company: Optional[str], difficulty: Optional[str]) -> str:
+    """构建情节记忆的过滤表达式（公司、难度可选，始终过滤质量评分）"""
+    filter_conditions = []
+
+    # 过滤公司
+    if company:
+        filter_conditions.append(f'company == {_quote(company)}')
+
+    # 过滤难度
+    if difficulty:
+        filter_conditions.append(f'difficulty == {_quote(difficulty)}')
+
+    filter_conditions.append(_EPISODIC_QUALITY_FILTER)
+    return ' and '.join(filter_conditions)
+
+
+async def _embed_query(query: str) -> List[float]:
+    """编码查询文本（按查询文本做 LRU 缓存）"""
+    vector = _query_embeddings.get(query)
+    if vector is not None:
+        _query_embeddings.move_to_end(query)
+        return vector
+
+    vector = await _embeding.aembed_query(query)
+    _query_embeddings[query] = vector
+    while len(_query_embeddings) > _QUERY_CACHE_SIZE:
+        _query_embeddings.popitem(last=False)
+    return vector
+
+
+async def _cached_search(key: tuple, ttl: float, search: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
     """
-    查询用户的语义记忆（知识点掌握度、历史表现）
+    带过期时间的检索结果缓存
 
-    使用场景：
-    - 训练模式下，需要针对薄弱点提问
-    - 需要对比用户的进步情况
-    - 查询用户在某个知识点上的历史表现
+    未过期的结果直接返回；同一个键已有检索在进行时等待该检索完成（相同的并发请求只检索一次）
 
     参数：
-        user_id: 用户 ID
-        query: 查询内容（知识点名称或描述）
-        top_k: 返回数量（默认 5）
+        key: 缓存键（工具名 + 全部检索参数）
+        ttl: 结果有效期，单位秒
+        search: 未命中时执行的检索
 
     返回：
-        语义记忆列表，包含知识点掌握度、练习次数、薄弱点等信息
+        检索结果（逐条复制的副本，调用方增删记录或修改记录的字段不会影响缓存）
     """
-    if not _storage_manager or not _db or not _embeding:
-        raise RuntimeError("工具未初始化，请先调用 initialize_tools()")
-
+    entry = _result_cache.get(key)
+    if entry is not None and entry[0] > time.monotonic():
+        _result_cache.move_to_end(key)
+        return [dict(row) for row in entry[1]]
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(search())
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _store_search_result(key, ttl, done))
+
+    # shield：某个调用方被取消时不影响其他等待同一检索的调用方
+    return [dict(row) for row in await asyncio.shield(task)]
+
+
+def _store_search_result(key: tuple, ttl: float, task: asyncio.Task) -> None:
+    """检索完成后写入缓存（失败或取消的检索不缓存），超出容量时淘汰最早的条目"""
+    _inflight.pop(key, None)
+    if task.cancelled() or task.exception() is not None:
+        return
+    _result_cache[key] = (time.monotonic() + ttl, task.result())
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > _RESULT_CACHE_SIZE:
+        _result_cache.popitem(last=False)
+
+
+async def _search_semantic(user_id: str, query: str, top_k: int) -> List[Dict[str, Any]]:
+    """检索语义记忆：embedding -> Milvus -> PostgreSQL"""
     # 1. 将 query 转换为 embedding
-    query_embedding = _embeding.embed_query(query)
+    query_embedding = await _embed_query(query)
 
     # 2. 在 Milvus semantic_memory_vectors 中检索
     milvus = _storage_manager.get_milvus()
 
     # 构建过滤表达式（只查询该用户的记忆）
-    filter_expr = f'user_id == "{user_id}"'
+    filter_expr = _build_semantic_filter(user_id)
 
-    search_results = milvus.search(
+    search_results = await asyncio.to_thread(
+        milvus.search,
         query_embedding=query_embedding,
         top_k=top_k,
         filter_expr=filter_expr
@@ -71,16 +169,99 @@ async def search_semantic_memory(
     doc_ids = [result.document.id for result in search_results]
 
     # 4. 从 PostgreSQL 批量查询完整数据
-    memories = await _db.get_semantic_memory_by_ids(doc_ids)
+    return await _db.get_semantic_memory_by_ids(doc_ids)
 
-    # 5. 按照相似度排序返回（保持 Milvus 的排序）
-    id_to_memory = {str(m['id']): m for m in memories}
-    sorted_memories = [id_to_memory[doc_id] for doc_id in doc_ids if doc_id in id_to_memory]
 
-    return sorted_memories
+async def _search_episodic(
+    query: str,
+    company: Optional[str],
+    difficulty: Optional[str],
+    top_k: int
+) -> List[Dict[str, Any]]:
+    """检索情节记忆：embedding -> Milvus（带过滤条件）-> PostgreSQL"""
+    # 1. 将 query 转换为 embedding
+    query_embedding = await _embed_query(query)
 
+    # 2. 在 Milvus episodic_memory_vectors 中检索（带过滤条件）
+    milvus = _storage_manager.get_milvus()
+
+    # 构建过滤表达式
+    filter_expr = _build_episodic_filter(company, difficulty)
+
+    search_results = await asyncio.to_thread(
+        milvus.search,
+        query_embedding=query_embedding,
+        top_k=top_k,
+        filter_expr=filter_expr
+    )
 
-@tool
+    # 3. 获取 doc_ids
+    if not search_results:
+        return []
+
+    doc_ids = [result.document.id for result in search_results]
+
+    # 4. 从 PostgreSQL 批量查询完整数据
+    return await _db.get_episodic_memory_by_ids(doc_ids)
+
+
+# 工具参数的 JSON Schema：显式给出后 @tool 不再从函数签名推断 Pydantic 模型，
+# 调用时参数直接传给函数，省去每次调用的模型校验（调用方是图内的 LLM 工具调用，参数由 Schema 约束）
+_SEMANTIC_MEMORY_ARGS = {
+    "type": "object",
+    "properties": {
+        "user_id": {"type": "string", "description": "用户 ID"},
+        "query": {"type": "string", "description": "查询内容（知识点名称或描述）"},
+        "top_k": {"type": "integer", "description": "返回数量", "default": 5}
+    },
+    "required": ["user_id", "query"]
+}
+
+_EPISODIC_MEMORY_ARGS = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string", "description": "查询内容（技术点或问题描述）"},
+        "company": {"type": "string", "description": "目标公司（如 \"字节跳动\"）"},
+        "difficulty": {"type": "string", "description": "难度级别", "enum": ["简单", "中等", "困难"]},
+        "top_k": {"type": "integer", "description": "返回数量", "default": 3}
+    },
+    "required": ["query"]
+}
+
+
+@tool("search_semantic_memory", args_schema=_SEMANTIC_MEMORY_ARGS)
+async def search_semantic_memory(
+    user_id: str,
+    query: str,
+    top_k: int = 5
+) -> List[Dict[str, Any]]:
+    """
+    查询用户的语义记忆（知识点掌握度、历史表现）
+
+    使用场景：
+    - 训练模式下，需要针对薄弱点提问
+    - 需要对比用户的进步情况
+    - 查询用户在某个知识点上的历史表现
+
+    参数：
+        user_id: 用户 ID
+        query: 查询内容（知识点名称或描述）
+        top_k: 返回数量（默认 5）
+
+    返回：
+        语义记忆列表，包含知识点掌握度、练习次数、薄弱点等信息
+    """
+    if not _storage_manager or not _db or not _embeding:
+        raise RuntimeError("工具未初始化，请先调用 initialize_tools()")
+
+    # 检索结果短时间缓存：语义记忆随作答更新，有效期较短
+    return await _cached_search(
+        ("semantic", user_id, query, top_k), _SEMANTIC_TTL,
+        lambda: _search_semantic(user_id, query, top_k)
+    )
+
+
+@tool("search_episodic_memory", args_schema=_EPISODIC_MEMORY_ARGS)
 async def search_episodic_memory(
     query: str,
     company: Optional[str] = None,
@@ -107,58 +288,20 @@ async def search_episodic_memory(
     if not _storage_manager or not _db or not _embeding:
         raise RuntimeError("工具未初始化，请先调用 initialize_tools()")
 
-    # 1. 将 query 转换为 embedding
-    query_embedding = _embeding.embed_query(query)
-
-    # 2. 在 Milvus episodic_memory_vectors 中检索（带过滤条件）
-    milvus = _storage_manager.get_milvus()
-
-    # 构建过滤表达式
-    filter_conditions = []
-
-    # 过滤公司
-    if company:
-        filter_conditions.append(f'company == "{company}"')
-
-    # 过滤难度
-    if difficulty:
-        filter_conditions.append(f'difficulty == "{difficulty}"')
-
-    # 过滤质量评分（只返回高质量案例）
-    filter_conditions.append('quality_score >= 7')
-
-    # 组合过滤条件
-    filter_expr = ' and '.join(filter_conditions) if filter_conditions else None
-
-    search_results = milvus.search(
-        query_embedding=query_embedding,
-        top_k=top_k,
-        filter_expr=filter_expr
+    # 检索结果短时间缓存：情节记忆是整理好的案例库，变化很慢
+    return await _cached_search(
+        ("episodic", query, company, difficulty, top_k), _EPISODIC_TTL,
+        lambda: _search_episodic(query, company, difficulty, top_k)
     )
 
-    # 3. 获取 doc_ids
-    if not search_results:
-        return []
-
-    doc_ids = [result.document.id for result in search_results]
-
-    # 4. 从 PostgreSQL 批量查询完整数据
-    memories = await _db.get_episodic_memory_by_ids(doc_ids)
-
-    # 5. 按照相似度排序返回（保持 Milvus 的排序）
-    id_to_memory = {str(m['id']): m for m in memories}
-    sorted_memories = [id_to_memory[doc_id] for doc_id in doc_ids if doc_id in id_to_memory]
-
-    return sorted_memories
-
 
-# 导出所有工具
-INTERVIEWER_TOOLS = [
+# 导出所有工具（元组，调用方无法修改共享的工具集合）
+INTERVIEWER_TOOLS: Tuple = (
     search_semantic_memory,
     search_episodic_memory
-]
+)
 
 
-def get_interviewer_tools() -> List:
+def get_interviewer_tools() -> Tuple:
     """获取面试官 Agent 的所有工具"""
     return INTERVIEWER_TOOLS
\ No newline at end of file
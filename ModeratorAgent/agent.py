@@ -3,16 +3,148 @@ Moderator Agent - 主持人Agent
 负责协调两位 Critic，决策流程，生成最终评价
 """
 
+import copy
 import json
+import logging
 import time
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from hashlib import blake2b
+from string import Formatter
+from typing import Callable, Dict, Any, Optional, List, Tuple
 from datetime import datetime
 from .prompt import (
     MODERATOR_SYSTEM_PROMPT,
     MODERATOR_DECISION_PROMPT,
-    MODERATOR_FINAL_EVALUATION_PROMPT
+    MODERATOR_DECISION_PROMPT_TAIL,
+    MODERATOR_FINAL_EVALUATION_PROMPT,
+    MODERATOR_FINAL_EVALUATION_PROMPT_TAIL,
+    MODERATOR_OVERALL_EVALUATION_PROMPT,
+    MODERATOR_OVERALL_EVALUATION_PROMPT_TAIL,
+    output_schema_moderator_decision,
+    output_schema_final_evaluation,
+    output_schema_overall_evaluation
 )
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from common import parse_message
+from jsonschema import ValidationError
+from jsonschema.validators import validator_for
+
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+
+# 挂在 Forum 的 logger（"ForumAgent"）之下：ForumGraph.setup_logging 配置的后台队列输出同样适用，
+# 未配置时沿用根 logger 的 WARNING 级别，INFO 日志不会输出也不会格式化
+logger = logging.getLogger("ForumAgent.Moderator")
+
+# 日志分隔线
+_BAR = "=" * 60
+
+try:
+    # orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，调用方的异常处理无需区分
+    import orjson
+except ImportError:
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# 只用于定位嵌在说明文字中的 JSON 对象
+_DECODER = json.JSONDecoder()
+
+
+def _dumps_pretty(value: Any) -> str:
+    """
+    序列化为缩进 2 格、保留中文的 JSON（嵌入提示词）
+
+    安装了 orjson 时，结构和字符串与 json.dumps(ensure_ascii=False, indent=2) 相同，但浮点数写法可能不同
+    （如 1e+20 写作 1e20，NaN / Infinity 写作 null）；同一进程内始终使用同一种实现，
+    进程内的结果缓存键不受影响，但不同环境下的提示词不保证逐字节一致
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            # orjson 不支持的类型（如超过 64 位的整数）退回标准库
+            pass
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def _extract_json_object(text: str) -> Any:
+    """
+    从模型输出中解析 JSON 对象
+
+    整段就是 JSON 时直接解析；否则从每个 "{" 开始尝试单遍解码，返回第一个完整的对象，
+    说明文字中零散的括号不会导致解析失败
+
+    Args:
+        text: 模型输出
+
+    Returns:
+        解析后的 JSON 对象
+    """
+    try:
+        return _json_loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    start = text.find("{")
+    while start != -1:
+        try:
+            return _DECODER.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            start = text.find("{", start + 1)
+    raise json.JSONDecodeError("模型输出中没有完整的 JSON 对象", text, 0)
+
+
+def _split_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """把提示词模板拆成 (字面文本, 字段名) 序列（导入时执行一次，只支持不带格式说明的字段）"""
+    parts = []
+    for literal, field, spec, conversion in Formatter().parse(template):
+        if field is not None and (spec or conversion):
+            raise ValueError(f"提示词字段不支持格式说明: {field}")
+        parts.append((literal, field))
+    return tuple(parts)
+
+
+def _render(parts: Tuple[Tuple[str, Optional[str]], ...], **fields: Any) -> str:
+    """按预先拆分的模板拼接提示词，结果与 template.format(**fields) 一致，省去每次重新解析多 KB 模板"""
+    return "".join(
+        literal if field is None else literal + format(fields[field])
+        for literal, field in parts
+    )
+
+
+# 每轮都会渲染的动态尾部在导入时预先拆分（总体评价每场面试只渲染一次，仍用 str.format）
+_DECISION_TAIL_PARTS = _split_template(MODERATOR_DECISION_PROMPT_TAIL)
+_FINAL_EVALUATION_TAIL_PARTS = _split_template(MODERATOR_FINAL_EVALUATION_PROMPT_TAIL)
+
+
+# Schema 校验失败时可能抛出的异常（fastjsonschema 未安装时退回 jsonschema）
+_VALIDATION_ERRORS = (ValidationError,) if fastjsonschema is None else (ValidationError, fastjsonschema.JsonSchemaException)
+
+
+def _compile_validator(schema: Dict[str, Any]) -> Callable[[Any], Any]:
+    """编译 Schema 校验函数：安装了 fastjsonschema 时生成专用校验函数，否则使用 jsonschema 校验器实例"""
+    if fastjsonschema is not None:
+        return fastjsonschema.compile(schema)
+    return validator_for(schema)(schema).validate
+
+
+# 输出 Schema 在导入时编译一次：决策和最终评价走 llm.ainvoke_with_schema（支持时由服务端按 Schema 约束解码），
+# 但重试用尽后仍会返回最后一次结果，写入缓存前需要再校验一次；
+# 总体评价的 topic_analysis 以主题名为键，严格模式无法表达，仍由本地解析校验
+_validate_decision = _compile_validator(output_schema_moderator_decision)
+_validate_final_evaluation = _compile_validator(output_schema_final_evaluation)
+_validate_overall_evaluation = _compile_validator(output_schema_overall_evaluation)
+
+# 结果缓存键的公共前缀：系统提示词在导入时哈希一次，每次生成缓存键时复制哈希状态后只追加用户提示词
+_SYSTEM_PROMPT_DIGEST = blake2b(MODERATOR_SYSTEM_PROMPT.encode("utf-8") + b"\x00", digest_size=16)
+
+# 输出不符合 Schema 时请 LLM 修正的提示词
+_REPAIR_PROMPT = """上面的输出不符合要求的 JSON 模式：{error}
+请修正后重新输出完整的 JSON 对象，只返回 JSON 对象，不要有解释或额外文本。"""
 
 
 class ModeratorAgent:
@@ -26,14 +158,33 @@ class ModeratorAgent:
     4. 管理讨论流程和轮次控制
     """
 
-    def __init__(self, llm):
+    # 决策 / 最终评价结果缓存的最大条目数和有效期（秒）
+    RESPONSE_CACHE_SIZE = 1024
+    RESPONSE_CACHE_TTL = 3600
+
+    # Critic 评论序列化结果的缓存条目数（并发评价多个 QA 时每个 QA 各占两条）
+    COMMENT_CACHE_SIZE = 64
+
+    def __init__(self, llm, cache_responses: Optional[bool] = None):
         """
         初始化 Moderator Agent
 
         Args:
             llm: LLM 实例（用于决策和生成最终评价）
+            cache_responses: 是否按提示词精确缓存决策和最终评价（默认 None：LLM 温度为 0 时开启，
+                输出不确定时复用结果会改变评价分布）
         """
         self.llm = llm
+        if cache_responses is None:
+            cache_responses = getattr(llm, "temperature", 1.0) <= 0.01
+
+        # 提示词哈希 -> (过期时间, 解析后的结果)
+        self._response_cache: Optional["OrderedDict[bytes, Tuple[float, Dict[str, Any]]]"] = (
+            OrderedDict() if cache_responses else None
+        )
+
+        # Critic 评论的 id -> (评论, 序列化结果)：同一轮的评论在决策和最终评价中各用一次，只序列化一次
+        self._comment_json: "OrderedDict[int, Tuple[Dict[str, Any], str]]" = OrderedDict()
 
     async def decide_next_step(self, state: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -52,53 +203,47 @@ class ModeratorAgent:
         rag_comment = state.get("rag_critic_comment")
         web_comment = state.get("web_critic_comment")
 
-        # 2. 如果是第一轮且还没有 Critic 评论，启动 RAG Critic
-        if current_round == 1 and not rag_comment:
+        # 2. 如果是第一轮且两位 Critic 都还没有评论，开始本轮（两位 Critic 并行发言）
+        if current_round == 1 and not rag_comment and not web_comment:
             state["next_step"] = "rag_critic"
-            state["current_speaker"] = "rag_critic"
+            state["current_speaker"] = "moderator"
             state["should_continue"] = True
             return state
 
-        # 3. 如果 RAG Critic 刚评论完，启动 Web Critic
-        if rag_comment and not web_comment:
-            state["next_step"] = "web_critic"
-            state["current_speaker"] = "web_critic"
-            state["should_continue"] = True
-            return state
+        # 3. 两位 Critic 并行发言完毕后进行决策（某位 Critic 失败时用已有的评论决策，不再单独补跑）
+        decision = await self._make_decision_with_llm(
+            current_round=current_round,
+            max_rounds=max_rounds,
+            current_speaker=current_speaker,
+            rag_comment=rag_comment,
+            web_comment=web_comment
+        )
 
-        # 4. 如果两位 Critic 都评论完了，进行决策
-        if rag_comment and web_comment:
-            decision = await self._make_decision_with_llm(
-                current_round=current_round,
-                max_rounds=max_rounds,
-                current_speaker=current_speaker,
-                rag_comment=rag_comment,
-                web_comment=web_comment
-            )
+        # 4. 更新状态
+        state["should_continue"] = decision.get("should_continue", False)
+        state["next_step"] = decision.get("next_step", "end")
+        state["current_speaker"] = decision.get("current_speaker", "moderator")
+
+        # 5. 如果决定继续，轮次+1，清空评论（新一轮两位 Critic 同时发言，不区分先后）
+        if state["should_continue"] and state["next_step"] in ("rag_critic", "web_critic"):
+            state["next_step"] = "rag_critic"
+
+            # 保存当前轮次的讨论历史
+            discussion_history = state.get("discussion_history", [])
+            discussion_history.append({
+                "round": current_round,
+                "rag_comment": rag_comment,
+                "web_comment": web_comment,
+                "timestamp": datetime.now().isoformat()
+            })
+            state["discussion_history"] = discussion_history
+
+            # 轮次+1
+            state["current_round"] = current_round + 1
 
-            # 5. 更新状态
-            state["should_continue"] = decision.get("should_continue", False)
-            state["next_step"] = decision.get("next_step", "end")
-            state["current_speaker"] = decision.get("current_speaker", "moderator")
-
-            # 6. 如果决定继续，轮次+1，清空评论
-            if state["should_continue"] and state["next_step"] == "rag_critic":
-                # 保存当前轮次的讨论历史
-                discussion_history = state.get("discussion_history", [])
-                discussion_history.append({
-                    "round": current_round,
-                    "rag_comment": rag_comment,
-                    "web_comment": web_comment,
-                    "timestamp": datetime.now().isoformat()
-                })
-                state["discussion_history"] = discussion_history
-
-                # 轮次+1
-                state["current_round"] = current_round + 1
-
-                # 清空当前评论，准备下一轮
-                state["rag_critic_comment"] = None
-                state["web_critic_comment"] = None
+            # 清空当前评论，准备下一轮
+            state["rag_critic_comment"] = None
+            state["web_critic_comment"] = None
 
         return state
 
@@ -112,9 +257,7 @@ class ModeratorAgent:
         Returns:
             更新后的 state（包含 final_evaluation）
         """
-        print("\n" + "="*60)
-        print("[Moderator Agent] 开始生成最终评价...")
-        print("="*60)
+        logger.info("\n%s\n[Moderator Agent] 开始生成最终评价...\n%s", _BAR, _BAR)
 
         start_time = time.time()
 
@@ -125,10 +268,10 @@ class ModeratorAgent:
         discussion_history = state.get("discussion_history", [])
 
         # 2. 解析问题和用户回答
-        question, user_answer = self._parse_message(message)
+        question, user_answer = parse_message(message)
 
         # 3. 使用 LLM 生成最终评价
-        print("\n[Moderator Agent] 正在综合两位 Critic 的评论...")
+        logger.info("\n[Moderator Agent] 正在综合两位 Critic 的评论...")
         final_evaluation = await self._generate_final_evaluation_with_llm(
             question=question,
             user_answer=user_answer,
@@ -142,34 +285,152 @@ class ModeratorAgent:
         state["next_step"] = "save"
 
         total_duration = time.time() - start_time
-        print(f"\n[Moderator Agent] 最终评价生成完成 | 总耗时: {total_duration:.2f}s")
-        print("="*60 + "\n")
+        logger.info("\n[Moderator Agent] 最终评价生成完成 | 总耗时: %.2fs\n%s\n", total_duration, _BAR)
 
         return state
 
-    def _parse_message(self, message: str) -> tuple[Optional[str], Optional[str]]:
+    def _format_comment(self, comment: Optional[Dict[str, Any]]) -> str:
         """
-        从 message 中提取问题和用户回答
+        序列化 Critic 评论用于嵌入提示词（按 id 缓存，同时保存评论本身，避免 id 被复用后误命中）
+
+        评论生成后不再修改，同一个评论对象的序列化结果可以直接复用
+        """
+        if comment is None:
+            return "null"
+        cached = self._comment_json.get(id(comment))
+        if cached is None or cached[0] is not comment:
+            cached = self._comment_json[id(comment)] = (comment, _dumps_pretty(comment))
+            while len(self._comment_json) > self.COMMENT_CACHE_SIZE:
+                self._comment_json.popitem(last=False)
+        return cached[1]
+
+    async def _parse_and_validate(
+        self,
+        messages: List,
+        response_text: str,
+        validate: Callable[[Any], Any]
+    ) -> Dict[str, Any]:
+        """
+        解析并校验 LLM 输出
+
+        缺少字段或类型不符时，把校验错误连同上一次输出交给 LLM 修正一次（只需改正有问题的字段，比重新生成便宜），
+        修正后仍不符合 Schema 时抛出校验异常
 
         Args:
-            message: 历史消息字符串
+            messages: 本次调用的消息列表
+            response_text: LLM 输出
+            validate: 预编译的 Schema 校验函数
 
         Returns:
-            (question, user_answer) 元组
+            校验通过的 JSON 对象
         """
-        lines = message.strip().split('\n')
+        result = _extract_json_object(response_text)
+        try:
+            validate(result)
+            return result
+        except _VALIDATION_ERRORS as e:
+            logger.warning("[警告] Moderator 输出不符合 schema，请求修正: %s", e)
+            repair_messages = messages + [
+                AIMessage(content=response_text),
+                HumanMessage(content=_REPAIR_PROMPT.format(error=e))
+            ]
+
+        response = await self.llm.ainvoke(repair_messages)
+        response_text = response.content if hasattr(response, 'content') else str(response)
+        result = _extract_json_object(response_text)
+        validate(result)
+        return result
+
+    @staticmethod
+    def _decide_by_rules(
+        current_round: int,
+        max_rounds: int,
+        rag_comment: Optional[Dict[str, Any]],
+        web_comment: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        按决策提示词中的确定性规则直接给出决策
+
+        已达最大轮次、评分差异 < 2 或 >= 3 时结论是确定的，无需调用 LLM；
+        评分差异在 [2, 3) 之间，或某位 Critic 没有给出评分时返回 None，交给 LLM 判断
+
+        Args:
+            current_round: 当前轮次
+            max_rounds: 最大轮次
+            rag_comment: RAG Critic 的评论
+            web_comment: Web Critic 的评论
+
+        Returns:
+            决策结果，规则无法确定时返回 None
+        """
+        if current_round >= max_rounds:
+            return {
+                "should_continue": False,
+                "next_step": "moderator_summarize",
+                "reason": f"已达最大轮次（{current_round}/{max_rounds}），结束讨论",
+                "current_speaker": "moderator"
+            }
 
-        question = None
-        user_answer = None
+        rag_score = (rag_comment or {}).get("overall_score")
+        web_score = (web_comment or {}).get("overall_score")
+        if not isinstance(rag_score, (int, float)) or not isinstance(web_score, (int, float)):
+            return None
 
-        for line in lines:
-            line = line.strip()
-            if line.startswith("面试官：") or line.startswith("AI："):
-                question = line.split("：", 1)[1].strip()
-            elif line.startswith("用户：") or line.startswith("候选人："):
-                user_answer = line.split("：", 1)[1].strip()
+        score_diff = abs(rag_score - web_score)
+        if score_diff < 2:
+            return {
+                "should_continue": False,
+                "next_step": "moderator_summarize",
+                "reason": f"两位 Critic 评分差异 {score_diff:g} 分（< 2），意见基本一致，结束讨论",
+                "current_speaker": "moderator"
+            }
+        if score_diff >= 3:
+            return {
+                "should_continue": True,
+                "next_step": "rag_critic",
+                "reason": f"两位 Critic 评分差异 {score_diff:g} 分（>= 3），分歧较大，进入下一轮",
+                "current_speaker": "moderator"
+            }
+        return None
+
+    @staticmethod
+    def _schema_prompt(prompt: str, tail: str) -> List[Dict[str, Any]]:
+        """组装 ainvoke_with_schema 使用的文本块：系统提示词和静态指令标记为可缓存前缀，动态尾部在后"""
+        return [
+            {"type": "text", "text": MODERATOR_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": tail}
+        ]
 
-        return question, user_answer
+    @staticmethod
+    def _cache_key(prompt: str) -> bytes:
+        """由系统提示词和用户提示词生成缓存键（原始摘要字节，系统提示词部分的哈希状态只计算一次）"""
+        digest = _SYSTEM_PROMPT_DIGEST.copy()
+        digest.update(prompt.encode("utf-8"))
+        return digest.digest()
+
+    def _cache_get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """读取结果缓存（过期条目视为未命中并删除），返回副本避免调用方修改缓存"""
+        if self._response_cache is None:
+            return None
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._response_cache[key]
+            return None
+        self._response_cache.move_to_end(key)
+        logger.info("[缓存] Moderator 命中结果缓存，跳过 LLM 调用")
+        return copy.deepcopy(entry[1])
+
+    def _cache_set(self, key: bytes, result: Dict[str, Any]) -> None:
+        """写入结果缓存，超出容量时淘汰最久未使用的条目"""
+        if self._response_cache is None:
+            return
+        self._response_cache[key] = (time.monotonic() + self.RESPONSE_CACHE_TTL, copy.deepcopy(result))
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+            self._response_cache.popitem(last=False)
 
     async def _make_decision_with_llm(
         self,
@@ -192,12 +453,19 @@ class ModeratorAgent:
         Returns:
             决策结果（JSON格式）
         """
+        # 规则可以确定结论时跳过 LLM 调用
+        decision = self._decide_by_rules(current_round, max_rounds, rag_comment, web_comment)
+        if decision is not None:
+            logger.info("[Moderator Agent] 规则决策 | %s", decision["reason"])
+            return decision
+
         # 1. 格式化评论
-        formatted_rag = json.dumps(rag_comment, ensure_ascii=False, indent=2)
-        formatted_web = json.dumps(web_comment, ensure_ascii=False, indent=2)
+        formatted_rag = self._format_comment(rag_comment)
+        formatted_web = self._format_comment(web_comment)
 
-        # 2. 构建提示词
-        prompt = MODERATOR_DECISION_PROMPT.format(
+        # 2. 构建提示词（静态指令在前、动态内容在后，命中服务端的前缀缓存）
+        tail = _render(
+            _DECISION_TAIL_PARTS,
             current_round=current_round,
             max_rounds=max_rounds,
             current_speaker=current_speaker,
@@ -205,26 +473,25 @@ class ModeratorAgent:
             web_critic_comment=formatted_web
         )
 
-        # 3. 调用 LLM
-        messages = [
-            SystemMessage(content=MODERATOR_SYSTEM_PROMPT),
-            HumanMessage(content=prompt)
-        ]
+        # 相同的提示词直接复用已有的决策
+        cache_key = self._cache_key(MODERATOR_DECISION_PROMPT + tail)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            response = await self.llm.ainvoke(messages)
-            response_text = response.content if hasattr(response, 'content') else str(response)
-
-            # 4. 解析 JSON
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
+            # 3. 调用 LLM（结构化输出，解析和修正重试由 LLM 封装完成）
+            decision = await self.llm.ainvoke_with_schema(
+                self._schema_prompt(MODERATOR_DECISION_PROMPT, tail),
+                output_schema_moderator_decision,
+                node_name="moderatorDecision",
+                agent_name="ForumAgent"
+            )
 
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                decision = json.loads(json_str)
-            else:
-                decision = json.loads(response_text)
+            # 4. 只缓存和使用符合 Schema 的决策
+            _validate_decision(decision)
 
+            self._cache_set(cache_key, decision)
             return decision
 
         except Exception as e:
@@ -258,12 +525,13 @@ class ModeratorAgent:
             最终评价（JSON格式）
         """
         # 1. 格式化评论和历史
-        formatted_rag = json.dumps(rag_comment, ensure_ascii=False, indent=2)
-        formatted_web = json.dumps(web_comment, ensure_ascii=False, indent=2)
-        formatted_history = json.dumps(discussion_history, ensure_ascii=False, indent=2)
+        formatted_rag = self._format_comment(rag_comment)
+        formatted_web = self._format_comment(web_comment)
+        formatted_history = _dumps_pretty(discussion_history)
 
-        # 2. 构建提示词
-        prompt = MODERATOR_FINAL_EVALUATION_PROMPT.format(
+        # 2. 构建提示词（静态指令在前、动态内容在后，命中服务端的前缀缓存）
+        tail = _render(
+            _FINAL_EVALUATION_TAIL_PARTS,
             question=question or "未提取到问题",
             user_answer=user_answer or "未提取到回答",
             rag_critic_comment=formatted_rag,
@@ -271,48 +539,31 @@ class ModeratorAgent:
             discussion_history=formatted_history
         )
 
-        # 3. 调用 LLM
-        messages = [
-            SystemMessage(content=MODERATOR_SYSTEM_PROMPT),
-            HumanMessage(content=prompt)
-        ]
+        # 相同的提示词直接复用已有的最终评价
+        cache_key = self._cache_key(MODERATOR_FINAL_EVALUATION_PROMPT + tail)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            llm_start = time.time()
-            response = await self.llm.ainvoke(messages)
-            llm_duration = time.time() - llm_start
-
-            # 提取 token 使用量
-            usage = response.usage if hasattr(response, 'usage') else {}
-            input_tokens = usage.get('prompt_tokens', 0)
-            output_tokens = usage.get('completion_tokens', 0)
-            total_tokens = usage.get('total_tokens', input_tokens + output_tokens)
-
-            # 打印 token 统计
-            print(f"[Moderator Agent] LLM调用完成 | "
-                  f"输入token: {input_tokens} | "
-                  f"输出token: {output_tokens} | "
-                  f"总计: {total_tokens} | "
-                  f"耗时: {llm_duration:.2f}s")
-
-            response_text = response.content if hasattr(response, 'content') else str(response)
-
-            # 4. 解析 JSON
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
+            # 3. 调用 LLM（结构化输出，token 使用量和耗时由 LLM 封装记录）
+            evaluation = await self.llm.ainvoke_with_schema(
+                self._schema_prompt(MODERATOR_FINAL_EVALUATION_PROMPT, tail),
+                output_schema_final_evaluation,
+                node_name="moderatorFinalEvaluation",
+                agent_name="ForumAgent"
+            )
 
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                evaluation = json.loads(json_str)
-            else:
-                evaluation = json.loads(response_text)
+            # 4. 只缓存和使用符合 Schema 的最终评价
+            _validate_final_evaluation(evaluation)
 
+            self._cache_set(cache_key, evaluation)
             return evaluation
 
         except json.JSONDecodeError as e:
             return {
                 "error": "LLM 返回的 JSON 格式不正确",
-                "raw_response": response_text,
+                "raw_response": e.doc,
                 "parse_error": str(e)
             }
 
@@ -337,8 +588,6 @@ class ModeratorAgent:
         Returns:
             总体评价（JSON格式）
         """
-        from .prompt import MODERATOR_OVERALL_EVALUATION_PROMPT
-
         # 1. 提取所有评分
         scores = []
         for qa in qa_evaluations:
@@ -351,11 +600,11 @@ class ModeratorAgent:
         average_score = sum(scores) / len(scores) if scores else 0
 
         # 3. 格式化 qa_evaluations 为 JSON 字符串
-        formatted_qa_evaluations = json.dumps(qa_evaluations, ensure_ascii=False, indent=2)
-        formatted_interview_context = json.dumps(interview_context, ensure_ascii=False, indent=2)
+        formatted_qa_evaluations = _dumps_pretty(qa_evaluations)
+        formatted_interview_context = _dumps_pretty(interview_context)
 
         # 4. 构建提示词
-        prompt = MODERATOR_OVERALL_EVALUATION_PROMPT.format(
+        prompt = MODERATOR_OVERALL_EVALUATION_PROMPT + MODERATOR_OVERALL_EVALUATION_PROMPT_TAIL.format(
             total_questions=len(qa_evaluations),
             average_score=average_score,
             interview_context=formatted_interview_context,
@@ -380,23 +629,15 @@ class ModeratorAgent:
             total_tokens = usage.get('total_tokens', input_tokens + output_tokens)
 
             # 打印 token 统计
-            print(f"[Moderator Agent] 总体评价LLM调用完成 | "
-                  f"输入token: {input_tokens} | "
-                  f"输出token: {output_tokens} | "
-                  f"总计: {total_tokens} | "
-                  f"耗时: {llm_duration:.2f}s")
+            logger.info(
+                "[Moderator Agent] 总体评价LLM调用完成 | 输入token: %s | 输出token: %s | 总计: %s | 耗时: %.2fs",
+                input_tokens, output_tokens, total_tokens, llm_duration
+            )
 
             response_text = response.content if hasattr(response, 'content') else str(response)
 
-            # 6. 解析 JSON
-            json_start = response_text.find('{')
-            json_end = response_text.rfind('}') + 1
-
-            if json_start != -1 and json_end > json_start:
-                json_str = response_text[json_start:json_end]
-                overall_evaluation = json.loads(json_str)
-            else:
-                overall_evaluation = json.loads(response_text)
+            # 6. 解析并校验 JSON
+            overall_evaluation = await self._parse_and_validate(messages, response_text, _validate_overall_evaluation)
 
             return overall_evaluation
 
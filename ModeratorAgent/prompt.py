@@ -172,18 +172,8 @@ MODERATOR_SYSTEM_PROMPT = """你是一位专业的 Moderator（主持人），
 """
 
 
-# Moderator 决策提示词
-MODERATOR_DECISION_PROMPT = f"""请根据当前讨论情况，决定下一步动作：
-
-## 当前讨论状态
-- **当前轮次**：{{current_round}}/{{max_rounds}}
-- **当前发言者**：{{current_speaker}}
-
-## RAG Critic 的评论
-{{rag_critic_comment}}
-
-## Web Critic 的评论
-{{web_critic_comment}}
+# Moderator 决策提示词（静态部分，所有调用逐字节相同，作为服务端提示词缓存的前缀；讨论状态和评论在 MODERATOR_DECISION_PROMPT_TAIL 中）
+MODERATOR_DECISION_PROMPT = f"""请根据当前讨论情况（讨论状态和两位 Critic 的评论见文末），决定下一步动作：
 
 ## 决策要求
 
@@ -209,31 +199,29 @@ MODERATOR_DECISION_PROMPT = f"""请根据当前讨论情况，决定下一步动
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_moderator_decision, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{json.dumps(output_schema_moderator_decision, indent=2, ensure_ascii=False)}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
 只返回 JSON 对象，不要有解释或额外文本。
 """
 
-
-# Moderator 最终评价生成提示词
-MODERATOR_FINAL_EVALUATION_PROMPT = f"""请综合 RAG Critic 和 Web Critic 的评论，生成最终评价：
-
-## 面试问题
-{{question}}
-
-## 用户回答
-{{user_answer}}
+# Moderator 决策提示词（动态部分，拼接在 MODERATOR_DECISION_PROMPT 之后）
+MODERATOR_DECISION_PROMPT_TAIL = """
+## 当前讨论状态
+- **当前轮次**：{current_round}/{max_rounds}
+- **当前发言者**：{current_speaker}
 
 ## RAG Critic 的评论
-{{rag_critic_comment}}
+{rag_critic_comment}
 
 ## Web Critic 的评论
-{{web_critic_comment}}
+{web_critic_comment}
+"""
 
-## 讨论历史（所有轮次）
-{{discussion_history}}
+
+# Moderator 最终评价生成提示词（静态部分；问题、回答、评论和讨论历史在 MODERATOR_FINAL_EVALUATION_PROMPT_TAIL 中）
+MODERATOR_FINAL_EVALUATION_PROMPT = f"""请综合 RAG Critic 和 Web Critic 的评论（面试问题、用户回答、两位 Critic 的评论和讨论历史见文末），生成最终评价：
 
 ## 评价要求
 
@@ -287,7 +275,7 @@ MODERATOR_FINAL_EVALUATION_PROMPT = f"""请综合 RAG Critic 和 Web Critic 的
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_final_evaluation, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{json.dumps(output_schema_final_evaluation, indent=2, ensure_ascii=False)}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
@@ -300,6 +288,24 @@ MODERATOR_FINAL_EVALUATION_PROMPT = f"""请综合 RAG Critic 和 Web Critic 的
 4. **正向激励**：在指出不足的同时，也要肯定优势
 """
 
+# Moderator 最终评价生成提示词（动态部分，拼接在 MODERATOR_FINAL_EVALUATION_PROMPT 之后）
+MODERATOR_FINAL_EVALUATION_PROMPT_TAIL = """
+## 面试问题
+{question}
+
+## 用户回答
+{user_answer}
+
+## RAG Critic 的评论
+{rag_critic_comment}
+
+## Web Critic 的评论
+{web_critic_comment}
+
+## 讨论历史（所有轮次）
+{discussion_history}
+"""
+
 
 # Moderator 总体评价输出 Schema（用于多个 QA 的汇总评价）
 output_schema_overall_evaluation = {
@@ -371,16 +377,8 @@ output_schema_overall_evaluation = {
 }
 
 
-# Moderator 总体评价生成提示词（用于多个 QA 的汇总）
-MODERATOR_OVERALL_EVALUATION_PROMPT = f"""你是一位资深的技术面试官，现在需要对候选人的整场面试表现进行总体评价。
-
-## 面试信息
-- 总问题数：{{total_questions}}
-- 平均得分：{{average_score:.1f}}/10
-- 面试上下文：{{interview_context}}
-
-## 每个问题的评价
-{{qa_evaluations}}
+# Moderator 总体评价生成提示词（用于多个 QA 的汇总；静态部分，面试信息和每个问题的评价在 MODERATOR_OVERALL_EVALUATION_PROMPT_TAIL 中）
+MODERATOR_OVERALL_EVALUATION_PROMPT = f"""你是一位资深的技术面试官，现在需要对候选人的整场面试表现进行总体评价（面试信息和每个问题的评价见文末）。
 
 ## 任务要求
 请综合分析候选人的整体表现，生成总体评价报告。
@@ -462,7 +460,7 @@ MODERATOR_OVERALL_EVALUATION_PROMPT = f"""你是一位资深的技术面试官
 请按照以下 JSON 模式定义格式化输出：
 
 <OUTPUT JSON SCHEMA>
-{json.dumps(output_schema_overall_evaluation, indent=2, ensure_ascii=False).replace('{', '{{').replace('}', '}}')}
+{json.dumps(output_schema_overall_evaluation, indent=2, ensure_ascii=False)}
 </OUTPUT JSON SCHEMA>
 
 确保输出是一个符合上述输出 JSON 模式定义的 JSON 对象。
@@ -475,3 +473,14 @@ MODERATOR_OVERALL_EVALUATION_PROMPT = f"""你是一位资深的技术面试官
 4. **具体可操作**：改进建议要明确具体，有实际指导意义
 5. **正向激励**：在指出不足的同时，也要肯定优势和进步
 """
+
+# Moderator 总体评价生成提示词（动态部分，拼接在 MODERATOR_OVERALL_EVALUATION_PROMPT 之后）
+MODERATOR_OVERALL_EVALUATION_PROMPT_TAIL = """
+## 面试信息
+- 总问题数：{total_questions}
+- 平均得分：{average_score:.1f}/10
+- 面试上下文：{interview_context}
+
+## 每个问题的评价
+{qa_evaluations}
+"""
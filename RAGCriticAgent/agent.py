@@ -11,6 +11,7 @@ from .prompt import RAG_CRITIC_SYSTEM_PROMPT, RAG_COMMENT_GENERATION_PROMPT
 from storage.manager import StorageManager
 from storage.database.postgresql import PostgreSQLDatabase
 from rag.embedding import YEmbedding
+from common import parse_message
 from langchain_core.messages import HumanMessage, SystemMessage
 
 
@@ -74,7 +75,7 @@ class RAGCriticAgent:
         interview_context = state.get("interview_context") or {}
 
         # 2. 解析 message 提取问题和用户回答
-        question, user_answer = self._parse_message(message)
+        question, user_answer = parse_message(message)
 
         if not question or not user_answer:
             # 如果无法解析，返回空评论
@@ -128,35 +129,6 @@ class RAGCriticAgent:
 
         return state
 
-    def _parse_message(self, message: str) -> tuple[Optional[str], Optional[str]]:
-        """
-        从 message 中提取问题和用户回答
-
-        message 格式示例：
-        "面试官：请介绍一下Redis的持久化机制？\n用户：Redis有两种持久化方式..."
-
-        Args:
-            message: 历史消息字符串
-
-        Returns:
-            (question, user_answer) 元组
-        """
-        lines = message.strip().split('\n')
-
-        question = None
-        user_answer = None
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("面试官：") or line.startswith("AI："):
-                # 提取最后一个问题
-                question = line.split("：", 1)[1].strip()
-            elif line.startswith("用户：") or line.startswith("候选人："):
-                # 提取最后一个回答
-                user_answer = line.split("：", 1)[1].strip()
-
-        return question, user_answer
-
     async def _search_similar_cases(
         self,
         question: str,
@@ -176,8 +148,8 @@ class RAGCriticAgent:
         Returns:
             相似案例列表
         """
-        # 1. 将问题转换为 embedding
-        query_embedding = self.embedding.embed_query(question)
+        # 1. 将问题转换为 embedding（并发的查询会被合并为一次批量编码）
+        query_embedding = await self.embedding.aembed_query(question)
 
         # 2. 在 Milvus 中检索
         milvus = self.storage_manager.get_milvus()
@@ -213,13 +185,7 @@ class RAGCriticAgent:
         doc_ids = [result.document.id for result in search_results]
 
         # 4. 从 PostgreSQL 批量查询完整数据
-        memories = await self.db.get_episodic_memory_by_ids(doc_ids)
-
-        # 5. 按照相似度排序返回
-        id_to_memory = {str(m['id']): m for m in memories}
-        sorted_memories = [id_to_memory[doc_id] for doc_id in doc_ids if doc_id in id_to_memory]
-
-        return sorted_memories
+        return await self.db.get_episodic_memory_by_ids(doc_ids)
 
     async def _generate_comment_with_llm(
         self,
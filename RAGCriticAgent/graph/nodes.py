@@ -54,7 +54,7 @@ class RAGCriticNodes:
         difficulty = interview_context.get("difficulty")
 
         # 1. 将问题转换为 embedding
-        query_embedding = self.embedding.embed_query(question)
+        query_embedding = await self.embedding.aembed_query(question)
 
         # 2. 在 Milvus 中检索
         milvus = self.storage_manager.get_milvus()
@@ -88,11 +88,7 @@ class RAGCriticNodes:
         # 4. 从 PostgreSQL 批量查询完整数据
         memories = await self.db.get_episodic_memory_by_ids(doc_ids)
 
-        # 5. 按照相似度排序返回
-        id_to_memory = {str(m['id']): m for m in memories}
-        sorted_memories = [id_to_memory[doc_id] for doc_id in doc_ids if doc_id in id_to_memory]
-
-        return {"similar_cases": sorted_memories}
+        return {"similar_cases": memories}
 
     async def generate_comment(self, state: RAGCriticState) -> Dict[str, Any]:
         """
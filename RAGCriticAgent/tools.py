@@ -52,7 +52,7 @@ async def search_similar_interview_cases(
         raise RuntimeError("工具未初始化，请先调用 initialize_tools()")
 
     # 1. 将问题转换为 embedding
-    query_embedding = _embedding.embed_query(question)
+    query_embedding = await _embedding.aembed_query(question)
 
     # 2. 在 Milvus episodic_memory_vectors 中检索
     milvus = _storage_manager.get_milvus()
@@ -87,13 +87,7 @@ async def search_similar_interview_cases(
     doc_ids = [result.document.id for result in search_results]
 
     # 4. 从 PostgreSQL 批量查询完整数据
-    memories = await _db.get_episodic_memory_by_ids(doc_ids)
-
-    # 5. 按照相似度排序返回（保持 Milvus 的排序）
-    id_to_memory = {str(m['id']): m for m in memories}
-    sorted_memories = [id_to_memory[doc_id] for doc_id in doc_ids if doc_id in id_to_memory]
-
-    return sorted_memories
+    return await _db.get_episodic_memory_by_ids(doc_ids)
 
 
 # 导出所有工具
@@ -5,10 +5,13 @@ Web Critic Agent - 基于网络搜索的评论家Agent
 
 import json
 import time
+import asyncio
 from typing import Dict, Any, Optional, List
 from .tools import initialize_tools, get_web_critic_tools
+from .cache import SearchResultCache
 from .prompt import WEB_CRITIC_SYSTEM_PROMPT, WEB_COMMENT_GENERATION_PROMPT
 from tavily import TavilyClient
+from common import parse_message
 from langchain_core.messages import HumanMessage, SystemMessage
 
 
@@ -27,7 +30,8 @@ class WebCriticAgent:
         self,
         llm,
         tavily_api_key: str,
-        max_search_results: int = 5
+        max_search_results: int = 5,
+        search_cache: Optional[SearchResultCache] = None
     ):
         """
         初始化 Web Critic Agent
@@ -36,10 +40,12 @@ class WebCriticAgent:
             llm: LLM 实例（用于生成评论）
             tavily_api_key: Tavily API Key
             max_search_results: 搜索结果数量（默认 5）
+            search_cache: 搜索结果缓存（可选，None 表示每次都调用 Tavily）
         """
         self.llm = llm
         self.tavily_client = TavilyClient(api_key=tavily_api_key)
         self.max_search_results = max_search_results
+        self.search_cache = search_cache
 
         # 初始化工具
         initialize_tools(tavily_api_key)
@@ -65,7 +71,7 @@ class WebCriticAgent:
         message = state.get("message", "")
 
         # 2. 解析 message 提取问题和用户回答
-        question, user_answer = self._parse_message(message)
+        question, user_answer = parse_message(message)
 
         if not question or not user_answer:
             # 如果无法解析，返回空评论
@@ -79,7 +85,8 @@ class WebCriticAgent:
         print("\n[Web Critic Agent] 正在搜索网络资料...")
         search_start = time.time()
 
-        search_results = await self._search_web(question)
+        company = (state.get("interview_context") or {}).get("company")
+        search_results = await self._search_web(question, scope=company)
 
         search_duration = time.time() - search_start
         print(f"[Web Critic Agent] 搜索完成 | 找到 {len(search_results)} 个结果 | 耗时: {search_duration:.2f}s")
@@ -110,48 +117,30 @@ class WebCriticAgent:
 
         return state
 
-    def _parse_message(self, message: str) -> tuple[Optional[str], Optional[str]]:
+    async def _search_web(self, question: str, scope: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        从 message 中提取问题和用户回答
-
-        message 格式示例：
-        "面试官：请介绍一下Redis的持久化机制？\n用户：Redis有两种持久化方式..."
-
-        Args:
-            message: 历史消息字符串
-
-        Returns:
-            (question, user_answer) 元组
-        """
-        lines = message.strip().split('\n')
-
-        question = None
-        user_answer = None
-
-        for line in lines:
-            line = line.strip()
-            if line.startswith("面试官：") or line.startswith("AI："):
-                # 提取最后一个问题
-                question = line.split("：", 1)[1].strip()
-            elif line.startswith("用户：") or line.startswith("候选人："):
-                # 提取最后一个回答
-                user_answer = line.split("：", 1)[1].strip()
-
-        return question, user_answer
-
-    async def _search_web(self, question: str) -> List[Dict[str, Any]]:
-        """
-        使用 Tavily API 搜索相关技术资料
+        使用 Tavily API 搜索相关技术资料（配置了缓存时优先读取缓存）
 
         Args:
             question: 面试问题
+            scope: 缓存作用域（如面试公司，可选）
 
         Returns:
             搜索结果列表
         """
+        cache_key = None
+        if self.search_cache is not None:
+            cache_key = SearchResultCache.make_key(question, self.max_search_results, scope)
+            cached = self.search_cache.get(cache_key)
+            if cached is not None:
+                print("[Web Critic Agent] 命中搜索缓存，跳过 Tavily 调用")
+                return cached
+
         try:
             # 调用 Tavily API（使用 advanced 深度搜索）
-            response = self.tavily_client.search(
+            # TavilyClient 是同步客户端，放到线程池执行，避免阻塞事件循环
+            response = await asyncio.to_thread(
+                self.tavily_client.search,
                 query=question,
                 search_depth="advanced",
                 max_results=self.max_search_results
@@ -168,6 +157,10 @@ class WebCriticAgent:
                     'published_date': item.get('published_date', '')
                 })
 
+            # 只缓存成功的搜索结果
+            if cache_key is not None:
+                self.search_cache.set(cache_key, results)
+
             return results
 
         except Exception as e:
@@ -0,0 +1,101 @@
+"""
+Web 搜索结果缓存
+面试题库的问法高度重复，相同问题在有效期内直接复用 Tavily 搜索结果
+"""
+
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class SearchResultCache:
+    """
+    带过期时间的 LRU 缓存
+
+    键为 (作用域, 问题, 结果数量) 的哈希，作用域通常是面试公司，
+    不同公司的搜索结果互不复用。
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        """
+        初始化缓存
+
+        Args:
+            maxsize: 最大缓存条目数，超出后淘汰最久未使用的条目（默认 1024）
+            ttl: 条目有效期，单位秒（默认 3600）
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # 缓存键 -> (过期时间, 搜索结果)
+        self._data: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+
+        # 统计信息
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(question: str, top_k: int, scope: Optional[str] = None) -> str:
+        """
+        生成缓存键
+
+        Args:
+            question: 搜索问题
+            top_k: 搜索结果数量
+            scope: 缓存作用域（如面试公司，可选）
+
+        Returns:
+            缓存键
+        """
+        digest = blake2b(f"{question}\x00{top_k}".encode("utf-8"), digest_size=16).hexdigest()
+        return f"{scope}:{digest}" if scope else digest
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        读取缓存（过期条目视为未命中并删除）
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            命中时返回搜索结果，否则返回 None
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, results = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return results
+
+    def set(self, key: str, results: List[Dict[str, Any]]) -> None:
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            results: 搜索结果
+        """
+        self._data[key] = (time.monotonic() + self.ttl, results)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """获取缓存统计信息"""
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses
+        }
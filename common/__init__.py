@@ -0,0 +1,8 @@
+"""
+Common - 各 Agent 共用的工具
+负责：
+1. 解析 Forum 讨论输入的 message（"角色：内容" 格式的问答记录）
+"""
+from .message import parse_message
+
+__all__ = ['parse_message']
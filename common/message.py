@@ -0,0 +1,40 @@
+"""
+message 解析
+Forum 讨论的输入 message 由 "角色：内容" 格式的若干行组成，各 Agent 统一在这里提取问题和用户回答
+"""
+
+import re
+from typing import Optional, Tuple
+
+
+# message 中每一行的格式："角色：内容"（只匹配行内空白，避免跨行吞掉下一行）
+_MESSAGE_LINE_PATTERN = re.compile(
+    r'^[^\S\n]*(?P<role>面试官|AI|用户|候选人)[^\S\n]*：[^\S\n]*(?P<text>.*?)[^\S\n]*$',
+    re.M
+)
+
+
+def parse_message(message: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    从 message 中提取问题和用户回答
+
+    message 格式示例：
+    "面试官：请介绍一下Redis的持久化机制？\n用户：Redis有两种持久化方式..."
+
+    Args:
+        message: 历史消息字符串
+
+    Returns:
+        (question, user_answer) 元组
+    """
+    question = None
+    user_answer = None
+
+    # 一次正则扫描整段消息，保留最后一个问题和最后一个回答
+    for match in _MESSAGE_LINE_PATTERN.finditer(message):
+        if match['role'] in ("面试官", "AI"):
+            question = match['text']
+        else:
+            user_answer = match['text']
+
+    return question, user_answer
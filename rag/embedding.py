@@ -1,7 +1,15 @@
 from FlagEmbedding import BGEM3FlagModel
 from langchain_core.embeddings import Embeddings
-from typing import List
+from typing import List, Optional, Tuple
+from collections import OrderedDict
+from array import array
+from hashlib import blake2b
+import asyncio
+import os
+import sqlite3
+import threading
 import warnings
+import numpy as np
 
 
 class YEmbedding(Embeddings):
@@ -12,24 +20,99 @@ class YEmbedding(Embeddings):
     - 支持中文语义检索
     - 使用 FP16 加速推理
     - 自动缓存模型到本地
+    - 并发的异步查询会在短时间窗口内合并为一次批量编码
+    - 两级缓存（进程内 LRU + 本地 sqlite），相同文本不重复编码
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_batch: int = 32,
+        window_ms: float = 5.0,
+        cache_dir: Optional[str] = "./embedding_cache",
+        memory_cache_size: int = 10000,
+        encode_batch_size: int = 64,
+        max_length: int = 8192,
+        query_max_length: int = 256,
+        embedding_dim: int = 1024,
+        query_instruction: Optional[str] = None
+    ) -> None:
+        """
+        初始化嵌入模型
+
+        Args:
+            max_batch: 异步查询合并编码的最大批大小（默认 32）
+            window_ms: 异步查询的合并等待窗口，单位毫秒（默认 5）
+            cache_dir: 磁盘缓存目录（None 表示只使用内存缓存）
+            memory_cache_size: 内存缓存的最大条目数（默认 10000）
+            encode_batch_size: model.encode 的批大小（默认 64）
+            max_length: 文档编码的最大 token 长度，超出部分截断（默认 8192，即模型上限，覆盖 4000 字符的文档分块）
+            query_max_length: 查询编码的最大 token 长度（默认 256，查询通常很短）
+            embedding_dim: 期望的向量维度，需与 Milvus 集合一致（默认 1024）
+            query_instruction: 查询前缀指令，只拼接到查询文本上（默认 None 不加指令，与已入库向量的编码方式一致；
+                BGE-M3 检索不需要指令，更换为需要指令的模型时再传入）
+        """
         super().__init__()
 
         # 忽略 tokenizer 的性能警告（这是 FlagEmbedding 内部实现的问题）
         warnings.filterwarnings('ignore', message='.*BertTokenizerFast.*')
 
+        self.model_name = 'BAAI/bge-m3'
+        # 查询指令在这里固定下来，由 embed_query / aembed_query 直接拼接，
+        # 模型本身不再处理指令，文档与查询共用同一条编码路径
+        self.query_prefix = query_instruction or ""
         self.model = BGEM3FlagModel(
-            'BAAI/bge-large-zh-v1.5',
-            query_instruction_for_retrieval="为这个句子生成表示以用于检索相关文章：",
+            self.model_name,
+            query_instruction_for_retrieval=None,
             use_fp16=True,
             cache_dir="./models"
         )
 
+        # 编码参数：只计算稠密向量；文档保留完整分块，查询按较短的长度截断
+        self.encode_batch_size = encode_batch_size
+        self.max_length = max_length
+        self.query_max_length = query_max_length
+
+        # 启动时校验输出维度，模型与向量库不匹配时直接失败（这次编码同时完成了模型预热）
+        self.embedding_dim = embedding_dim
+        probe = self.model.encode(
+            ["维度检查"],
+            max_length=self.query_max_length,
+            return_dense=True,
+            return_sparse=False,
+            return_colbert_vecs=False
+        )["dense_vecs"]
+        output_dim = np.asarray(probe).shape[-1]
+        if output_dim != embedding_dim:
+            raise ValueError(
+                f"嵌入模型 {self.model_name} 输出维度为 {output_dim}，与期望的 {embedding_dim} 不一致"
+            )
+
+        # 异步批量编码队列（在首次 aembed_query 时绑定到当前事件循环）
+        self.max_batch = max_batch
+        self.window_ms = window_ms
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_task: Optional[asyncio.Task] = None
+        self._batch_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # 两级缓存：内存 LRU + 磁盘 sqlite（缓存键包含模型名和截断长度，换模型或截断长度后自动失效）
+        self.memory_cache_size = memory_cache_size
+        self._mem: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._disk: Optional[sqlite3.Connection] = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk = sqlite3.connect(
+                os.path.join(cache_dir, "embeddings.sqlite3"),
+                check_same_thread=False
+            )
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._disk.commit()
+
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
         """
-        批量编码文档
+        批量编码文档（命中缓存的文本不再经过模型）
 
         Args:
             texts: 文档列表
@@ -37,12 +120,39 @@ class YEmbedding(Embeddings):
         Returns:
             向量列表
         """
-        outputs = self.model.encode(texts)
-        return outputs["dense_vecs"].tolist()
+        return self._embed(texts, self.max_length)
+
+    def _embed(self, texts: List[str], max_length: int) -> List[List[float]]:
+        """按指定截断长度批量编码（命中缓存的文本不再经过模型）"""
+        keys = [self._cache_key(text, max_length) for text in texts]
+        vectors = self._cache_get_many(keys)
+
+        # 未命中的文本按缓存键去重后再编码
+        misses = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                misses.setdefault(keys[i], texts[i])
+
+        if misses:
+            outputs = self.model.encode(
+                list(misses.values()),
+                batch_size=self.encode_batch_size,
+                max_length=max_length,
+                return_dense=True,
+                return_sparse=False,
+                return_colbert_vecs=False
+            )
+            # FP16 推理的输出先转为 float32 再 tolist
+            dense = np.asarray(outputs["dense_vecs"], dtype=np.float32)
+            encoded = dict(zip(misses.keys(), dense.tolist()))
+            self._cache_put_many(list(encoded.keys()), list(encoded.values()))
+            vectors = [encoded[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+
+        return vectors
 
     def embed_query(self, text: str) -> List[float]:
         """
-        编码单个查询
+        编码单个查询（设置了查询指令时拼接在前面）
 
         Args:
             text: 查询文本
@@ -50,10 +160,117 @@ class YEmbedding(Embeddings):
         Returns:
             向量
         """
-        outputs = self.model.encode([text])
-        return outputs["dense_vecs"][0].tolist()
+        return self._embed([self.query_prefix + text], self.query_max_length)[0]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        异步编码单个查询（设置了查询指令时拼接在前面）
+
+        并发到达的查询会在 window_ms 时间窗口内合并，
+        通过一次 model.encode 批量编码后再分发给各个调用方
+
+        Args:
+            text: 查询文本
+
+        Returns:
+            向量
+        """
+        self._ensure_batch_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((self.query_prefix + text, future))
+        return await future
+
+    def _ensure_batch_worker(self) -> None:
+        """确保当前事件循环上有一个批量编码后台任务"""
+        loop = asyncio.get_running_loop()
+        if self._batch_task is None or self._batch_task.done() or self._batch_loop is not loop:
+            self._queue = asyncio.Queue()
+            self._batch_loop = loop
+            self._batch_task = loop.create_task(self._batch_worker())
+
+    async def _batch_worker(self) -> None:
+        """后台任务：按时间窗口收集查询并批量编码"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch: List[Tuple[str, asyncio.Future]] = [await self._queue.get()]
+            deadline = loop.time() + self.window_ms / 1000
+
+            # 在时间窗口内继续收集，直到达到最大批大小
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            texts = [text for text, _ in batch]
+            try:
+                # 模型推理放到线程池执行，避免阻塞事件循环
+                vectors = await asyncio.to_thread(self._embed, texts, self.query_max_length)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    def _cache_key(self, text: str, max_length: int) -> str:
+        """生成缓存键（模型名 + 截断长度 + 文本内容哈希）"""
+        digest = blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{self.model_name}:{max_length}:{digest}"
+
+    def _cache_get_many(self, keys: List[str]) -> List[Optional[List[float]]]:
+        """批量读取缓存，先查内存再查磁盘，未命中的位置为 None"""
+        results: List[Optional[List[float]]] = [None] * len(keys)
+        disk_lookups = []
+
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                vector = self._mem.get(key)
+                if vector is not None:
+                    self._mem.move_to_end(key)
+                    results[i] = vector
+                elif self._disk is not None:
+                    disk_lookups.append(i)
 
+            if disk_lookups:
+                wanted = list({keys[i] for i in disk_lookups})
+                placeholders = ",".join("?" * len(wanted))
+                rows = self._disk.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    wanted
+                ).fetchall()
+                found = {key: array("f", blob).tolist() for key, blob in rows}
+                for i in disk_lookups:
+                    vector = found.get(keys[i])
+                    if vector is not None:
+                        results[i] = vector
+                        self._remember(keys[i], vector)
 
+        return results
 
+    def _cache_put_many(self, keys: List[str], vectors: List[List[float]]) -> None:
+        """批量写入缓存（内存 + 磁盘）"""
+        with self._cache_lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
 
+            if self._disk is not None:
+                self._disk.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, array("f", vector).tobytes()) for key, vector in zip(keys, vectors)]
+                )
+                self._disk.commit()
 
+    def _remember(self, key: str, vector: List[float]) -> None:
+        """写入内存 LRU，超出容量时淘汰最久未使用的条目"""
+        self._mem[key] = vector
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.memory_cache_size:
+            self._mem.popitem(last=False)
@@ -93,7 +93,7 @@ class RAG:
             搜索结果列表（包含完整文档内容）
         """
         # 1. 生成查询向量
-        query_embedding = self.embedding_model.embed_query(query)
+        query_embedding = await self.embedding_model.aembed_query(query)
 
         # 2. Milvus 向量检索（只返回 doc_ids）
         milvus = self.storage.get_milvus()
@@ -50,6 +50,22 @@ class PostgreSQLDatabase(DatabaseBase):
         if self.pool:
             await self.pool.close()
 
+    def acquire(self):
+        """
+        从连接池获取连接
+
+        用法:
+            async with db.acquire() as conn:
+                ...
+        """
+        if self.pool is None:
+            raise RuntimeError("数据库未连接，请先调用 connect()")
+        return self.pool.acquire()
+
+    async def release(self, conn: asyncpg.Connection) -> None:
+        """将通过 await db.acquire() 获取的连接归还连接池"""
+        await self.pool.release(conn)
+
     async def _create_tables(self) -> None:
         """创建表"""
         async with self.pool.acquire() as conn:
@@ -186,7 +202,9 @@ class PostgreSQLDatabase(DatabaseBase):
         return None
 
     async def get_documents_by_ids(self, doc_ids: List[str]) -> List[Dict[str, Any]]:
-        """批量获取文档"""
+        """批量获取文档（单条 ANY 查询，一次往返；asyncpg 会在连接上缓存该语句的预编译结果）"""
+        if not doc_ids:
+            return []
         async with self.pool.acquire() as conn:
             rows = await conn.fetch(
                 "SELECT * FROM documents WHERE id = ANY($1::uuid[])", doc_ids
@@ -214,18 +232,34 @@ class PostgreSQLDatabase(DatabaseBase):
         return result == "UPDATE 1"
 
     async def get_semantic_memory_by_ids(self, memory_ids: List[str]) -> List[Dict[str, Any]]:
-        """批量获取语义记忆"""
+        """
+        批量获取语义记忆（单条 ANY 查询，一次往返；asyncpg 会在连接上缓存该语句的预编译结果）
+
+        返回的记录按 memory_ids 的顺序排列（不存在的 ID 跳过），调用方传入 Milvus 的检索顺序即可直接使用
+        """
+        if not memory_ids:
+            return []
         async with self.pool.acquire() as conn:
             rows = await conn.fetch(
-                "SELECT * FROM semantic_memory WHERE id = ANY($1::uuid[])", memory_ids
+                "SELECT * FROM semantic_memory WHERE id = ANY($1::uuid[]) "
+                "ORDER BY array_position($1::uuid[], id)",
+                memory_ids
             )
         return [dict(row) for row in rows]
 
     async def get_episodic_memory_by_ids(self, memory_ids: List[str]) -> List[Dict[str, Any]]:
-        """批量获取情节记忆"""
+        """
+        批量获取情节记忆（单条 ANY 查询，一次往返；asyncpg 会在连接上缓存该语句的预编译结果）
+
+        返回的记录按 memory_ids 的顺序排列（不存在的 ID 跳过），调用方传入 Milvus 的检索顺序即可直接使用
+        """
+        if not memory_ids:
+            return []
         async with self.pool.acquire() as conn:
             rows = await conn.fetch(
-                "SELECT * FROM episodic_memory WHERE id = ANY($1::uuid[])", memory_ids
+                "SELECT * FROM episodic_memory WHERE id = ANY($1::uuid[]) "
+                "ORDER BY array_position($1::uuid[], id)",
+                memory_ids
             )
         return [dict(row) for row in rows]
 
@@ -390,6 +424,52 @@ class PostgreSQLDatabase(DatabaseBase):
 
         return discussion_id
 
+    async def insert_forum_discussions_bulk(self, discussions: List[Dict[str, Any]]) -> List[str]:
+        """
+        批量插入Forum讨论记录（一次 executemany，单个事务）
+
+        参数:
+            discussions: 讨论记录列表，字段同 insert_forum_discussion
+
+        返回:
+            discussion_ids: 插入记录的UUID列表
+        """
+        if not discussions:
+            return []
+
+        discussion_ids = []
+        records = []
+        for discussion in discussions:
+            discussion_id = discussion.get('id') or str(uuid.uuid4())
+            discussion_ids.append(discussion_id)
+            records.append((
+                discussion_id,
+                discussion['session_id'],
+                discussion.get('user_id'),
+                discussion['question'],
+                discussion['user_answer'],
+                json.dumps(discussion.get('rag_comment')) if discussion.get('rag_comment') else None,
+                json.dumps(discussion.get('web_comment')) if discussion.get('web_comment') else None,
+                json.dumps(discussion.get('final_evaluation')) if discussion.get('final_evaluation') else None,
+                json.dumps(discussion.get('discussion_history')) if discussion.get('discussion_history') else None,
+                discussion.get('total_rounds', 1),
+                json.dumps(discussion.get('metadata')) if discussion.get('metadata') else None
+            ))
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.executemany("""
+                    INSERT INTO forum_discussions (
+                        id, session_id, user_id, question, user_answer,
+                        rag_comment, web_comment, final_evaluation,
+                        discussion_history, total_rounds, metadata
+                    )
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+                """, records)
+
+        print(f"[OK] 批量插入 {len(discussion_ids)} 条Forum讨论记录")
+        return discussion_ids
+
     async def get_forum_discussion_by_id(self, discussion_id: str) -> Optional[Dict[str, Any]]:
         """根据ID获取Forum讨论记录"""
         async with self.pool.acquire() as conn:
@@ -38,7 +38,7 @@ class VectorStoreBase(ABC):
 
         参数:
             collection_name: 集合/表名
-            embedding_dim: 向量维度(默认1024,对应bge-large-zh-v1.5)
+            embedding_dim: 向量维度(默认1024,对应bge-m3)
         """
         self.collection_name = collection_name
         self.embedding_dim = embedding_dim